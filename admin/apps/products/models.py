@@ -49,6 +49,7 @@ class DishParameter(BaseModel):
     class Meta:
         db_table = 'dish_parameters'
         managed = False
+        unique_together = ('dish', 'key')
 
     def __str__(self):
         return f'{self.key}: {self.value}'
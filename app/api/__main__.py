@@ -4,15 +4,42 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.config import load_config
 from app.api import controllers, dependencies
-from app.infrastructure.database.factory import create_pool, make_connection_string
+from app.api.compression import CompressionMiddleware
+from app.api.consistency import ReadYourWritesMiddleware
+from app.api.responses import DTOResponse
+from app.infrastructure.cache import MemoryCache, CacheInvalidator
+from app.infrastructure.scheduler import DiscountScheduler
+from app.infrastructure.database.factory import create_pool, make_connection_string, make_dsn
+from app.infrastructure.database.routing import ReplicaSet
 
 
 def main() -> FastAPI:
     settings = load_config()
     app = FastAPI(
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=DTOResponse
+    )
+    pool = create_pool(url=make_connection_string(settings=settings), settings=settings.pool)
+    replicas = ReplicaSet([
+        create_pool(url=make_connection_string(settings=settings, replica=replica), settings=settings.pool)
+        for replica in settings.db.replicas
+    ])
+    cache = MemoryCache(max_bytes=settings.cache.max_bytes, ttl=settings.cache.ttl)
+    invalidator = CacheInvalidator(dsn=make_dsn(settings=settings), cache=cache)
+    app.add_event_handler("startup", invalidator.start)
+    app.add_event_handler("shutdown", invalidator.stop)
+    scheduler = DiscountScheduler(pool=pool, cache=cache)
+    invalidator.subscribe("discounts", scheduler.reload)
+    app.add_event_handler("startup", scheduler.start)
+    app.add_event_handler("shutdown", scheduler.stop)
+    if replicas:
+        app.add_middleware(ReadYourWritesMiddleware, window=settings.db.read_your_writes)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression.minimum_size,
+        gzip_level=settings.compression.gzip_level,
+        brotli_quality=settings.compression.brotli_quality,
     )
-    pool = create_pool(url=make_connection_string(settings=settings))
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -20,7 +47,7 @@ def main() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
-    dependencies.setup(app, pool, settings)
+    dependencies.setup(app, pool, settings, cache, replicas)
     controllers.setup(app)
     return app
 
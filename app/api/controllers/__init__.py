@@ -8,6 +8,8 @@ from .dish_params import router as dish_params_router
 from .menu import router as menu_router
 from .params import router as params_router
 from .restaurants import router as restaurant_router
+from .search import router as search_router
+from .stats import router as stats_router
 
 
 def setup(app: FastAPI) -> None:
@@ -35,3 +37,9 @@ def setup(app: FastAPI) -> None:
     app.include_router(
         router=params_router,
     )
+    app.include_router(
+        router=search_router,
+    )
+    app.include_router(
+        router=stats_router,
+    )
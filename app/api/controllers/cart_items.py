@@ -1,24 +1,42 @@
 from typing import List
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import MAX_BATCH_SIZE
 
 router = APIRouter(prefix="/cart-items", tags=["cart-items"])
 
 
-@router.get("/", response_model=List[dto.CartItem])
+@router.get("/", response_model=dto.Page[dto.CartItem])
 async def get_cart_items(
+        pagination: Pagination = Depends(),
         dao: HolderDao = Depends(dao_provider)
-) -> List[dto.CartItem]:
+) -> dto.Page[dto.CartItem]:
     try:
-        cart_items = await dao.cart_item.get_cart_items()
-        if not cart_items:
+        cart_items = await dao.cart_item.get_cart_items(pagination.after, pagination.limit)
+        if not cart_items.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart items not found")
-        return cart_items
+        return DTOResponse(cart_items)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":batchGet", response_model=dto.Batch[dto.CartItem])
+async def batch_get_cart_items(
+        ids: List[int] = Body(embed=True, min_length=1, max_length=MAX_BATCH_SIZE),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Batch[dto.CartItem]:
+    try:
+        return DTOResponse(await dao.cart_item.get_cart_items_by_ids(tuple(ids)))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -30,7 +48,9 @@ async def create_cart_item(
 ) -> dto.CartItem:
     try:
         created_cart_item = await dao.cart_item.add_cart_item(cart_item)
-        return created_cart_item
+        return DTOResponse(created_cart_item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -44,7 +64,9 @@ async def get_cart_item(
         cart_item = await dao.cart_item.get_cart_item(cart_item_id)
         if not cart_item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
-        return cart_item
+        return DTOResponse(cart_item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -59,7 +81,9 @@ async def update_cart_item(
         updated_cart_item = await dao.cart_item.update_cart_item(cart_item_id, cart_item_update)
         if not updated_cart_item:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
-        return updated_cart_item
+        return DTOResponse(updated_cart_item)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -77,5 +101,7 @@ async def delete_cart_item(
             content={"message": "The cart item is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
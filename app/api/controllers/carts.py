@@ -1,24 +1,29 @@
 from uuid import UUID
-from typing import List
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
 
 
 router = APIRouter(prefix="/carts", tags=["carts"])
 
 
-@router.get("/", response_model=List[dto.Cart])
-async def get_carts(dao: HolderDao = Depends(dao_provider)) -> List[dto.Cart]:
+@router.get("/", response_model=dto.Page[dto.Cart])
+async def get_carts(
+        pagination: Pagination = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Page[dto.Cart]:
     try:
-        carts = await dao.cart.get_carts()
-        if not carts:
+        carts = await dao.cart.get_carts(pagination.after, pagination.limit)
+        if not carts.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Carts not found")
-        return carts
+        return DTOResponse(carts)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -27,7 +32,9 @@ async def get_carts(dao: HolderDao = Depends(dao_provider)) -> List[dto.Cart]:
 async def create_cart(cart: schems.CartCreateUpdate, dao: HolderDao = Depends(dao_provider)) -> dto.Cart:
     try:
         created_cart = await dao.cart.add_cart(cart)
-        return created_cart
+        return DTOResponse(created_cart)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -38,7 +45,9 @@ async def get_cart(cart_id: UUID, dao: HolderDao = Depends(dao_provider)) -> dto
         cart = await dao.cart.get_cart(cart_id)
         if not cart:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart not found")
-        return cart
+        return DTOResponse(cart)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -53,7 +62,9 @@ async def update_cart(
         updated_cart = await dao.cart.update_cart(cart_id, cart_update)
         if not updated_cart:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart not found")
-        return updated_cart
+        return DTOResponse(updated_cart)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -68,5 +79,59 @@ async def delete_cart(cart_id: UUID, dao: HolderDao = Depends(dao_provider)):
             content={"message": "The cart is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post("/{cart_id}/items", response_model=dto.CartItemChange)
+async def add_cart_item(
+        cart_id: UUID,
+        cart_item: schems.CartItemCreateUpdate,
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.CartItemChange:
+    try:
+        change = await dao.cart.add_item(cart_id, cart_item)
+        if not change:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart not found")
+        return DTOResponse(change)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.patch("/{cart_id}/items/{cart_item_id}", response_model=dto.CartItemChange)
+async def change_cart_item_quantity(
+        cart_id: UUID,
+        cart_item_id: int,
+        quantity_update: schems.CartItemQuantityUpdate,
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.CartItemChange:
+    try:
+        change = await dao.cart.change_item_quantity(cart_id, cart_item_id, quantity_update.delta)
+        if not change:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
+        return DTOResponse(change)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.delete("/{cart_id}/items/{cart_item_id}", response_model=dto.CartItemChange)
+async def remove_cart_item(
+        cart_id: UUID,
+        cart_item_id: int,
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.CartItemChange:
+    try:
+        change = await dao.cart.remove_item(cart_id, cart_item_id)
+        if not change:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Cart item not found")
+        return DTOResponse(change)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,23 +1,41 @@
 from typing import List
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import MAX_BULK_SIZE
 
 router = APIRouter(prefix="/discounts", tags=["discounts"])
 
-@router.get("/", response_model=List[dto.Discount])
+@router.get("/", response_model=dto.Page[dto.Discount])
 async def get_discounts(
+        pagination: Pagination = Depends(),
         dao: HolderDao = Depends(dao_provider)
-) -> List[dto.Discount]:
+) -> dto.Page[dto.Discount]:
     try:
-        discounts = await dao.discount.get_discounts()
-        if not discounts:
+        discounts = await dao.discount.get_discounts(pagination.after, pagination.limit)
+        if not discounts.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discounts not found")
-        return discounts
+        return DTOResponse(discounts)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":bulk", response_model=List[dto.BulkItem[dto.Discount]])
+async def upsert_discounts(
+        discounts: List[schems.DiscountCreateUpdate] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+        dao: HolderDao = Depends(dao_provider)
+) -> List[dto.BulkItem[dto.Discount]]:
+    try:
+        return DTOResponse(await dao.discount.upsert_discounts(discounts))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -29,7 +47,9 @@ async def create_discount(
 ) -> dto.Discount:
     try:
         created_discount = await dao.discount.add_discount(discount)
-        return created_discount
+        return DTOResponse(created_discount)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -43,7 +63,9 @@ async def get_discount(
         discount = await dao.discount.get_discount(discount_id)
         if not discount:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discount not found")
-        return discount
+        return DTOResponse(discount)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -58,7 +80,9 @@ async def update_discount(
         updated_discount = await dao.discount.update_discount(discount_id, discount_update)
         if not updated_discount:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Discount not found")
-        return updated_discount
+        return DTOResponse(updated_discount)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -76,5 +100,7 @@ async def delete_discount(
             content={"message": "The discount is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,24 +1,147 @@
-from typing import List
-from fastapi.responses import  JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import AsyncIterator, List, Optional, Tuple
+from fastapi.responses import JSONResponse
+from pydantic import ValidationError
+from fastapi import APIRouter, Body, Depends, HTTPException, Request, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import (
+    dao_provider,
+    dao_factory_provider,
+    ConditionalGet,
+    DaoFactory,
+    Pagination,
+    SparseFields,
+    dish_filter
+)
+from app.api.responses import NDJSON_MEDIA_TYPE, DTOResponse, NDJSONResponse, accepts_ndjson
+from app.domain.importer import ImportRecord, read_csv, read_jsonl
 from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import MAX_BATCH_SIZE, MAX_BULK_SIZE, LoadPlan
 
 router = APIRouter(prefix="/dishes", tags=["dishes"])
 
 
-@router.get("/", response_model=List[dto.Dish])
+async def stream_dishes(
+        dao_factory: DaoFactory,
+        after: Optional[int] = None,
+        filters: Optional[schems.DishFilter] = None
+) -> AsyncIterator[dto.Dish]:
+    async with dao_factory() as dao:
+        async for dish in dao.dish.stream_dishes(after, filters):
+            yield dish
+
+
+async def validate_import_rows(
+        records: AsyncIterator[ImportRecord]
+) -> AsyncIterator[Tuple[int, Optional[schems.DishImportRow], Optional[str]]]:
+    async for record in records:
+        if record.error is not None:
+            yield record.line, None, record.error
+            continue
+        try:
+            yield record.line, schems.DishImportRow.model_validate(record.data), None
+        except ValidationError as e:
+            errors = "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors())
+            yield record.line, None, errors
+
+
+@router.get(
+    "/",
+    response_model=dto.Page[dto.Dish],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
 async def get_dishes(
-        dao: HolderDao = Depends(dao_provider)
-) -> List[dto.Dish]:
+        request: Request,
+        pagination: Pagination = Depends(),
+        filters: schems.DishFilter = Depends(dish_filter),
+        plan: LoadPlan = Depends(SparseFields(dto.Dish)),
+        conditional: ConditionalGet = Depends(),
+        dao: HolderDao = Depends(dao_provider),
+        dao_factory: DaoFactory = Depends(dao_factory_provider)
+) -> dto.Page[dto.Dish]:
+    if accepts_ndjson(request):
+        return NDJSONResponse(stream_dishes(dao_factory, pagination.after, filters))
     try:
-        dishes = await dao.dish.get_dishes()
-        if not dishes:
+        etag = conditional.etag(await dao.dish.get_dishes_version())
+        not_modified = conditional.not_modified(etag)
+        if not_modified:
+            return not_modified
+        dishes = await dao.dish.get_dishes(pagination.after, pagination.limit, filters, plan)
+        if not dishes.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dishes not found")
-        return dishes
+        if plan.is_sparse:
+            return conditional.apply(DTOResponse(dishes.model_dump(by_alias=True, exclude_unset=True)), etag)
+        return conditional.apply(DTOResponse(dishes), etag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":batchGet", response_model=dto.Batch[dto.Dish])
+async def batch_get_dishes(
+        ids: List[int] = Body(embed=True, min_length=1, max_length=MAX_BATCH_SIZE),
+        plan: LoadPlan = Depends(SparseFields(dto.Dish)),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Batch[dto.Dish]:
+    try:
+        dishes = await dao.dish.get_dishes_by_ids(tuple(ids), plan)
+        if plan.is_sparse:
+            return DTOResponse(dishes.model_dump(by_alias=True, exclude_unset=True))
+        return DTOResponse(dishes)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/facets", response_model=List[dto.Facet])
+async def get_dish_facets(
+        filters: schems.DishFilter = Depends(dish_filter),
+        dao: HolderDao = Depends(dao_provider)
+) -> List[dto.Facet]:
+    try:
+        return DTOResponse(await dao.dish.get_dish_facets(filters))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":bulk", response_model=List[dto.BulkItem[dto.Dish]])
+async def upsert_dishes(
+        dishes: List[schems.DishUpsert] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+        dao: HolderDao = Depends(dao_provider)
+) -> List[dto.BulkItem[dto.Dish]]:
+    try:
+        return DTOResponse(await dao.dish.upsert_dishes(dishes))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(
+    ":import",
+    response_model=dto.ImportSummary,
+    openapi_extra={"requestBody": {"required": True, "content": {"text/csv": {}, NDJSON_MEDIA_TYPE: {}}}}
+)
+async def import_dishes(request: Request, dao: HolderDao = Depends(dao_provider)) -> dto.ImportSummary:
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("text/csv"):
+        records = read_csv(request.stream())
+    elif content_type.startswith((NDJSON_MEDIA_TYPE, "application/jsonl")):
+        records = read_jsonl(request.stream())
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Upload text/csv or {NDJSON_MEDIA_TYPE}"
+        )
+    try:
+        return DTOResponse(await dao.dish_import.import_dishes(validate_import_rows(records)))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -30,7 +153,9 @@ async def create_dish(
 ) -> dto.Dish:
     try:
         created_dish = await dao.dish.add_dish(dish)
-        return created_dish
+        return DTOResponse(created_dish)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -38,13 +163,18 @@ async def create_dish(
 @router.get("/{dish_id}", response_model=dto.Dish)
 async def get_dish(
         dish_id: int,
+        plan: LoadPlan = Depends(SparseFields(dto.Dish)),
         dao: HolderDao = Depends(dao_provider)
 ) -> dto.Dish:
     try:
-        dish = await dao.dish.get_dish(dish_id)
+        dish = await dao.dish.get_dish(dish_id, plan)
         if not dish:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dish not found")
-        return dish
+        if plan.is_sparse:
+            return DTOResponse(dish.model_dump(by_alias=True, exclude_unset=True))
+        return DTOResponse(dish)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -59,7 +189,9 @@ async def update_dish(
         updated_dish = await dao.dish.update_dish(dish_id, dish_update)
         if not updated_dish:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dish not found")
-        return updated_dish
+        return DTOResponse(updated_dish)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -77,5 +209,7 @@ async def delete_dish(
             content={"message": "The dish is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,22 +1,42 @@
 from typing import List
 from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Body, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import MAX_BULK_SIZE
 
 router = APIRouter(prefix="/dish-parameters", tags=["dish-parameters"])
 
 
-@router.get("/", response_model=List[dto.DishParameter])
-async def get_dish_parameters(dao: HolderDao = Depends(dao_provider)) -> List[dto.DishParameter]:
+@router.get("/", response_model=dto.Page[dto.DishParameter])
+async def get_dish_parameters(
+        pagination: Pagination = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Page[dto.DishParameter]:
     try:
-        dish_parameters = await dao.dish_parameter.get_dish_parameters()
-        if not dish_parameters:
+        dish_parameters = await dao.dish_parameter.get_dish_parameters(pagination.after, pagination.limit)
+        if not dish_parameters.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dish parameters not found")
-        return dish_parameters
+        return DTOResponse(dish_parameters)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":bulk", response_model=List[dto.BulkItem[dto.DishParameter]])
+async def upsert_dish_parameters(
+        dish_parameters: List[schems.DishParameterCreateUpdate] = Body(min_length=1, max_length=MAX_BULK_SIZE),
+        dao: HolderDao = Depends(dao_provider)
+) -> List[dto.BulkItem[dto.DishParameter]]:
+    try:
+        return DTOResponse(await dao.dish_parameter.upsert_dish_parameters(dish_parameters))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -28,7 +48,9 @@ async def create_dish_parameter(
 ) -> dto.DishParameter:
     try:
         created_dish_parameter = await dao.dish_parameter.add_dish_parameter(dish_parameter)
-        return created_dish_parameter
+        return DTOResponse(created_dish_parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -42,7 +64,9 @@ async def get_dish_parameter(
         dish_parameter = await dao.dish_parameter.get_dish_parameter(dish_parameter_id)
         if not dish_parameter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dish parameter not found")
-        return dish_parameter
+        return DTOResponse(dish_parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -59,7 +83,9 @@ async def update_dish_parameter(
         )
         if not updated_dish_parameter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dish parameter not found")
-        return updated_dish_parameter
+        return DTOResponse(updated_dish_parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -76,5 +102,7 @@ async def delete_dish_parameter(
             content={"message": "The dish parameter is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,22 +1,27 @@
-from typing import List
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, ConditionalGet, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
 
 router = APIRouter(prefix="/menus", tags=["menus"])
 
 
-@router.get("/", response_model=List[dto.Menu])
-async def get_menus(dao: HolderDao = Depends(dao_provider)) -> List[dto.Menu]:
+@router.get("/", response_model=dto.Page[dto.Menu])
+async def get_menus(
+        pagination: Pagination = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Page[dto.Menu]:
     try:
-        menus = await dao.menu.get_menus()
-        if not menus:
+        menus = await dao.menu.get_menus(pagination.after, pagination.limit)
+        if not menus.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menus not found")
-        return menus
+        return DTOResponse(menus)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -25,18 +30,33 @@ async def get_menus(dao: HolderDao = Depends(dao_provider)) -> List[dto.Menu]:
 async def create_menu(menu: schems.MenuCreateUpdate, dao: HolderDao = Depends(dao_provider)) -> dto.Menu:
     try:
         created_menu = await dao.menu.add_menu(menu)
-        return created_menu
+        return DTOResponse(created_menu)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.get("/{menu_id}", response_model=dto.Menu)
-async def get_menu(menu_id: int, dao: HolderDao = Depends(dao_provider)) -> dto.Menu:
+async def get_menu(
+        menu_id: int,
+        conditional: ConditionalGet = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Menu:
     try:
+        version = await dao.menu.get_menu_version(menu_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu not found")
+        etag = conditional.etag(version)
+        not_modified = conditional.not_modified(etag)
+        if not_modified:
+            return not_modified
         menu = await dao.menu.get_menu(menu_id)
         if not menu:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu not found")
-        return menu
+        return conditional.apply(DTOResponse(menu), etag)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -51,7 +71,9 @@ async def update_menu(
         updated_menu = await dao.menu.update_menu(menu_id, menu_update)
         if not updated_menu:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Menu not found")
-        return updated_menu
+        return DTOResponse(updated_menu)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -66,5 +88,7 @@ async def delete_menu(menu_id: int, dao: HolderDao = Depends(dao_provider)):
             content={"message": "The menu is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
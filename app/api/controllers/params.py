@@ -1,22 +1,27 @@
-from typing import List
 from fastapi.responses import JSONResponse
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import dao_provider, Pagination
+from app.api.responses import DTOResponse
 from app.infrastructure.database.dao import HolderDao
 
 router = APIRouter(prefix="/parameters", tags=["parameters"])
 
 
-@router.get("/", response_model=List[dto.Parameter])
-async def get_parameters(dao: HolderDao = Depends(dao_provider)) -> List[dto.Parameter]:
+@router.get("/", response_model=dto.Page[dto.Parameter])
+async def get_parameters(
+        pagination: Pagination = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Page[dto.Parameter]:
     try:
-        parameters = await dao.parameters.get_parameters()
-        if not parameters:
+        parameters = await dao.parameters.get_parameters(pagination.after, pagination.limit)
+        if not parameters.items:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parameters not found")
-        return parameters
+        return DTOResponse(parameters)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -28,7 +33,9 @@ async def create_parameter(
 ) -> dto.Parameter:
     try:
         created_parameter = await dao.parameters.add_parameter(parameter)
-        return created_parameter
+        return DTOResponse(created_parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -39,7 +46,9 @@ async def get_parameter(parameter_id: int, dao: HolderDao = Depends(dao_provider
         parameter = await dao.parameters.get_parameter(parameter_id)
         if not parameter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parameter not found")
-        return parameter
+        return DTOResponse(parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -54,7 +63,9 @@ async def update_parameter(
         updated_parameter = await dao.parameters.update_parameter(parameter_id, parameter_update)
         if not updated_parameter:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Parameter not found")
-        return updated_parameter
+        return DTOResponse(updated_parameter)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -69,5 +80,7 @@ async def delete_parameter(parameter_id: int, dao: HolderDao = Depends(dao_provi
             content={"message": "The parameter is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -1,25 +1,96 @@
-from typing import List
-from fastapi.responses import JSONResponse
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import AsyncIterator, List, Optional
+from fastapi.responses import JSONResponse, Response
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, status
 
 from app import dto
 from app.api import schems
-from app.api.dependencies import dao_provider
+from app.api.dependencies import (
+    dao_provider,
+    dao_factory_provider,
+    ConditionalGet,
+    DaoFactory,
+    Pagination,
+    SparseFields
+)
+from app.api.responses import NDJSON_MEDIA_TYPE, DTOResponse, NDJSONResponse, accepts_ndjson
+from app.infrastructure.compression import choose_encoding
 from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT, MAX_BATCH_SIZE, LoadPlan
 
 router = APIRouter(prefix="/restaurants", tags=["restaurants"])
 
 
-@router.get("/", response_model=List[dto.Restaurant])
-async def get_restaurants(search: str, dao: HolderDao = Depends(dao_provider)) -> List[dto.Restaurant]:
+async def stream_restaurants(dao_factory: DaoFactory, after: Optional[int] = None) -> AsyncIterator[dto.Restaurant]:
+    async with dao_factory() as dao:
+        async for restaurant in dao.restaurant.stream_restaurants(after):
+            yield restaurant
+
+
+@router.get(
+    "/",
+    response_model=dto.Page[dto.Restaurant],
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+)
+async def get_restaurants(
+        request: Request,
+        search: str,
+        pagination: Pagination = Depends(),
+        plan: LoadPlan = Depends(SparseFields(dto.Restaurant)),
+        dao: HolderDao = Depends(dao_provider),
+        dao_factory: DaoFactory = Depends(dao_factory_provider)
+) -> dto.Page[dto.Restaurant]:
+    if not search and accepts_ndjson(request):
+        return NDJSONResponse(stream_restaurants(dao_factory, pagination.after))
     try:
         if search:
-            restaurants = await dao.restaurant.get_restaurant_by_name(search)
+            restaurants = await dao.restaurant.get_restaurant_by_name(
+                search, pagination.after, pagination.limit, plan
+            )
         else:
-            restaurants = await dao.restaurant.get_restaurants()
+            restaurants = await dao.restaurant.get_restaurants(pagination.after, pagination.limit, plan)
+        if not restaurants.items:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurants not found")
+        if plan.is_sparse:
+            return DTOResponse(restaurants.model_dump(by_alias=True, exclude_unset=True))
+        return DTOResponse(restaurants)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.post(":batchGet", response_model=dto.Batch[dto.Restaurant])
+async def batch_get_restaurants(
+        ids: List[int] = Body(embed=True, min_length=1, max_length=MAX_BATCH_SIZE),
+        plan: LoadPlan = Depends(SparseFields(dto.Restaurant)),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Batch[dto.Restaurant]:
+    try:
+        restaurants = await dao.restaurant.get_restaurants_by_ids(tuple(ids), plan)
+        if plan.is_sparse:
+            return DTOResponse(restaurants.model_dump(by_alias=True, exclude_unset=True))
+        return DTOResponse(restaurants)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/nearby", response_model=List[dto.NearbyRestaurant])
+async def get_nearby_restaurants(
+        lat: float = Query(ge=-90, le=90, description="Latitude of the point"),
+        lon: float = Query(ge=-180, le=180, description="Longitude of the point"),
+        radius: float = Query(default=3000, gt=0, le=50000, description="Search radius in meters"),
+        limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+        dao: HolderDao = Depends(dao_provider)
+) -> List[dto.NearbyRestaurant]:
+    try:
+        restaurants = await dao.restaurant.get_nearby_restaurants(lat, lon, radius, limit)
         if not restaurants:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurants not found")
-        return restaurants
+        return DTOResponse(restaurants)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -31,18 +102,61 @@ async def create_restaurant(
 ) -> dto.Restaurant:
     try:
         created_restaurant = await dao.restaurant.add_restaurant(restaurant)
-        return created_restaurant
+        return DTOResponse(created_restaurant)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 @router.get("/{restaurant_id}", response_model=dto.Restaurant)
-async def get_restaurant(restaurant_id: int, dao: HolderDao = Depends(dao_provider)) -> dto.Restaurant:
+async def get_restaurant(
+        restaurant_id: int,
+        plan: LoadPlan = Depends(SparseFields(dto.Restaurant)),
+        conditional: ConditionalGet = Depends(),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.Restaurant:
     try:
-        restaurant = await dao.restaurant.get_restaurant(restaurant_id)
+        version = await dao.restaurant.get_restaurant_version(restaurant_id)
+        if version is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
+        etag = conditional.etag(version)
+        not_modified = conditional.not_modified(etag)
+        if not_modified:
+            return not_modified
+        restaurant = await dao.restaurant.get_restaurant(restaurant_id, plan)
         if not restaurant:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
-        return restaurant
+        if plan.is_sparse:
+            return conditional.apply(DTOResponse(restaurant.model_dump(by_alias=True, exclude_unset=True)), etag)
+        return conditional.apply(DTOResponse(restaurant), etag)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+
+@router.get("/{restaurant_id}/menu", response_model=dto.RestaurantMenu)
+async def get_restaurant_menu(
+        restaurant_id: int,
+        request: Request,
+        dao: HolderDao = Depends(dao_provider)
+) -> Response:
+    try:
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None:
+            document = await dao.restaurant.get_restaurant_menu_document(restaurant_id)
+        else:
+            document = await dao.restaurant.get_compressed_restaurant_menu_document(restaurant_id, encoding)
+        if document is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
+        # The document is rendered by Postgres and compressed once per change, pass the bytes through untouched
+        headers = {"Vary": "Accept-Encoding"}
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=document, media_type="application/json", headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -57,7 +171,9 @@ async def update_restaurant(
         updated_restaurant = await dao.restaurant.update_restaurant(restaurant_id, restaurant_update)
         if not updated_restaurant:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Restaurant not found")
-        return updated_restaurant
+        return DTOResponse(updated_restaurant)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -72,6 +188,8 @@ async def delete_restaurant(restaurant_id: int, dao: HolderDao = Depends(dao_pro
             content={"message": "The restaurant is successfully deleted"},
             status_code=status.HTTP_200_OK
         )
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
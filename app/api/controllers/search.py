@@ -0,0 +1,25 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app import dto
+from app.api.dependencies import dao_provider
+from app.api.responses import DTOResponse
+from app.infrastructure.database.dao import HolderDao
+from app.infrastructure.database.dao.rdb import DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=dto.SearchResults)
+async def search(
+        q: str = Query(min_length=1, max_length=100, description="Search text, Latin or Cyrillic"),
+        limit: int = Query(default=DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_SEARCH_LIMIT),
+        dao: HolderDao = Depends(dao_provider)
+) -> dto.SearchResults:
+    try:
+        restaurants = await dao.restaurant.search_restaurants(q, limit)
+        dishes = await dao.dish.search_dishes(q, limit)
+        return DTOResponse(dto.SearchResults(restaurants=restaurants, dishes=dishes))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
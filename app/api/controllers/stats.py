@@ -0,0 +1,30 @@
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies import cache_provider, pool_provider, replicas_provider
+from app.api.responses import DTOResponse
+from app.infrastructure.cache import MemoryCache
+from app.infrastructure.database.factory import pool_stats
+from app.infrastructure.database.routing import ReplicaSet
+from app.infrastructure.database.statements import STATEMENTS, compilation_stats
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+
+@router.get("")
+async def get_stats(
+        cache: Optional[MemoryCache] = Depends(cache_provider),
+        pool: sessionmaker = Depends(pool_provider),
+        replicas: ReplicaSet = Depends(replicas_provider)
+) -> Dict[str, Any]:
+    return DTOResponse({
+        "cache": cache.stats() if cache is not None else None,
+        "singleFlight": cache.flights.stats() if cache is not None else None,
+        "pool": pool_stats(pool),
+        "replicas": replicas.stats(),
+        "statements": {
+            "prebuilt": STATEMENTS.stats(),
+            "compiled": compilation_stats(pool.kw["bind"].sync_engine),
+        },
+    })
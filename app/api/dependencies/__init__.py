@@ -1,16 +1,38 @@
+from typing import Optional
+
 from fastapi import FastAPI
 from sqlalchemy.orm import sessionmaker
 
-from app.config import Settings, load_config
+from app.config import Settings
+from app.infrastructure.cache import MemoryCache
+from app.infrastructure.database.routing import ReplicaSet
 from app.api.dependencies.settings import get_settings
-from app.api.dependencies.database import DbProvider, dao_provider
+from app.api.dependencies.cache import cache_provider
+from app.api.dependencies.database import (
+    DbProvider,
+    DaoFactory,
+    dao_provider,
+    dao_factory_provider,
+    pool_provider,
+    replicas_provider
+)
+from app.api.dependencies.pagination import Pagination
+from app.api.dependencies.filters import dish_filter
+from app.api.dependencies.fields import SparseFields
+from app.api.dependencies.conditional import ConditionalGet
 
 
 def setup(
         app: FastAPI,
         pool: sessionmaker,
         settings: Settings,
+        cache: Optional[MemoryCache] = None,
+        replicas: Optional[ReplicaSet] = None,
 ):
-    db_provider = DbProvider(pool=pool)
+    db_provider = DbProvider(pool=pool, cache=cache, replicas=replicas)
     app.dependency_overrides[dao_provider] = db_provider.dao
-    app.dependency_overrides[get_settings] = load_config
+    app.dependency_overrides[dao_factory_provider] = db_provider.dao_factory
+    app.dependency_overrides[pool_provider] = lambda: pool
+    app.dependency_overrides[replicas_provider] = lambda: db_provider.replicas
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[cache_provider] = lambda: cache
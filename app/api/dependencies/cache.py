@@ -0,0 +1,2 @@
+def cache_provider():
+    ...
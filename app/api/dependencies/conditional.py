@@ -0,0 +1,54 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, Request, Response, status
+
+from app.config import Settings
+from app.api.dependencies.settings import get_settings
+from app.infrastructure.compression import GZIP, BROTLI
+
+# The compression middleware tags compressed representations ("<tag>-gzip"), they still match the plain one
+_ENCODING_SUFFIXES = tuple(f'-{encoding}"' for encoding in (GZIP, BROTLI))
+
+
+def _strip_encoding(tag: str) -> str:
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    for suffix in _ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)] + '"'
+    return tag
+
+
+def match_etag(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    if not if_none_match:
+        return None
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or _strip_encoding(tag) == etag:
+            return etag if tag == "*" else tag
+    return None
+
+
+class ConditionalGet:
+    def __init__(self, request: Request, settings: Settings = Depends(get_settings)):
+        self.request = request
+        self.max_age = settings.http_cache.max_age
+
+    def etag(self, *version: Any) -> str:
+        # the query string selects the representation (fields, filters, cursor), so it is part of the tag
+        key = repr((self.request.url.path, sorted(self.request.query_params.multi_items()), version))
+        return '"' + hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + '"'
+
+    def headers(self, etag: str) -> Dict[str, str]:
+        return {"ETag": etag, "Cache-Control": f"public, max-age={self.max_age}"}
+
+    def not_modified(self, etag: str) -> Optional[Response]:
+        matched = match_etag(self.request.headers.get("if-none-match"), etag)
+        if matched is None:
+            return None
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=self.headers(matched))
+
+    def apply(self, response: Response, etag: str) -> Response:
+        response.headers.update(self.headers(etag))
+        return response
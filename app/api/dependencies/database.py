@@ -1,16 +1,72 @@
+from contextlib import asynccontextmanager
+from typing import AsyncContextManager, AsyncIterator, Callable, Optional
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 
+from app.api.consistency import PRIMARY_COOKIE, SAFE_METHODS
+from app.infrastructure.cache import MemoryCache
 from app.infrastructure.database import HolderDao
+from app.infrastructure.database.routing import ReplicaSet
+
+DaoFactory = Callable[[], AsyncContextManager[HolderDao]]
 
 
 def dao_provider():
     ...
 
 
+def dao_factory_provider():
+    ...
+
+
+def pool_provider():
+    ...
+
+
+def replicas_provider():
+    ...
+
+
 class DbProvider:
-    def __init__(self, pool: sessionmaker):
+    def __init__(self, pool: sessionmaker, cache: Optional[MemoryCache] = None, replicas: Optional[ReplicaSet] = None):
         self.pool = pool
+        self.cache = cache
+        self.replicas = replicas or ReplicaSet([])
+
+    @staticmethod
+    def _pinned(request: Request) -> bool:
+        # Writes, and reads by a client that has just written, see the primary only
+        return request.method not in SAFE_METHODS or PRIMARY_COOKIE in request.cookies
+
+    async def dao(self, request: Request):
+        dao = self._holder(read_replica=not self._pinned(request))
+        try:
+            yield dao
+        finally:
+            await dao.close()
+
+    def dao_factory(self, request: Request) -> DaoFactory:
+        # Streaming responses outlive the request scoped session, so they open their own, pinned the same way
+        read_replica = not self._pinned(request)
+        return lambda: self.open_dao(read_replica)
+
+    @asynccontextmanager
+    async def open_dao(self, read_replica: bool = True) -> AsyncIterator[HolderDao]:
+        dao = self._holder(read_replica=read_replica)
+        try:
+            yield dao
+        finally:
+            await dao.close()
+
+    def _holder(self, read_replica: bool) -> HolderDao:
+        # sessions, and the replica choice, wait for the first query
+        return HolderDao(
+            cache=self.cache,
+            session_factory=self.pool,
+            read_session_factory=self._open_read_session if read_replica and self.replicas else None
+        )
 
-    async def dao(self):
-        async with self.pool() as session:
-            yield HolderDao(session=session)
+    def _open_read_session(self) -> AsyncSession:
+        return self.replicas.choose()()
@@ -0,0 +1,33 @@
+from typing import Optional, Type
+from fastapi import HTTPException, Query, status
+from pydantic import BaseModel
+
+from app.infrastructure.database.dao.rdb import LoadPlan, FULL_PLAN
+
+
+class SparseFields:
+    def __init__(self, dto_class: Type[BaseModel]):
+        self.names = {}
+        for name, field in dto_class.model_fields.items():
+            self.names[name] = name
+            if field.alias:
+                self.names[field.alias] = name
+
+    def __call__(
+            self,
+            fields: Optional[str] = Query(
+                default=None,
+                description="Comma separated fields to return, e.g. id,name,price; all fields when omitted"
+            ),
+    ) -> LoadPlan:
+        if not fields:
+            return FULL_PLAN
+        selected = set()
+        for field in fields.split(","):
+            field = field.strip()
+            if not field:
+                continue
+            if field not in self.names:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown field: {field}")
+            selected.add(self.names[field])
+        return LoadPlan(fields=frozenset(selected))
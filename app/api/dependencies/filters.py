@@ -0,0 +1,50 @@
+import re
+from typing import Optional
+from fastapi import HTTPException, Query, Request, status
+from pydantic import ValidationError
+
+from app.api import schems
+
+# ?param[calories]<=500 reaches us as key "param[calories]<" with value "500"
+PARAM_KEY = re.compile(r"^param\[(?P<name>[^\]]+)\](?P<operator>[<>]?)$")
+OPERATORS = {"": "eq", "<": "le", ">": "ge"}
+
+
+def dish_filter(
+        request: Request,
+        menu_id: Optional[int] = Query(default=None, description="Only dishes of this menu"),
+        price_min: Optional[float] = Query(default=None, ge=0),
+        price_max: Optional[float] = Query(default=None, ge=0),
+) -> schems.DishFilter:
+    conditions = []
+    for key, value in request.query_params.multi_items():
+        if not key.startswith("param"):
+            continue
+        match = PARAM_KEY.match(key)
+        if not match:
+            # e.g. param[weight]<500 without "=", the filter must not silently disappear
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=f"Unrecognised parameter filter {key!r}, use param[name]=, param[name]<= or param[name]>="
+            )
+        operator = OPERATORS[match.group("operator")]
+        if operator != "eq":
+            try:
+                float(value.replace(",", "."))
+            except ValueError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Parameter {match.group('name')} needs a numeric value for comparison"
+                )
+        try:
+            conditions.append(
+                schems.DishParameterCondition(name=match.group("name"), operator=operator, value=value)
+            )
+        except ValidationError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return schems.DishFilter(
+        menu_id=menu_id,
+        price_min=price_min,
+        price_max=price_max,
+        params=tuple(conditions),
+    )
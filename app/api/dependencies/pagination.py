@@ -0,0 +1,25 @@
+from typing import Optional
+from fastapi import HTTPException, Query, status
+
+from app.infrastructure.database.dao.rdb import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, decode_cursor
+
+
+class Pagination:
+    def __init__(
+            self,
+            after: Optional[str] = Query(
+                default=None,
+                description="Cursor returned as nextCursor by the previous page"
+            ),
+            limit: int = Query(
+                default=DEFAULT_PAGE_SIZE,
+                ge=1,
+                le=MAX_PAGE_SIZE,
+                description="Maximum number of items in the page"
+            ),
+    ):
+        try:
+            self.after = decode_cursor(after) if after else None
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        self.limit = limit
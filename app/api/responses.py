@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator
+
+import orjson
+from pydantic import BaseModel
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+
+from app.dto import serialize_time
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+NDJSON_CHUNK_SIZE = 64 * 1024
+
+
+def accepts_ndjson(request: Request) -> bool:
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+class NDJSONResponse(StreamingResponse):
+    media_type = NDJSON_MEDIA_TYPE
+
+    def __init__(self, content: AsyncIterable[BaseModel], **kwargs) -> None:
+        super().__init__(self._render(content), media_type=self.media_type, **kwargs)
+
+    @staticmethod
+    async def _render(content: AsyncIterable[BaseModel]) -> AsyncIterator[bytes]:
+        # one line per item, flushed in chunks so small rows don't cost one send() each
+        buffer = bytearray()
+        async for item in content:
+            buffer += item.model_dump_json(by_alias=True).encode()
+            buffer += b"\n"
+            if len(buffer) >= NDJSON_CHUNK_SIZE:
+                yield bytes(buffer)
+                buffer.clear()
+        if buffer:
+            yield bytes(buffer)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(by_alias=True)
+    if isinstance(value, datetime):
+        return serialize_time(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+# Controllers return DTOs wrapped in it, so FastAPI skips the response_model re-validation and the
+# jsonable_encoder pass; response_model on the route is then only used for the docs.
+class DTOResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.model_dump_json(by_alias=True).encode()
+        return orjson.dumps(content, default=_default, option=orjson.OPT_PASSTHROUGH_DATETIME)
@@ -3,10 +3,15 @@ from .product import (
     DiscountCreateUpdate,
     MenuCreateUpdate,
     DishCreateUpdate,
+    DishUpsert,
+    DishImportRow,
     DishParameterCreateUpdate,
-    ParameterCreateUpdate
+    ParameterCreateUpdate,
+    DishParameterCondition,
+    DishFilter
 )
 from .order import (
     CartCreateUpdate,
     CartItemCreateUpdate,
+    CartItemQuantityUpdate,
 )
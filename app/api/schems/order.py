@@ -15,5 +15,21 @@ class CartItemCreateUpdate(BaseModel):
     )
 
 
+class CartItemQuantityUpdate(BaseModel):
+    delta: int = Field(
+        title="Delta",
+        description="Added to the quantity of the cart item, negative to take some away"
+    )
+
+
 class CartCreateUpdate(BaseModel):
-    items: List[int] = []
+    items: List[int] = Field(
+        default=[],
+        title="Items",
+        description="IDs of existing cart items"
+    )
+    lines: List[CartItemCreateUpdate] = Field(
+        default=[],
+        title="Lines",
+        description="New cart items created with the cart, quantities of the same dish are added up"
+    )
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Annotated, Dict, Literal, Optional, Tuple
 from datetime import datetime
 from pydantic import BaseModel, Field
 
@@ -12,7 +12,8 @@ class DiscountCreateUpdate(BaseModel):
     start_date: Optional[datetime] = Field(
         alias="startDate",
         title="Start Date",
-        description="Start date of the discount validity"
+        description="Start date of the discount validity, now when null",
+        default=None
     )
     end_date: datetime = Field(
         alias="endDate",
@@ -63,6 +64,22 @@ class DishCreateUpdate(BaseModel):
     )
 
 
+class DishUpsert(DishCreateUpdate):
+    id: Optional[int] = Field(
+        title="ID",
+        description="ID of the dish to update, a new dish is created when omitted",
+        default=None
+    )
+
+
+class DishImportRow(DishUpsert):
+    params: Dict[Annotated[str, Field(min_length=1, max_length=255)], Annotated[str, Field(max_length=255)]] = Field(
+        title="Parameters",
+        description="Parameter values by parameter name, missing parameters are created",
+        default={}
+    )
+
+
 class DishParameterCreateUpdate(BaseModel):
     dish_id: int = Field(
         alias="dishId",
@@ -88,3 +105,55 @@ class ParameterCreateUpdate(BaseModel):
         min_length=1,
         max_length=255
     )
+
+
+class DishParameterCondition(BaseModel):
+    name: str = Field(
+        title="Name",
+        description="The name of the parameter"
+    )
+    operator: Literal["eq", "le", "ge"] = Field(
+        title="Operator",
+        description="Comparison applied to the parameter value",
+        default="eq"
+    )
+    value: str = Field(
+        title="Value",
+        description="Value compared with the parameter, numerically for le/ge",
+        max_length=255
+    )
+
+    class Config:
+        frozen = True
+
+
+class DishFilter(BaseModel):
+    menu_id: Optional[int] = Field(
+        alias="menuId",
+        title="Menu ID",
+        description="Only dishes of this menu",
+        default=None
+    )
+    price_min: Optional[float] = Field(
+        alias="priceMin",
+        title="Minimum Price",
+        default=None
+    )
+    price_max: Optional[float] = Field(
+        alias="priceMax",
+        title="Maximum Price",
+        default=None
+    )
+    params: Tuple[DishParameterCondition, ...] = Field(
+        title="Parameter conditions",
+        description="All conditions must hold",
+        default=()
+    )
+
+    class Config:
+        frozen = True
+        populate_by_name = True
+
+    @property
+    def is_empty(self) -> bool:
+        return self.menu_id is None and self.price_min is None and self.price_max is None and not self.params
@@ -1,3 +1,5 @@
+from typing import List
+
 from pydantic_settings import BaseSettings
 
 
@@ -7,6 +9,34 @@ class DB(BaseSettings):
     name: str
     user: str
     password: str
+    replicas: List[str]
+    read_your_writes: int
+
+
+class Pool(BaseSettings):
+    size: int
+    max_overflow: int
+    timeout: float
+    recycle: int
+    pre_ping: bool
+    statement_cache_size: int
+    statement_timeout: int
+    query_cache_size: int
+
+
+class Cache(BaseSettings):
+    max_bytes: int
+    ttl: int
+
+
+class Compression(BaseSettings):
+    minimum_size: int
+    gzip_level: int
+    brotli_quality: int
+
+
+class HttpCache(BaseSettings):
+    max_age: int
 
 
 class SettingsExtractor(BaseSettings):
@@ -15,6 +45,26 @@ class SettingsExtractor(BaseSettings):
     DB__NAME: str
     DB__USER: str
     DB__PASSWORD: str
+    DB__REPLICAS: str = ""
+    DB__READ_YOUR_WRITES: int = 5
+
+    POOL__SIZE: int = 20
+    POOL__MAX_OVERFLOW: int = 10
+    POOL__TIMEOUT: float = 30
+    POOL__RECYCLE: int = 1800
+    POOL__PRE_PING: bool = True
+    POOL__STATEMENT_CACHE_SIZE: int = 100
+    POOL__STATEMENT_TIMEOUT: int = 30000
+    POOL__QUERY_CACHE_SIZE: int = 500
+
+    CACHE__MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE__TTL: int = 300
+
+    COMPRESSION__MINIMUM_SIZE: int = 1024
+    COMPRESSION__GZIP_LEVEL: int = 6
+    COMPRESSION__BROTLI_QUALITY: int = 4
+
+    HTTP_CACHE__MAX_AGE: int = 30
 
     class Config:
         env_file = ".env"
@@ -23,6 +73,10 @@ class SettingsExtractor(BaseSettings):
 
 class Settings(BaseSettings):
     db: DB
+    pool: Pool
+    cache: Cache
+    compression: Compression
+    http_cache: HttpCache
 
 
 def load_config() -> Settings:
@@ -35,5 +89,29 @@ def load_config() -> Settings:
             name=settings.DB__NAME,
             user=settings.DB__USER,
             password=settings.DB__PASSWORD,
+            replicas=[replica.strip() for replica in settings.DB__REPLICAS.split(",") if replica.strip()],
+            read_your_writes=settings.DB__READ_YOUR_WRITES,
+        ),
+        pool=Pool(
+            size=settings.POOL__SIZE,
+            max_overflow=settings.POOL__MAX_OVERFLOW,
+            timeout=settings.POOL__TIMEOUT,
+            recycle=settings.POOL__RECYCLE,
+            pre_ping=settings.POOL__PRE_PING,
+            statement_cache_size=settings.POOL__STATEMENT_CACHE_SIZE,
+            statement_timeout=settings.POOL__STATEMENT_TIMEOUT,
+            query_cache_size=settings.POOL__QUERY_CACHE_SIZE,
+        ),
+        cache=Cache(
+            max_bytes=settings.CACHE__MAX_BYTES,
+            ttl=settings.CACHE__TTL,
+        ),
+        compression=Compression(
+            minimum_size=settings.COMPRESSION__MINIMUM_SIZE,
+            gzip_level=settings.COMPRESSION__GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION__BROTLI_QUALITY,
+        ),
+        http_cache=HttpCache(
+            max_age=settings.HTTP_CACHE__MAX_AGE,
         ),
     )
@@ -0,0 +1,112 @@
+import codecs
+import csv
+import json
+from collections import deque
+from typing import Any, AsyncIterable, AsyncIterator, Deque, Dict, Iterator, NamedTuple, Optional
+
+# CSV columns that describe the dish itself, every other column is a parameter name (e.g. "calories")
+DISH_COLUMNS = ("id", "name", "restaurantId", "price", "menuId")
+# Lines a record may span before an open quote is taken as literal
+MAX_RECORD_LINES = 1000
+
+
+class ImportRecord(NamedTuple):
+    line: int
+    data: Optional[Dict[str, Any]]
+    error: Optional[str] = None
+
+
+async def iter_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[str]:
+    # Decodes and splits as the upload arrives, only the current partial line is kept around
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending.rstrip("\r")
+
+
+class PendingLines:
+    """Lines for one csv.reader, handed over as they arrive. An odd number of quotes means a quoted field
+    is still open and its record continues on a line that has not arrived yet."""
+
+    def __init__(self) -> None:
+        self.lines: Deque[str] = deque()
+        self.quotes = 0
+
+    def __iter__(self) -> "PendingLines":
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        line = self.lines.popleft()
+        self.quotes -= line.count('"')
+        return line
+
+    def append(self, line: str) -> None:
+        self.lines.append(line)
+        self.quotes += line.count('"')
+
+    def complete(self) -> bool:
+        # a stray quote in an unquoted field is literal, the reader settles it once enough lines are in
+        return bool(self.lines) and (self.quotes % 2 == 0 or len(self.lines) > MAX_RECORD_LINES)
+
+
+async def read_csv(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRecord]:
+    # One reader over the whole upload, so quoted fields may span lines (RFC 4180)
+    pending = PendingLines()
+    reader = csv.reader(pending)
+    header = None
+
+    def records(final: bool = False) -> Iterator[ImportRecord]:
+        nonlocal header
+        while pending.complete() or (final and pending.lines):
+            number = reader.line_num + 1
+            cells = next(reader)
+            if not any(cell.strip() for cell in cells):
+                continue
+            if header is None:
+                header = [cell.strip() for cell in cells]
+                continue
+            if len(cells) != len(header):
+                yield ImportRecord(number, None, f"Expected {len(header)} columns, got {len(cells)}")
+                continue
+            data: Dict[str, Any] = {"params": {}}
+            for column, cell in zip(header, cells):
+                cell = cell.strip()
+                if not cell:
+                    continue
+                if column in DISH_COLUMNS:
+                    data[column] = cell
+                else:
+                    data["params"][column] = cell
+            yield ImportRecord(number, data)
+
+    async for line in iter_lines(chunks):
+        pending.append(line + "\n")
+        for record in records():
+            yield record
+    for record in records(final=True):
+        yield record
+
+
+async def read_jsonl(chunks: AsyncIterable[bytes]) -> AsyncIterator[ImportRecord]:
+    number = 0
+    async for line in iter_lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield ImportRecord(number, None, f"Invalid JSON: {e}")
+            continue
+        if not isinstance(data, dict):
+            yield ImportRecord(number, None, "Expected a JSON object")
+            continue
+        yield ImportRecord(number, data)
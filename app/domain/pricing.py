@@ -0,0 +1,47 @@
+from typing import Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+
+class DishPrice(NamedTuple):
+    price: float
+    discounted_price: Optional[float]
+
+
+class PricedLine(NamedTuple):
+    cart_item_id: Optional[int]
+    dish_id: int
+    quantity: int
+    unit_price: float
+    discount: float
+    total_cost: float
+
+
+class CartPrice(NamedTuple):
+    lines: List[PricedLine]
+    subtotal: float
+    discount: float
+    total_cost: float
+
+
+def round_money(value: float) -> float:
+    return round(value, 2)
+
+
+def price_line(cart_item_id: Optional[int], dish_id: int, quantity: int, price: DishPrice) -> PricedLine:
+    # discounted_price is kept current by the database, NULL means no discount is active
+    unit_price = price.price if price.discounted_price is None else price.discounted_price
+    return PricedLine(
+        cart_item_id=cart_item_id,
+        dish_id=dish_id,
+        quantity=quantity,
+        unit_price=unit_price,
+        discount=round_money((price.price - unit_price) * quantity),
+        total_cost=round_money(unit_price * quantity),
+    )
+
+
+def price_cart(items: Iterable[Tuple[Optional[int], int, int]], prices: Mapping[int, DishPrice]) -> CartPrice:
+    # items are (cart item id, dish id, quantity), prices must cover every dish
+    lines = [price_line(cart_item_id, dish_id, quantity, prices[dish_id]) for cart_item_id, dish_id, quantity in items]
+    discount = round_money(sum(line.discount for line in lines))
+    total_cost = round_money(sum(line.total_cost for line in lines))
+    return CartPrice(lines=lines, subtotal=round_money(total_cost + discount), discount=discount, total_cost=total_cost)
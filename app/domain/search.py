@@ -0,0 +1,27 @@
+import re
+
+# Mirrors the search_normalize() SQL function used by the trigram indexes,
+# keep both in sync: Uzbek/Russian Cyrillic is folded into Uzbek Latin,
+# apostrophes (o', g') are dropped and the text is lowercased.
+_MULTI_CHAR = (
+    ("ё", "yo"), ("Ё", "yo"),
+    ("ц", "ts"), ("Ц", "ts"),
+    ("ч", "ch"), ("Ч", "ch"),
+    ("ш", "sh"), ("Ш", "sh"),
+    ("щ", "sh"), ("Щ", "sh"),
+    ("ю", "yu"), ("Ю", "yu"),
+    ("я", "ya"), ("Я", "ya"),
+)
+_SINGLE_FROM = "абвгдежзийклмнопрстуфхыэўқғҳАБВГДЕЖЗИЙКЛМНОПРСТУФХЫЭЎҚҒҲ"
+_SINGLE_TO = "abvgdejziyklmnoprstufxieoqghabvgdejziyklmnoprstufxieoqgh"
+_DROPPED = "ъьЪЬʻʼ’‘`'"
+
+_TRANSLATION = str.maketrans(_SINGLE_FROM, _SINGLE_TO, _DROPPED)
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_search_text(value: str) -> str:
+    for cyrillic, latin in _MULTI_CHAR:
+        value = value.replace(cyrillic, latin)
+    value = value.translate(_TRANSLATION).lower()
+    return _SPACES.sub(" ", value).strip()
@@ -1,10 +1,15 @@
-from .base import Base
+from .base import Base, Time, serialize_time, partial, list_adapter
 from .product import (
     Menu,
     Dish,
     DishParameter,
     Discount,
-    Parameter
+    Parameter,
+    Facet,
+    FacetValue
 )
-from .order import Cart, CartItem
-from .restaurant import Restaurant
+from .order import Cart, CartItem, CartItemChange, PriceLine, PriceBreakdown
+from .restaurant import Restaurant, RestaurantMenu, RestaurantMenuDish, NearbyRestaurant
+from .page import Page, Batch
+from .bulk import BulkItem, ImportRowError, ImportSummary
+from .search import SearchResults
@@ -1,20 +1,42 @@
 from datetime import datetime
+from functools import lru_cache
+from typing import Annotated, List, Optional, Type
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PlainSerializer, TypeAdapter, create_model
 
 
 def serialize_time(value: datetime) -> str:
-    return value.strftime('%d.%m.%Y %H:%M')
+    # same output as strftime('%d.%m.%Y %H:%M') at roughly half the cost, it runs for every timestamp of a page
+    return '%02d.%02d.%04d %02d:%02d' % (value.day, value.month, value.year, value.hour, value.minute)
+
+
+Time = Annotated[datetime, PlainSerializer(serialize_time, return_type=str, when_used="json")]
 
 
 class Base(BaseModel):
     id: int
-    created_at: datetime = Field(alias="createdAt")
-    updated_at: datetime = Field(alias="updatedAt")
+    created_at: Time = Field(alias="createdAt")
+    updated_at: Time = Field(alias="updatedAt")
 
     class Config:
-        json_encoders = {
-            datetime: serialize_time
-        }
         from_attributes = True
         populate_by_name = True
+
+
+@lru_cache(maxsize=None)
+def partial(model: Type[BaseModel]) -> Type[BaseModel]:
+    """Variant of the DTO with every field optional, for sparse fieldsets (dump with exclude_unset)."""
+    fields = {
+        name: (
+            Optional[Annotated[(field.annotation, *field.metadata)] if field.metadata else field.annotation],
+            Field(default=None, alias=field.alias, title=field.title)
+        )
+        for name, field in model.model_fields.items()
+    }
+    return create_model(f"Partial{model.__name__}", __base__=model, **fields)
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """Built once per DTO; TypeAdapter construction is far more expensive than validating a page with it."""
+    return TypeAdapter(List[model])
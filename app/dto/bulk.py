@@ -0,0 +1,84 @@
+from typing import Generic, List, Literal, Optional, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar('T')
+
+
+class BulkItem(BaseModel, Generic[T]):
+    index: int = Field(
+        title='Index',
+        description='Position of the row in the request',
+    )
+    status: Literal['created', 'updated', 'error'] = Field(
+        title='Status',
+        description='What happened to the row',
+    )
+    item: Optional[T] = Field(
+        title='Item',
+        description='The written row',
+        default=None
+    )
+    error: Optional[str] = Field(
+        title='Error',
+        description='Why the row was rejected',
+        default=None
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class ImportRowError(BaseModel):
+    line: int = Field(
+        title='Line',
+        description='Line of the uploaded file',
+    )
+    error: str = Field(
+        title='Error',
+        description='Why the row was rejected',
+    )
+
+
+class ImportSummary(BaseModel):
+    rows: int = Field(
+        title='Rows',
+        description='Rows read from the file',
+        default=0
+    )
+    created: int = Field(
+        title='Created',
+        description='Dishes created',
+        default=0
+    )
+    updated: int = Field(
+        title='Updated',
+        description='Dishes updated',
+        default=0
+    )
+    failed: int = Field(
+        title='Failed',
+        description='Rows rejected',
+        default=0
+    )
+    parameters_created: int = Field(
+        alias='parametersCreated',
+        title='Parameters Created',
+        description='Parameters that did not exist yet',
+        default=0
+    )
+    dish_parameters: int = Field(
+        alias='dishParameters',
+        title='Dish Parameters',
+        description='Dish parameter values written',
+        default=0
+    )
+    errors: List[ImportRowError] = Field(
+        title='Errors',
+        description='Rejected rows, the first ones only',
+        default=[]
+    )
+
+    class Config:
+        populate_by_name = True
@@ -1,9 +1,8 @@
 from uuid import UUID
-from datetime import datetime
 from typing import List, Optional
 from pydantic import Field, BaseModel
 
-from .base import Base, serialize_time
+from .base import Base, Time
 
 
 class CartItem(Base):
@@ -24,6 +23,84 @@ class CartItem(Base):
     )
 
 
+class CartItemChange(BaseModel):
+    item: Optional[CartItem] = Field(
+        title='Cart item',
+        description='The cart item after the change, empty when it was removed',
+        default=None
+    )
+    cart_total_cost: float = Field(
+        alias='cartTotalCost',
+        title='Cart Total Cost',
+        description='The total cost of the cart after the change',
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class PriceLine(BaseModel):
+    cart_item_id: Optional[int] = Field(
+        alias='cartItemId',
+        title='Cart item ID',
+        description='The ID of the priced cart item',
+        default=None
+    )
+    dish_id: int = Field(
+        alias='dishId',
+        title='Dish ID',
+        description='The ID of the dish',
+    )
+    quantity: int = Field(
+        title='Quantity',
+        description='The quantity of the dish',
+    )
+    unit_price: float = Field(
+        alias='unitPrice',
+        title='Unit Price',
+        description='The price of one dish, discounted when a discount is active',
+    )
+    discount: float = Field(
+        title='Discount',
+        description='The amount saved on this line',
+    )
+    total_cost: float = Field(
+        alias='totalCost',
+        title='Total Cost',
+        description='The total cost of the line',
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class PriceBreakdown(BaseModel):
+    lines: List[PriceLine] = Field(
+        default=[],
+        title='Lines',
+        description='The priced cart items',
+    )
+    subtotal: float = Field(
+        title='Subtotal',
+        description='The cost before discounts',
+    )
+    discount: float = Field(
+        title='Discount',
+        description='The amount saved by discounts',
+    )
+    total_cost: float = Field(
+        alias='totalCost',
+        title='Total Cost',
+        description='The cost to pay',
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
 class Cart(BaseModel):
     guid: UUID = Field(
         title='GUID',
@@ -40,12 +117,15 @@ class Cart(BaseModel):
         description='The total cost of the cart item',
         default=None
     )
-    created_at: datetime = Field(alias="createdAt")
-    updated_at: datetime = Field(alias="updatedAt")
+    price_breakdown: Optional[PriceBreakdown] = Field(
+        alias='priceBreakdown',
+        title='Price Breakdown',
+        description='How the total cost was computed, returned when the cart is created or updated',
+        default=None
+    )
+    created_at: Time = Field(alias="createdAt")
+    updated_at: Time = Field(alias="updatedAt")
 
     class Config:
-        json_encoders = {
-            datetime: serialize_time
-        }
         from_attributes = True
         populate_by_name = True
@@ -0,0 +1,39 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T] = Field(
+        default=[],
+        title='Items',
+        description='The items of the current page',
+    )
+    next_cursor: Optional[str] = Field(
+        alias='nextCursor',
+        title='Next Cursor',
+        description='Opaque cursor of the next page, null on the last page',
+        default=None
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
+
+
+class Batch(BaseModel, Generic[T]):
+    items: List[T] = Field(
+        default=[],
+        title='Items',
+        description='The found items in the requested order',
+    )
+    missing: List[int] = Field(
+        default=[],
+        title='Missing',
+        description='Requested IDs that do not exist',
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
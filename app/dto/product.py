@@ -1,8 +1,7 @@
-from pydantic import Field
-from datetime import datetime
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
-from app.dto import Base
+from app.dto import Base, Time
 
 
 class Parameter(Base):
@@ -18,12 +17,12 @@ class Discount(Base):
         title='Dish ID',
         description='The ID of the dish',
     )
-    start_date: datetime = Field(
+    start_date: Time = Field(
         alias='startDate',
         title='Start Date',
         description='The start date of the dish discount',
     )
-    end_date: datetime = Field(
+    end_date: Time = Field(
         alias='endDate',
         title='End Date',
         description='The end date of the dish discount',
@@ -95,3 +94,26 @@ class Menu(Base):
         title='Name',
         description='The name of the menu',
     )
+
+
+class FacetValue(BaseModel):
+    value: str = Field(
+        title='Value',
+        description='The value of the parameter',
+    )
+    count: int = Field(
+        title='Count',
+        description='Number of matching dishes with this value',
+    )
+
+
+class Facet(BaseModel):
+    name: str = Field(
+        title='Name',
+        description='The name of the parameter',
+    )
+    values: List[FacetValue] = Field(
+        default=[],
+        title='Values',
+        description='Values of the parameter among the matching dishes',
+    )
@@ -1,7 +1,7 @@
 from pydantic import Field
-from typing import Optional
+from typing import List, Optional
 
-from app.dto import Base
+from app.dto import Base, Dish, Discount
 
 
 class Restaurant(Base):
@@ -44,3 +44,26 @@ class Restaurant(Base):
         description="Restaurant Phone Number",
         default=None
     )
+
+
+class RestaurantMenuDish(Dish):
+    discount: Optional[Discount] = Field(
+        title="Discount",
+        description="The discount of the dish",
+        default=None
+    )
+
+
+class RestaurantMenu(Restaurant):
+    dishes: List[RestaurantMenuDish] = Field(
+        default=[],
+        title="Dishes",
+        description="The dishes of the restaurant with their parameters and discount",
+    )
+
+
+class NearbyRestaurant(Restaurant):
+    distance: float = Field(
+        title="Distance",
+        description="Distance from the requested point in meters",
+    )
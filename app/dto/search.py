@@ -0,0 +1,21 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.dto import Dish, Restaurant
+
+
+class SearchResults(BaseModel):
+    restaurants: List[Restaurant] = Field(
+        default=[],
+        title='Restaurants',
+        description='Matching restaurants, most relevant first',
+    )
+    dishes: List[Dish] = Field(
+        default=[],
+        title='Dishes',
+        description='Matching dishes, most relevant first',
+    )
+
+    class Config:
+        from_attributes = True
+        populate_by_name = True
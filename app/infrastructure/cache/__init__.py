@@ -0,0 +1,4 @@
+from .memory import MemoryCache, MISSING
+from .singleflight import SingleFlight
+from .decorators import cached
+from .invalidation import CacheInvalidator
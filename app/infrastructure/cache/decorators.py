@@ -0,0 +1,45 @@
+import functools
+import inspect
+from typing import Awaitable, Callable, TypeVar
+
+from .memory import MISSING
+
+T = TypeVar("T")
+
+
+def cached(*tables: str) -> Callable[[Callable[..., Awaitable[T]]], Callable[..., Awaitable[T]]]:
+    """
+    Caches a DAO read method in ``self.cache``, tagged with the tables its result depends on.
+    Concurrent misses for the same call share a single query.
+    """
+
+    def decorator(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        async def wrapper(self, *args, **kwargs) -> T:
+            cache = self.cache
+            if cache is None:
+                return await method(self, *args, **kwargs)
+            # positional, keyword and defaulted spellings of the same call share a key
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key = (method.__qualname__, tuple(bound.arguments.values())[1:])
+            if not cache.enabled:
+                return await cache.flights.do(key, lambda: method(self, *args, **kwargs), tables)
+            value = cache.get(key)
+            if value is MISSING:
+                value = await cache.flights.do(key, lambda: load(self, key, *args, **kwargs), tables)
+            return value
+
+        async def load(self, key, *args, **kwargs) -> T:
+            # taken before the query, an invalidation arriving while it runs keeps the result out of the cache
+            generation = self.cache.generation(tables)
+            value = await method(self, *args, **kwargs)
+            self.cache.set(key, value, tables, generation)
+            return value
+
+        wrapper.__cached_tables__ = tables
+        return wrapper
+
+    return decorator
@@ -0,0 +1,70 @@
+import asyncio
+import logging
+from typing import Callable, Dict, List, Optional
+
+import asyncpg
+
+from .memory import MemoryCache
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "table_changes"
+RECONNECT_DELAY = 5
+
+
+class CacheInvalidator:
+    """Listens for ``table_changes`` notifications raised by database triggers and drops
+    the cache entries tagged with the changed table, whichever writer (API or admin) made the change."""
+
+    def __init__(self, dsn: str, cache: MemoryCache):
+        self.dsn = dsn
+        self.cache = cache
+        # Entries can't be trusted until notifications are being received
+        self.cache.enabled = False
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def subscribe(self, table: str, callback: Callable[[str], None]) -> None:
+        # Called with the table name after its cache entries were dropped
+        self._subscribers.setdefault(table, []).append(callback)
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.cache.invalidate(payload)
+        for callback in self._subscribers.get(payload, ()):
+            callback(payload)
+
+    async def _run(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.Event()
+                connection.add_termination_listener(lambda _: closed.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                # Anything written while we were not listening is unknown, start from scratch
+                self.cache.clear()
+                self.cache.enabled = True
+                await closed.wait()
+                logger.warning("Cache invalidation connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Cache invalidation listener failed: %s", e)
+            finally:
+                self.cache.enabled = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            self.cache.clear()
+            await asyncio.sleep(RECONNECT_DELAY)
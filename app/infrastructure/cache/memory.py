@@ -0,0 +1,125 @@
+import sys
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from .singleflight import SingleFlight
+
+MISSING = object()
+
+
+def estimate_size(value: Any) -> int:
+    # Serialised size is a stable, cheap-enough proxy for the memory a DTO graph holds
+    if isinstance(value, BaseModel):
+        return len(value.model_dump_json())
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, (list, tuple)):
+        return sum(estimate_size(item) for item in value) + sys.getsizeof(value)
+    return sys.getsizeof(value)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    size: int
+    expires_at: float
+    tags: Tuple[str, ...]
+
+
+class MemoryCache:
+    def __init__(self, max_bytes: int, ttl: float):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.enabled = True
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.flights = SingleFlight()
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._tags: Dict[str, Set[Hashable]] = {}
+        # bumped by every invalidation of the tag, clear() bumps them all
+        self._generations: Dict[str, int] = {}
+        self._epoch = 0
+
+    def generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return (self._epoch, *(self._generations.get(tag, 0) for tag in tags))
+
+    def get(self, key: Hashable) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self.misses += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry.value
+
+    def set(
+            self,
+            key: Hashable,
+            value: Any,
+            tags: Iterable[str] = (),
+            generation: Optional[Tuple[int, ...]] = None
+    ) -> None:
+        tags = tuple(tags)
+        # a value loaded before an invalidation of its tags may predate the change, it is not stored
+        if generation is not None and generation != self.generation(tags):
+            return
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        entry = CacheEntry(value=value, size=size, expires_at=time.monotonic() + self.ttl, tags=tags)
+        self._entries[key] = entry
+        self.size += size
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def invalidate(self, *tags: str) -> None:
+        self.flights.forget(*tags)
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+            for key in self._tags.pop(tag, set()):
+                self._remove(key)
+
+    def clear(self) -> None:
+        self._epoch += 1
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "size": self.size,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
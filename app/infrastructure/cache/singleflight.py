@@ -0,0 +1,74 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Concurrent calls with the same key share one in-flight execution and its result."""
+
+    def __init__(self) -> None:
+        self.executions = 0
+        self.collapsed = 0
+        self._calls: Dict[Hashable, Tuple[asyncio.Future, Tuple[str, ...]]] = {}
+        self._tags: Dict[str, Set[Hashable]] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]], tags: Iterable[str] = ()) -> T:
+        call = self._calls.get(key)
+        if call is not None:
+            self.collapsed += 1
+            future = call[0]
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # the leading request went away before finishing, run the call ourselves
+            return await fn()
+
+        future = asyncio.get_running_loop().create_future()
+        tags = tuple(tags)
+        self._calls[key] = (future, tags)
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        self.executions += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # followers re-raise it, without them nobody would retrieve it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._discard(key, future)
+
+    def forget(self, *tags: str) -> None:
+        # calls already running may have read data older than the change, later callers start afresh
+        for tag in tags:
+            for key in self._tags.pop(tag, set()):
+                self._calls.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inFlight": len(self._calls),
+            "executions": self.executions,
+            "collapsed": self.collapsed,
+        }
+
+    def _discard(self, key: Hashable, future: asyncio.Future) -> None:
+        call = self._calls.get(key)
+        if call is None or call[0] is not future:
+            return
+        del self._calls[key]
+        for tag in call[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
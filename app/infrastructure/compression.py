@@ -0,0 +1,82 @@
+import gzip
+import zlib
+from typing import Dict, Optional
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses fall back to gzip without it
+    brotli = None
+
+GZIP = "gzip"
+BROTLI = "br"
+IDENTITY = "identity"
+
+# Cached documents are compressed once and served many times, so they get the slow, dense settings
+PRECOMPRESSED_GZIP_LEVEL = 9
+PRECOMPRESSED_BROTLI_QUALITY = 9
+
+COMPRESSIBLE_MEDIA_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+
+def _parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        if not name:
+            continue
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[name.strip().lower()] = weight
+    return weights
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """The client's most preferred encoding, ours (br, then gzip) only breaks ties; None for identity."""
+    weights = _parse_accept_encoding(accept_encoding)
+    default = weights.get("*", 0.0)
+    supported = (BROTLI, GZIP) if brotli is not None else (GZIP,)
+    best, best_weight = None, 0.0
+    for encoding in supported:
+        weight = weights.get(encoding, default)
+        if weight > best_weight:
+            best, best_weight = encoding, weight
+    # Identity is only weighed when the client ranks it explicitly
+    if weights.get(IDENTITY, 0.0) > best_weight:
+        return None
+    return best
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith(COMPRESSIBLE_MEDIA_TYPES)
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == BROTLI:
+        return brotli.compress(data, quality=PRECOMPRESSED_BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=PRECOMPRESSED_GZIP_LEVEL, mtime=0)
+
+
+class Compressor:
+    """Incremental compressor, every chunk is flushed so streamed responses stay streamed."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int) -> None:
+        self.encoding = encoding
+        if encoding == BROTLI:
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._gzip = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, chunk: bytes) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.process(chunk) + self._brotli.flush()
+        return self._gzip.compress(chunk) + self._gzip.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == BROTLI:
+            return self._brotli.finish()
+        return self._gzip.flush(zlib.Z_FINISH)
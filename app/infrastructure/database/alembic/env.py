@@ -15,7 +15,7 @@ config = context.config
 settings = load_config()
 
 
-config.set_main_option("sqlalchemy.url", make_connection_string(settings))
+config.set_main_option("sqlalchemy.url", make_connection_string(settings, async_fallback=True))
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
 if config.config_file_name is not None:
@@ -0,0 +1,79 @@
+"""discounted price triggers
+
+Revision ID: 7d2e9c4f1a86
+Revises: e3b58d0a7c21
+Create Date: 2026-10-18 15:02:19.640381
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7d2e9c4f1a86'
+down_revision: Union[str, None] = 'e3b58d0a7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Writes to a discount update its dish in the same statement, whichever writer (API or admin) made them.
+    # updated_at moves with discounted_price, it is what dish versions (ETags) are made of. A discount larger
+    # than the price makes the dish free, not negative.
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION discount_sync_discounted_price() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD.dish_id <> NEW.dish_id) THEN
+                UPDATE dishes SET discounted_price = NULL, updated_at = now()
+                WHERE id = OLD.dish_id AND discounted_price IS NOT NULL;
+            END IF;
+            IF TG_OP <> 'DELETE' THEN
+                UPDATE dishes SET discounted_price = CASE
+                    WHEN NEW.is_active AND NEW.start_date <= now() AND NEW.end_date >= now()
+                    THEN GREATEST(price - NEW.price, 0)
+                END, updated_at = now()
+                WHERE id = NEW.dish_id;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER discounts_sync_discounted_price
+        AFTER INSERT OR UPDATE OR DELETE ON discounts
+        FOR EACH ROW EXECUTE FUNCTION discount_sync_discounted_price()
+        """
+    )
+    # A new dish price carries the active discount over
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION dish_sync_discounted_price() RETURNS trigger AS $$
+        BEGIN
+            NEW.discounted_price := (
+                SELECT GREATEST(NEW.price - price, 0) FROM discounts
+                WHERE dish_id = NEW.id AND is_active AND start_date <= now() AND end_date >= now()
+            );
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER dishes_sync_discounted_price
+        BEFORE UPDATE OF price ON dishes
+        FOR EACH ROW EXECUTE FUNCTION dish_sync_discounted_price()
+        """
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS dishes_sync_discounted_price ON dishes")
+    op.execute("DROP FUNCTION IF EXISTS dish_sync_discounted_price()")
+    op.execute("DROP TRIGGER IF EXISTS discounts_sync_discounted_price ON discounts")
+    op.execute("DROP FUNCTION IF EXISTS discount_sync_discounted_price()")
@@ -0,0 +1,43 @@
+"""dish parameter facet indexes
+
+Revision ID: 9a4f7e2b6c15
+Revises: 5c8d13e6a9f0
+Create Date: 2026-10-18 14:22:53.870164
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a4f7e2b6c15'
+down_revision: Union[str, None] = '5c8d13e6a9f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'dish_parameters',
+        sa.Column(
+            'numeric_value',
+            sa.Float(),
+            sa.Computed(
+                r"replace(substring(value from '-?[0-9]+(?:[.,][0-9]+)?'), ',', '.')::double precision",
+                persisted=True
+            ),
+            nullable=True
+        )
+    )
+    op.create_index('ix_dish_parameters_key_value_dish', 'dish_parameters', ['key_id', 'value', 'dish_id'])
+    op.create_index('ix_dish_parameters_key_numeric_dish', 'dish_parameters', ['key_id', 'numeric_value', 'dish_id'])
+    op.create_index('ix_dishes_menu_id_price', 'dishes', ['menu_id', 'price'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_dishes_menu_id_price', table_name='dishes')
+    op.drop_index('ix_dish_parameters_key_numeric_dish', table_name='dish_parameters')
+    op.drop_index('ix_dish_parameters_key_value_dish', table_name='dish_parameters')
+    op.drop_column('dish_parameters', 'numeric_value')
@@ -0,0 +1,54 @@
+"""trigram search indexes
+
+Revision ID: b71e04c9d2a3
+Revises: 3f9c2a7d1b04
+Create Date: 2026-10-18 11:40:02.518930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b71e04c9d2a3'
+down_revision: Union[str, None] = '3f9c2a7d1b04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    # Must stay in sync with app.domain.search.normalize_search_text
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION search_normalize(value text) RETURNS text AS $$
+            SELECT btrim(regexp_replace(lower(translate(
+                replace(replace(replace(replace(replace(replace(replace(
+                replace(replace(replace(replace(replace(replace(replace(value,
+                    'ё', 'yo'), 'Ё', 'yo'),
+                    'ц', 'ts'), 'Ц', 'ts'),
+                    'ч', 'ch'), 'Ч', 'ch'),
+                    'ш', 'sh'), 'Ш', 'sh'),
+                    'щ', 'sh'), 'Щ', 'sh'),
+                    'ю', 'yu'), 'Ю', 'yu'),
+                    'я', 'ya'), 'Я', 'ya'),
+                'абвгдежзийклмнопрстуфхыэўқғҳАБВГДЕЖЗИЙКЛМНОПРСТУФХЫЭЎҚҒҲъьЪЬʻʼ’‘`''',
+                'abvgdejziyklmnoprstufxieoqghabvgdejziyklmnoprstufxieoqgh'
+            )), '\\s+', ' ', 'g'))
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        """
+    )
+    op.execute(
+        "CREATE INDEX ix_restaurants_name_trgm ON restaurants USING gin (search_normalize(name) gin_trgm_ops)"
+    )
+    op.execute(
+        "CREATE INDEX ix_dishes_name_trgm ON dishes USING gin (search_normalize(name) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_dishes_name_trgm")
+    op.execute("DROP INDEX IF EXISTS ix_restaurants_name_trgm")
+    op.execute("DROP FUNCTION IF EXISTS search_normalize(text)")
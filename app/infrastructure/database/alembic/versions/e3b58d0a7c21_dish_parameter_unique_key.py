@@ -0,0 +1,34 @@
+"""dish parameter unique key
+
+Revision ID: e3b58d0a7c21
+Revises: 9a4f7e2b6c15
+Create Date: 2026-10-18 16:05:12.418230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b58d0a7c21'
+down_revision: Union[str, None] = '9a4f7e2b6c15'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # keep the most recent value when a dish has the same parameter more than once
+    op.execute("""
+        DELETE FROM dish_parameters AS older
+        USING dish_parameters AS newer
+        WHERE older.dish_id = newer.dish_id
+          AND older.key_id = newer.key_id
+          AND older.id < newer.id
+    """)
+    op.create_unique_constraint('uq_dish_parameters_dish_key', 'dish_parameters', ['dish_id', 'key_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_dish_parameters_dish_key', 'dish_parameters', type_='unique')
@@ -1,5 +1,10 @@
+from functools import cached_property
+from typing import Any, Callable, List, Optional, Type
+
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.infrastructure.cache import MemoryCache
+
 from app.infrastructure.database.dao.rdb import (
     BaseDAO,
     RestaurantDAO,
@@ -7,21 +12,96 @@ from app.infrastructure.database.dao.rdb import (
     DiscountDAO,
     DishDAO,
     DishParameterDAO,
+    DishImportDAO,
     CartDAO,
     CartItemDAO,
     ParametersDAO
 )
+from app.infrastructure.database.routing import ReadRouter
 
 
 class HolderDao:
-    def __init__(self, session: AsyncSession):
-        self.session = session
+    """
+    DAOs are built on first use, and with factories instead of sessions the sessions are opened on first use
+    too: a request answered from the cache builds nothing and never touches the pool.
+    """
+
+    def __init__(
+            self,
+            session: Optional[AsyncSession] = None,
+            cache: Optional[MemoryCache] = None,
+            read_session: Optional[AsyncSession] = None,
+            session_factory: Optional[Callable[[], AsyncSession]] = None,
+            read_session_factory: Optional[Callable[[], AsyncSession]] = None
+    ):
+        self._session = session
+        self._read_session = read_session
+        self._session_factory = session_factory
+        self._read_session_factory = read_session_factory
+        self._opened: List[AsyncSession] = []
+        self.cache = cache
         self.base = BaseDAO
-        self.restaurant = RestaurantDAO(self.session)
-        self.menu = MenuDAO(self.session)
-        self.parameters = ParametersDAO(self.session)
-        self.dish = DishDAO(self.session)
-        self.dish_parameter = DishParameterDAO(self.session)
-        self.discount = DiscountDAO(self.session)
-        self.cart = CartDAO(self.session)
-        self.cart_item = CartItemDAO(self.session)
+
+    @property
+    def session(self) -> AsyncSession:
+        if self._session is None:
+            self._session = self._open(self._session_factory)
+        return self._session
+
+    @property
+    def read_session(self) -> Optional[AsyncSession]:
+        if self._read_session is None and self._read_session_factory is not None:
+            self._read_session = self._open(self._read_session_factory)
+        return self._read_session
+
+    def _open(self, factory: Callable[[], AsyncSession]) -> AsyncSession:
+        session = factory()
+        self._opened.append(session)
+        return session
+
+    async def close(self) -> None:
+        # Only the sessions opened here, passed in ones belong to the caller
+        for session in self._opened:
+            await session.close()
+        self._opened.clear()
+
+    @cached_property
+    def restaurant(self) -> RestaurantDAO:
+        return self._dao(RestaurantDAO, self.cache)
+
+    @cached_property
+    def menu(self) -> MenuDAO:
+        return self._dao(MenuDAO, self.cache)
+
+    @cached_property
+    def parameters(self) -> ParametersDAO:
+        return self._dao(ParametersDAO, self.cache)
+
+    @cached_property
+    def dish(self) -> DishDAO:
+        return self._dao(DishDAO, self.cache)
+
+    @cached_property
+    def dish_parameter(self) -> DishParameterDAO:
+        return self._dao(DishParameterDAO)
+
+    @cached_property
+    def dish_import(self) -> DishImportDAO:
+        return DishImportDAO(self.session)
+
+    @cached_property
+    def discount(self) -> DiscountDAO:
+        return self._dao(DiscountDAO)
+
+    @cached_property
+    def cart(self) -> CartDAO:
+        return self._dao(CartDAO)
+
+    @cached_property
+    def cart_item(self) -> CartItemDAO:
+        return self._dao(CartItemDAO)
+
+    def _dao(self, dao: Type[BaseDAO], *args: Any) -> Any:
+        if self._read_session is None and self._read_session_factory is None:
+            return dao(self.session, *args)
+        return ReadRouter(dao(self.session, *args), lambda: dao(self.read_session, *args))
@@ -1,4 +1,16 @@
-from .base import BaseDAO
+from .plan import LoadPlan, FULL_PLAN
+from .base import (
+    BaseDAO,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    DEFAULT_SEARCH_LIMIT,
+    MAX_SEARCH_LIMIT,
+    MAX_BATCH_SIZE,
+    MAX_BULK_SIZE,
+    encode_cursor,
+    decode_cursor
+)
 from .restaurant import RestaurantDAO
 from .product import MenuDAO, DishDAO, DishParameterDAO, DiscountDAO, ParametersDAO
 from .order import CartDAO, CartItemDAO
+from .importer import DishImportDAO
@@ -1,29 +1,111 @@
+import base64
+import binascii
+import re
 from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
     List,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
     TypeVar,
     Type,
-    Generic
+    Generic,
+    Union
 )
 
-from pydantic import TypeAdapter
-from sqlalchemy import delete, func
+from fastapi import HTTPException
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import (
+    BigInteger, Executable, Row, any_, bindparam, delete, func, inspect, literal, literal_column, or_, update, Select
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
+from sqlalchemy.orm import load_only
 from sqlalchemy.orm.strategy_options import Load
 
+from app import dto
+
+from app.infrastructure.cache import MemoryCache
 from app.infrastructure.database.models import Base
+from app.infrastructure.database.statements import STATEMENTS
+from .plan import LoadPlan, FULL_PLAN
 
 Model = TypeVar("Model", Base, Base)
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+STREAM_BATCH_SIZE = 500
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+MAX_BATCH_SIZE = 100
+MAX_BULK_SIZE = 5000
+# rows per INSERT, keeps a statement well under the 32767 bind parameters Postgres accepts
+BULK_CHUNK_SIZE = 1000
+
+
+# Referenced tables as named in error messages
+TABLE_LABELS = {
+    "restaurants": "Restaurant",
+    "menus": "Menu",
+    "dishes": "Dish",
+    "parameters": "Parameter",
+    "carts": "Cart",
+    "cart_items": "Cart item",
+}
+_KEY = re.compile(
+    r'Key \((?P<columns>.+?)\)=\((?P<values>.*?)\) '
+    r'(?P<problem>is not present|is still referenced|already exists)'
+    r'(?: (?:in|from) table "(?P<table>\w+)")?'
+)
+
+
+def integrity_error(error: IntegrityError) -> HTTPException:
+    """The constraint violation behind a failed write as the response it deserves, instead of checking first."""
+    cause = error.orig.__cause__ if error.orig is not None else None
+    sqlstate = getattr(cause, "sqlstate", None)
+    detail = getattr(cause, "detail", None) or ""
+    key = _KEY.match(detail)
+    if sqlstate == "23503" and key and key["problem"] == "is not present":
+        label = TABLE_LABELS.get(key["table"], key["table"])
+        return HTTPException(status_code=404, detail=f"{label} with id {key['values']} not found")
+    if sqlstate == "23503" and key:
+        return HTTPException(status_code=409, detail=f"Id {key['values']} is still used by {key['table']}")
+    if sqlstate == "23505":
+        return HTTPException(status_code=409, detail=detail or "Already exists")
+    if sqlstate in ("23502", "23514"):
+        return HTTPException(status_code=422, detail=getattr(cause, "message", None) or str(cause))
+    return HTTPException(status_code=409, detail=detail or str(cause))
+
+
+def encode_cursor(id_: int) -> str:
+    return base64.urlsafe_b64encode(str(id_).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return int(base64.urlsafe_b64decode(padded.encode()).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
 
 class BaseDAO(Generic[Model]):
     def __init__(
             self,
             model: Type[Model],
             session: AsyncSession,
+            cache: Optional[MemoryCache] = None,
     ):
         self.model = model
         self.session = session
+        self.cache = cache
 
     async def _get_all(
             self,
@@ -43,6 +125,179 @@ class BaseDAO(Generic[Model]):
         result = await self.session.execute(query)
         return result.scalar_one()
 
+    def _plan_options(
+            self,
+            plan: LoadPlan = FULL_PLAN,
+            relationships: Optional[Dict[str, Load]] = None,
+    ) -> List[Load]:
+        # Only the columns and relationships that end up serialised are queried
+        options = []
+        if plan.is_sparse:
+            columns = [
+                attribute for attribute in inspect(self.model).column_attrs
+                if attribute.key in plan.fields
+            ]
+            options.append(load_only(self.model.id, *(attribute.class_attribute for attribute in columns)))
+        for name, load in (relationships or {}).items():
+            if plan.includes(name):
+                options.append(load)
+        return options
+
+    @staticmethod
+    def _dto_class(dto_class: Type[BaseModel], plan: LoadPlan = FULL_PLAN) -> Type[BaseModel]:
+        return dto.partial(dto_class) if plan.is_sparse else dto_class
+
+    @staticmethod
+    def _to_dto(dto_class: Type[BaseModel], obj: Model, plan: LoadPlan = FULL_PLAN) -> BaseModel:
+        if not plan.is_sparse:
+            return dto_class.model_validate(obj.__dict__, from_attributes=True)
+        values = {name: value for name, value in obj.__dict__.items() if name in plan.fields}
+        return dto.partial(dto_class).model_validate(values, from_attributes=True)
+
+    def _statement(
+            self,
+            key: Tuple,
+            build: Callable[[], Executable],
+    ) -> Executable:
+        return STATEMENTS.get((self.model.__name__, *key), build)
+
+    def _plan_query(
+            self,
+            plan: LoadPlan = FULL_PLAN,
+            relationships: Optional[Callable[[], Dict[str, Load]]] = None,
+    ) -> Select:
+        return select(self.model).options(*self._plan_options(plan, relationships() if relationships else None))
+
+    async def _get(
+            self,
+            id_: int,
+            plan: LoadPlan = FULL_PLAN,
+            relationships: Optional[Callable[[], Dict[str, Load]]] = None,
+    ) -> Optional[Model]:
+        query = self._statement(
+            ("get", plan), lambda: self._plan_query(plan, relationships).where(self.model.id == bindparam("id"))
+        )
+        result = await self.session.execute(query, {"id": id_})
+        return result.scalar_one_or_none()
+
+    async def _get_many(
+            self,
+            ids: Sequence[int],
+            plan: LoadPlan = FULL_PLAN,
+            relationships: Optional[Callable[[], Dict[str, Load]]] = None,
+    ) -> Tuple[List[Model], List[int]]:
+        # One "id = ANY(:ids)" round trip; results follow the requested order, unknown ids are reported back
+        query = self._statement(("get_many", plan), lambda: self._plan_query(plan, relationships).where(
+            self.model.id == any_(bindparam("ids", type_=ARRAY(BigInteger)))
+        ))
+        result = await self.session.execute(query, {"ids": list(ids)})
+        found = {obj.id: obj for obj in result.scalars().all()}
+        requested = list(dict.fromkeys(ids))
+        return [found[id_] for id_ in requested if id_ in found], [id_ for id_ in requested if id_ not in found]
+
+    async def _existing_ids(self, *targets: Tuple[Type[Base], Iterable[int]]) -> List[Set[int]]:
+        # One round trip for all foreign key checks of a bulk write: an array of the found ids per target
+        query = select(*(
+            select(func.array_agg(model.id)).where(
+                model.id == any_(bindparam(None, list(set(ids)), type_=ARRAY(BigInteger)))
+            ).scalar_subquery()
+            for model, ids in targets
+        ))
+        result = await self.session.execute(query)
+        return [set(found or ()) for found in result.one()]
+
+    async def _allocate_ids(self, count: int) -> List[int]:
+        if not count:
+            return []
+        query = select(func.nextval(func.pg_get_serial_sequence(self.model.__tablename__, "id"))).select_from(
+            func.generate_series(1, count)
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def _upsert(
+            self,
+            rows: Sequence[Dict],
+            index_elements: Sequence[str],
+            update_columns: Sequence[str],
+    ) -> List[Row]:
+        # INSERT ... ON CONFLICT DO UPDATE ... RETURNING, "created" tells inserted rows from updated ones
+        table = self.model.__table__
+        written = []
+        for start in range(0, len(rows), BULK_CHUNK_SIZE):
+            statement = insert(table).values(rows[start:start + BULK_CHUNK_SIZE])
+            statement = statement.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={**{name: statement.excluded[name] for name in update_columns}, "updated_at": func.now()},
+            ).returning(*table.c, literal_column("xmax = 0").label("created"))
+            result = await self.session.execute(statement)
+            written.extend(result.all())
+        return written
+
+    def _page_query(
+            self,
+            query: Select,
+            after: bool,
+    ) -> Select:
+        if after:
+            query = query.where(self.model.id > bindparam("after"))
+        return query.order_by(self.model.id).limit(bindparam("limit"))
+
+    async def _paginate(
+            self,
+            query: Union[Select, Callable[[], Select]],
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            key: Tuple = (),
+    ) -> Tuple[List[Model], Optional[str]]:
+        # A builder is built once per key, a query (filters, search terms) is taken as is
+        if callable(query):
+            build = query
+            query = self._statement(
+                ("page", after is not None, *key), lambda: self._page_query(build(), after is not None)
+            )
+        else:
+            query = self._page_query(query, after is not None)
+        # one extra row tells whether a next page exists
+        params = {"limit": limit + 1} if after is None else {"after": after, "limit": limit + 1}
+        result = await self.session.execute(query, params)
+        rows = list(result.scalars().all())
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].id)
+        return rows, next_cursor
+
+    def _search_conditions(
+            self,
+            column,
+            query: str,
+    ):
+        # Matches the gin_trgm_ops index on search_normalize(column): substring hits plus fuzzy word hits.
+        # Nothing left after normalization would be a substring of every row.
+        if not query:
+            raise HTTPException(status_code=422, detail="Search text is blank once spaces and apostrophes are removed")
+        normalized = func.search_normalize(column)
+        condition = or_(
+            normalized.contains(query, autoescape=True),
+            literal(query).op("<%")(normalized),
+        )
+        return condition, func.word_similarity(query, normalized)
+
+    async def _stream(
+            self,
+            query: Select,
+            after: Optional[int] = None,
+            batch_size: int = STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Model]:
+        if after is not None:
+            query = query.where(self.model.id > after)
+        query = query.order_by(self.model.id).execution_options(yield_per=batch_size)
+        result = await self.session.stream_scalars(query)
+        async for partition in result.partitions():
+            for obj in partition:
+                yield obj
+
     def _save(
             self,
             obj: Model,
@@ -71,5 +326,33 @@ class BaseDAO(Generic[Model]):
     ):
         await self.session.commit()
 
+    async def _write(self, statement: Executable) -> List[Row]:
+        # One statement and the commit, constraints do the checking
+        try:
+            result = await self.session.execute(statement)
+            rows = result.all()
+            await self.session.commit()
+        except IntegrityError as e:
+            await self.session.rollback()
+            raise integrity_error(e) from e
+        return rows
+
+    async def _insert(self, values: Dict[str, Any]) -> Row:
+        rows = await self._write(insert(self.model).values(**values).returning(*self.model.__table__.c))
+        return rows[0]
+
+    async def _update(self, obj_id: int, values: Dict[str, Any]) -> Optional[Row]:
+        if not values:
+            result = await self.session.execute(select(*self.model.__table__.c).where(self.model.id == obj_id))
+            return result.one_or_none()
+        rows = await self._write(
+            update(self.model).where(self.model.id == obj_id).values(**values).returning(*self.model.__table__.c)
+        )
+        return rows[0] if rows else None
+
+    async def _delete_by_id(self, obj_id: int) -> bool:
+        rows = await self._write(delete(self.model).where(self.model.id == obj_id).returning(self.model.id))
+        return bool(rows)
+
     async def _flush(self, *objects):
         await self.session.flush(objects)
@@ -0,0 +1,170 @@
+import logging
+from typing import AsyncIterable, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import dto
+from app.api import schems
+from .base import BaseDAO
+from app.infrastructure.database.models import Dish
+
+logger = logging.getLogger(__name__)
+
+IMPORT_BATCH_SIZE = 5000
+MAX_IMPORT_ERRORS = 1000
+
+CREATE_STAGING = (
+    text("""
+        CREATE TEMP TABLE import_dishes (
+            line integer NOT NULL,
+            id bigint NOT NULL,
+            existing boolean NOT NULL,
+            name text NOT NULL,
+            restaurant_id integer NOT NULL,
+            price double precision NOT NULL,
+            menu_id integer NOT NULL
+        ) ON COMMIT DROP
+    """),
+    text("""
+        CREATE TEMP TABLE import_params (
+            line integer NOT NULL,
+            dish_id bigint NOT NULL,
+            name text NOT NULL,
+            value text NOT NULL
+        ) ON COMMIT DROP
+    """),
+)
+
+# Drops staged rows whose foreign keys do not resolve, together with their parameters (by line, another row
+# may stage the same dish id)
+REJECT_QUERY = text("""
+WITH rejected AS (
+    DELETE FROM import_dishes i
+    WHERE NOT EXISTS (SELECT 1 FROM restaurants r WHERE r.id = i.restaurant_id)
+       OR NOT EXISTS (SELECT 1 FROM menus m WHERE m.id = i.menu_id)
+       OR (i.existing AND NOT EXISTS (SELECT 1 FROM dishes d WHERE d.id = i.id))
+    RETURNING i.line, i.id, CASE
+        WHEN NOT EXISTS (SELECT 1 FROM restaurants r WHERE r.id = i.restaurant_id)
+            THEN 'Restaurant with id ' || i.restaurant_id || ' not found'
+        WHEN NOT EXISTS (SELECT 1 FROM menus m WHERE m.id = i.menu_id)
+            THEN 'Menu with id ' || i.menu_id || ' not found'
+        ELSE 'Dish with id ' || i.id || ' not found'
+    END AS error
+), dropped AS (
+    DELETE FROM import_params p USING rejected r WHERE p.line = r.line
+)
+SELECT line, error FROM rejected ORDER BY line
+""")
+
+MERGE_PARAMETERS_QUERY = text("""
+INSERT INTO parameters (name, created_at, updated_at)
+SELECT DISTINCT p.name, now(), now()
+FROM import_params p
+WHERE NOT EXISTS (SELECT 1 FROM parameters k WHERE k.name = p.name)
+""")
+
+# The last line wins when a file mentions the same dish twice
+MERGE_DISHES_QUERY = text("""
+WITH written AS (
+    INSERT INTO dishes (id, name, price, restaurant_id, menu_id, updated_at)
+    SELECT DISTINCT ON (id) id, name, price, restaurant_id, menu_id, now()
+    FROM import_dishes
+    ORDER BY id, line DESC
+    ON CONFLICT (id) DO UPDATE SET
+        name = excluded.name,
+        price = excluded.price,
+        restaurant_id = excluded.restaurant_id,
+        menu_id = excluded.menu_id,
+        updated_at = excluded.updated_at
+    RETURNING xmax = 0 AS created
+)
+SELECT count(*) FILTER (WHERE created), count(*) FILTER (WHERE NOT created) FROM written
+""")
+
+MERGE_DISH_PARAMETERS_QUERY = text("""
+INSERT INTO dish_parameters (dish_id, key_id, value, updated_at)
+SELECT DISTINCT ON (p.dish_id, k.id) p.dish_id, k.id, p.value, now()
+FROM import_params p
+CROSS JOIN LATERAL (SELECT id FROM parameters WHERE name = p.name ORDER BY id LIMIT 1) k
+ORDER BY p.dish_id, k.id, p.line DESC
+ON CONFLICT (dish_id, key_id) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+""")
+
+TRUNCATE_STAGING = text("TRUNCATE import_dishes, import_params")
+
+
+class DishImportDAO(BaseDAO[Dish]):
+    def __init__(self, session: AsyncSession) -> None:
+        super().__init__(Dish, session)
+
+    async def import_dishes(
+            self,
+            rows: AsyncIterable[Tuple[int, Optional[schems.DishImportRow], Optional[str]]]
+    ) -> dto.ImportSummary:
+        # Rows are staged with COPY in batches and merged set-wise, all in one transaction
+        summary = dto.ImportSummary()
+        for statement in CREATE_STAGING:
+            await self.session.execute(statement)
+        batch: List[Tuple[int, schems.DishImportRow]] = []
+        try:
+            async for line, row, error in rows:
+                summary.rows += 1
+                if row is None:
+                    self._reject(summary, line, error)
+                    continue
+                batch.append((line, row))
+                if len(batch) >= IMPORT_BATCH_SIZE:
+                    await self._flush(batch, summary)
+                    batch = []
+            if batch:
+                await self._flush(batch, summary)
+            await self.session.commit()
+        except BaseException:
+            await self.session.rollback()
+            raise
+        logger.info(
+            "Dish import finished: %d rows, %d created, %d updated, %d failed",
+            summary.rows, summary.created, summary.updated, summary.failed
+        )
+        return summary
+
+    async def _flush(self, batch: List[Tuple[int, schems.DishImportRow]], summary: dto.ImportSummary) -> None:
+        new_ids = iter(await self._allocate_ids(sum(1 for _, row in batch if row.id is None)))
+        dishes = []
+        params = []
+        for line, row in batch:
+            id_ = row.id if row.id is not None else next(new_ids)
+            dishes.append((line, id_, row.id is not None, row.name, row.restaurant_id, row.price, row.menu_id))
+            params.extend((line, id_, name, value) for name, value in row.params.items())
+
+        connection = await self.session.connection()
+        raw = await connection.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            "import_dishes",
+            records=dishes,
+            columns=("line", "id", "existing", "name", "restaurant_id", "price", "menu_id")
+        )
+        if params:
+            await raw.driver_connection.copy_records_to_table(
+                "import_params", records=params, columns=("line", "dish_id", "name", "value")
+            )
+
+        for line, error in (await self.session.execute(REJECT_QUERY)).all():
+            self._reject(summary, line, error)
+        summary.parameters_created += (await self.session.execute(MERGE_PARAMETERS_QUERY)).rowcount
+        created, updated = (await self.session.execute(MERGE_DISHES_QUERY)).one()
+        summary.created += created
+        summary.updated += updated
+        summary.dish_parameters += (await self.session.execute(MERGE_DISH_PARAMETERS_QUERY)).rowcount
+        await self.session.execute(TRUNCATE_STAGING)
+        logger.info(
+            "Dish import progress: %d rows read, %d created, %d updated, %d failed",
+            summary.rows, summary.created, summary.updated, summary.failed
+        )
+
+    @staticmethod
+    def _reject(summary: dto.ImportSummary, line: int, error: str) -> None:
+        summary.failed += 1
+        if len(summary.errors) < MAX_IMPORT_ERRORS:
+            summary.errors.append(dto.ImportRowError(line=line, error=error))
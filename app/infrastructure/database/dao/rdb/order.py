@@ -1,13 +1,50 @@
 from uuid import UUID
-from typing import Optional, List
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from fastapi import HTTPException
+from sqlalchemy import (
+    BigInteger, Float, Numeric, Select, any_, bindparam, cast, delete, exists, func, insert, literal, true, union_all,
+    update
+)
+from sqlalchemy.dialects.postgresql import ARRAY, UUID as PG_UUID
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app import dto
 from app.api import schems
-from .base import BaseDAO
-from app.infrastructure.database.models import CartItem, Cart
+from app.domain import pricing
+from .base import BaseDAO, DEFAULT_PAGE_SIZE
+from app.infrastructure.database.statements import STATEMENTS
+from app.infrastructure.database.models import CartItem, Cart, Dish, cart_items as cart_cart_items
+
+
+async def get_dish_prices(session: AsyncSession, dish_ids: Iterable[int]) -> Dict[int, pricing.DishPrice]:
+    # Every dish of a cart in one lookup
+    dish_ids = set(dish_ids)
+    query = STATEMENTS.get(("dish_prices",), lambda: select(Dish.id, Dish.price, Dish.discounted_price).where(
+        Dish.id == any_(bindparam("dish_ids", type_=ARRAY(BigInteger)))
+    ))
+    result = await session.execute(query, {"dish_ids": list(dish_ids)})
+    prices = {dish_id: pricing.DishPrice(price, discounted_price) for dish_id, price, discounted_price in result.all()}
+    missing = dish_ids - prices.keys()
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Dish with id {min(missing)} not found")
+    return prices
+
+
+def line_cost(quantity):
+    # pricing.price_line in SQL, for statements that price lines without a round trip
+    unit_price = func.coalesce(Dish.discounted_price, Dish.price)
+    return cast(func.round(cast(quantity * unit_price, Numeric), 2), Float)
+
+
+def price_breakdown(cart_price: pricing.CartPrice) -> dto.PriceBreakdown:
+    return dto.PriceBreakdown(
+        lines=[dto.PriceLine.model_validate(line._asdict()) for line in cart_price.lines],
+        subtotal=cart_price.subtotal,
+        discount=cart_price.discount,
+        total_cost=cart_price.total_cost
+    )
 
 
 class CartItemDAO(BaseDAO[CartItem]):
@@ -18,40 +55,76 @@ class CartItemDAO(BaseDAO[CartItem]):
             self,
             cart_item: schems.CartItemCreateUpdate
     ) -> dto.CartItem:
-        db_cart_item = CartItem(**cart_item.dict())
-        self.session.add(db_cart_item)
-        await self.session.commit()
-        await self.session.refresh(db_cart_item)
-        return dto.CartItem.model_validate(db_cart_item.__dict__, from_attributes=True)
+        # priced from the dish in the same statement, no row back means no such dish
+        rows = await self._write(insert(CartItem).from_select(
+            ["dish_id", "quantity", "total_cost"],
+            select(Dish.id, literal(cart_item.quantity), line_cost(cart_item.quantity)).where(
+                Dish.id == cart_item.dish_id
+            )
+        ).returning(*CartItem.__table__.c))
+        if not rows:
+            raise HTTPException(status_code=404, detail=f"Dish with id {cart_item.dish_id} not found")
+        return dto.CartItem.model_validate(rows[0]._mapping)
 
     async def get_cart_item(
             self,
             cart_item_id: int
     ) -> Optional[dto.CartItem]:
-        query = select(CartItem).options(selectinload(CartItem.dish)).where(CartItem.id == cart_item_id)
-        result = await self.session.execute(query)
-        cart_item = result.scalar_one_or_none()
+        cart_item = await self._get(cart_item_id)
         return dto.CartItem.model_validate(cart_item.__dict__, from_attributes=True) if cart_item else None
 
-    async def get_cart_items(self) -> List[dto.CartItem]:
-        query = select(CartItem).options(selectinload(CartItem.dish))
-        result = await self.session.execute(query)
-        cart_items = result.scalars().all()
-        return [dto.CartItem.model_validate(cart_item.__dict__, from_attributes=True) for cart_item in cart_items]
+    async def get_cart_items_by_ids(
+            self,
+            cart_item_ids: Tuple[int, ...]
+    ) -> dto.Batch[dto.CartItem]:
+        cart_items, missing = await self._get_many(cart_item_ids)
+        return dto.Batch[dto.CartItem](
+            items=[dto.CartItem.model_validate(cart_item.__dict__, from_attributes=True) for cart_item in cart_items],
+            missing=missing
+        )
+
+    async def get_cart_items(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.CartItem]:
+        cart_items, next_cursor = await self._paginate(lambda: select(CartItem), after, limit)
+        return dto.Page[dto.CartItem](
+            items=[dto.CartItem.model_validate(cart_item.__dict__, from_attributes=True) for cart_item in cart_items],
+            next_cursor=next_cursor
+        )
 
     async def update_cart_item(
             self,
             cart_item_id: int,
             cart_item_update: schems.CartItemCreateUpdate
     ) -> Optional[dto.CartItem]:
-        db_cart_item = await self.session.get(CartItem, cart_item_id)
-        if not db_cart_item:
+        # One statement: the line is repriced from the dish and every cart holding it moves by the difference.
+        # The line is locked and read first, so a concurrent update of it is waited for and not double counted.
+        previous = select(CartItem.id, CartItem.total_cost).where(
+            CartItem.id == cart_item_id
+        ).with_for_update().cte("previous")
+        dish = select(Dish.id).where(Dish.id == cart_item_update.dish_id)
+        changed = update(CartItem).where(CartItem.id == previous.c.id, exists(dish)).values(
+            dish_id=cart_item_update.dish_id,
+            quantity=cart_item_update.quantity,
+            total_cost=dish.with_only_columns(line_cost(cart_item_update.quantity)).scalar_subquery()
+        ).returning(
+            *CartItem.__table__.c,
+            (CartItem.total_cost - func.coalesce(previous.c.total_cost, 0.0)).label("change")
+        ).cte("changed")
+        carts = update(Cart).where(
+            Cart.guid.in_(select(cart_cart_items.c.cart_id).where(cart_cart_items.c.cartitem_id == cart_item_id)),
+            exists(select(changed.c.id))
+        ).values(total_cost=Cart.total_cost + select(changed.c.change).scalar_subquery()).cte("carts")
+
+        rows = await self._write(select(*(changed.c[column.key] for column in CartItem.__table__.c)).add_cte(carts))
+        if rows:
+            return dto.CartItem.model_validate(rows[0]._mapping)
+        held = await self.session.execute(select(CartItem.id).where(CartItem.id == cart_item_id))
+        if held.scalar_one_or_none() is None:
             return None
-        for key, value in cart_item_update.dict(exclude_unset=True).items():
-            setattr(db_cart_item, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_cart_item)
-        return dto.CartItem.model_validate(db_cart_item.__dict__, from_attributes=True)
+        raise HTTPException(status_code=404, detail=f"Dish with id {cart_item_update.dish_id} not found")
 
     async def delete_cart_item(
             self,
@@ -73,41 +146,191 @@ class CartDAO(BaseDAO[Cart]):
             self,
             cart: schems.CartCreateUpdate
     ) -> dto.Cart:
-        cart_items = await self.session.execute(
-            select(CartItem).where(CartItem.id.in_(cart.items)).options(selectinload(CartItem.dish))
-        )
-        cart_items = cart_items.scalars().all()
+        cart_items = await self._collect_items(cart)
 
         if not cart_items:
-            raise ValueError("No valid items found for the cart")
+            raise HTTPException(status_code=422, detail="No valid items found for the cart")
 
         db_cart = Cart()
         db_cart.items = cart_items
+        cart_price = await self._price_items(cart_items)
+        db_cart.total_cost = cart_price.total_cost
 
         self.session.add(db_cart)
-        await self.session.flush()
+        await self.session.commit()
+        return await self._priced_cart(db_cart.guid, cart_items, cart_price)
+
+    async def _collect_items(self, cart: schems.CartCreateUpdate) -> List[CartItem]:
+        # Existing cart items by id, followed by new ones for the inline lines. The new ones are written
+        # by the flush as one batched INSERT ... RETURNING, their association rows as another.
+        cart_items = []
+        if cart.items:
+            result = await self.session.execute(select(CartItem).where(CartItem.id.in_(cart.items)))
+            cart_items.extend(result.scalars().all())
+        quantities: Dict[int, int] = {}
+        for line in cart.lines:
+            quantities[line.dish_id] = quantities.get(line.dish_id, 0) + line.quantity
+        cart_items.extend(CartItem(dish_id=dish_id, quantity=quantity) for dish_id, quantity in quantities.items())
+        return cart_items
+
+    async def _priced_cart(
+            self,
+            cart_id: UUID,
+            cart_items: Sequence[CartItem],
+            cart_price: pricing.CartPrice
+    ) -> dto.Cart:
+        # The flush assigned ids to the new items, the breakdown can point at them now
+        query = select(Cart).options(selectinload(Cart.items)).where(Cart.guid == cart_id)
+        result = await self.session.execute(query.execution_options(populate_existing=True))
+        cart = dto.Cart.model_validate(result.scalar_one().__dict__, from_attributes=True)
+        cart.price_breakdown = price_breakdown(cart_price._replace(lines=[
+            line._replace(cart_item_id=item.id) for item, line in zip(cart_items, cart_price.lines)
+        ]))
+        return cart
+
+    async def _price_items(self, items: Sequence[CartItem]) -> pricing.CartPrice:
+        # Lines are priced again at the current dish prices, their stored totals may be stale
+        prices = await get_dish_prices(self.session, [item.dish_id for item in items])
+        cart_price = pricing.price_cart([(item.id, item.dish_id, item.quantity) for item in items], prices)
+        for item, line in zip(items, cart_price.lines):
+            item.total_cost = line.total_cost
+        return cart_price
+
+    def _in_cart(self, cart_id: UUID):
+        return CartItem.id.in_(select(cart_cart_items.c.cartitem_id).where(cart_cart_items.c.cart_id == cart_id))
+
+    def _apply_change(self, cart_id: UUID, changed) -> Select:
+        # The cart total moves by the same amount as the changed line, in the same statement
+        cart = update(Cart).where(Cart.guid == cart_id, exists(select(changed.c.id))).values(
+            total_cost=Cart.total_cost + select(changed.c.change).scalar_subquery()
+        ).returning(Cart.total_cost.label("cart_total_cost")).cte("cart")
+        return select(changed, cart.c.cart_total_cost).select_from(changed.join(cart, true()))
 
-        db_cart.total_cost = db_cart.calculate_total_cost()
+    def _item_change(self, row) -> dto.CartItemChange:
+        return dto.CartItemChange(
+            item=dto.CartItem.model_validate(row._mapping), cart_total_cost=row.cart_total_cost
+        )
+
+    async def add_item(
+            self,
+            cart_id: UUID,
+            cart_item: schems.CartItemCreateUpdate
+    ) -> Optional[dto.CartItemChange]:
+        # Adding a dish the cart already holds increases its quantity. The cart row is locked first so
+        # two concurrent adds of the same dish can't both insert a line.
+        locked = await self.session.execute(select(Cart.guid).where(Cart.guid == cart_id).with_for_update())
+        if locked.scalar_one_or_none() is None:
+            return None
 
+        cost = line_cost(cart_item.quantity)
+        existing = update(CartItem).where(
+            self._in_cart(cart_id), CartItem.dish_id == cart_item.dish_id, CartItem.dish_id == Dish.id
+        ).values(
+            quantity=CartItem.quantity + cart_item.quantity,
+            total_cost=func.coalesce(CartItem.total_cost, 0.0) + cost
+        ).returning(*CartItem.__table__.c, cost.label("change")).cte("existing")
+        inserted = insert(CartItem).from_select(
+            ["dish_id", "quantity", "total_cost"],
+            select(Dish.id, literal(cart_item.quantity), cost).where(
+                Dish.id == cart_item.dish_id, ~exists(select(existing.c.id))
+            )
+        ).returning(*CartItem.__table__.c, CartItem.total_cost.label("change")).cte("inserted")
+        link = insert(cart_cart_items).from_select(
+            ["cart_id", "cartitem_id"], select(literal(cart_id, PG_UUID(as_uuid=True)), inserted.c.id)
+        ).cte("link")
+        changed = union_all(select(existing), select(inserted)).cte("changed")
+
+        result = await self.session.execute(self._apply_change(cart_id, changed).add_cte(link))
+        row = result.one_or_none()
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Dish with id {cart_item.dish_id} not found")
         await self.session.commit()
-        await self.session.refresh(db_cart)
+        return self._item_change(row)
 
-        return dto.Cart.model_validate(db_cart.__dict__, from_attributes=True)
+    async def change_item_quantity(
+            self,
+            cart_id: UUID,
+            cart_item_id: int,
+            delta: int
+    ) -> Optional[dto.CartItemChange]:
+        # One statement: concurrent taps each add their own delta to whatever the row holds by then
+        cost = line_cost(delta)
+        changed = update(CartItem).where(
+            CartItem.id == cart_item_id,
+            self._in_cart(cart_id),
+            CartItem.dish_id == Dish.id,
+            CartItem.quantity + delta >= 1
+        ).values(
+            quantity=CartItem.quantity + delta,
+            total_cost=func.coalesce(CartItem.total_cost, 0.0) + cost
+        ).returning(*CartItem.__table__.c, cost.label("change")).cte("changed")
+
+        result = await self.session.execute(self._apply_change(cart_id, changed))
+        row = result.one_or_none()
+        if row is None:
+            held = await self.session.execute(
+                select(CartItem.quantity).where(CartItem.id == cart_item_id, self._in_cart(cart_id))
+            )
+            quantity = held.scalar_one_or_none()
+            if quantity is None:
+                return None
+            raise HTTPException(
+                status_code=422, detail=f"Quantity would drop to {quantity + delta}, remove the item instead"
+            )
+        await self.session.commit()
+        return self._item_change(row)
+
+    async def remove_item(
+            self,
+            cart_id: UUID,
+            cart_item_id: int
+    ) -> Optional[dto.CartItemChange]:
+        link = delete(cart_cart_items).where(
+            cart_cart_items.c.cart_id == cart_id, cart_cart_items.c.cartitem_id == cart_item_id
+        ).returning(cart_cart_items.c.cartitem_id).cte("link")
+        other_carts = cart_cart_items.alias("other_carts")
+        # the item itself goes too, unless another cart still holds it
+        removed = delete(CartItem).where(
+            CartItem.id.in_(select(link.c.cartitem_id)),
+            ~exists().where(other_carts.c.cartitem_id == CartItem.id, other_carts.c.cart_id != cart_id)
+        ).cte("removed")
+        removed_cost = select(func.coalesce(CartItem.total_cost, 0.0)).where(
+            CartItem.id.in_(select(link.c.cartitem_id))
+        ).scalar_subquery()
+        cart = update(Cart).where(Cart.guid == cart_id, exists(select(link.c.cartitem_id))).values(
+            total_cost=Cart.total_cost - removed_cost
+        ).returning(Cart.total_cost).cte("cart")
+
+        result = await self.session.execute(select(cart.c.total_cost).add_cte(removed))
+        cart_total_cost = result.scalar_one_or_none()
+        if cart_total_cost is None:
+            return None
+        await self.session.commit()
+        return dto.CartItemChange(cart_total_cost=cart_total_cost)
 
     async def get_cart(
             self,
             cart_id: UUID
     ) -> Optional[dto.Cart]:
-        query = select(Cart).options(selectinload(Cart.items)).where(Cart.guid == cart_id)
-        result = await self.session.execute(query)
+        query = self._statement(
+            ("get",), lambda: select(Cart).options(selectinload(Cart.items)).where(Cart.guid == bindparam("guid"))
+        )
+        result = await self.session.execute(query, {"guid": cart_id})
         cart = result.scalar_one_or_none()
         return dto.Cart.model_validate(cart.__dict__, from_attributes=True) if cart else None
 
-    async def get_carts(self) -> List[dto.Cart]:
-        query = select(Cart).options(selectinload(Cart.items))
-        result = await self.session.execute(query)
-        carts = result.scalars().all()
-        return [dto.Cart.model_validate(cart.__dict__, from_attributes=True) for cart in carts]
+    async def get_carts(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.Cart]:
+        carts, next_cursor = await self._paginate(
+            lambda: select(Cart).options(selectinload(Cart.items)), after, limit
+        )
+        return dto.Page[dto.Cart](
+            items=[dto.Cart.model_validate(cart.__dict__, from_attributes=True) for cart in carts],
+            next_cursor=next_cursor
+        )
 
     async def update_cart(
             self,
@@ -120,18 +343,13 @@ class CartDAO(BaseDAO[Cart]):
         if not db_cart:
             return None
 
-        cart_items = await self.session.execute(
-            select(CartItem).where(CartItem.id.in_(cart_update.items))
-        )
-        cart_items = cart_items.scalars().all()
+        cart_items = await self._collect_items(cart_update)
         db_cart.items = cart_items
-
-        db_cart.total_cost = db_cart.calculate_total_cost()
+        cart_price = await self._price_items(cart_items)
+        db_cart.total_cost = cart_price.total_cost
 
         await self.session.commit()
-        await self.session.refresh(db_cart)
-
-        return dto.Cart.model_validate(db_cart.__dict__, from_attributes=True)
+        return await self._priced_cart(db_cart.guid, cart_items, cart_price)
 
     async def delete_cart(
             self,
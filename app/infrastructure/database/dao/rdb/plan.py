@@ -0,0 +1,18 @@
+from dataclasses import dataclass
+from typing import FrozenSet, Optional
+
+
+@dataclass(frozen=True)
+class LoadPlan:
+    # DTO field names that will be serialised, None means every field
+    fields: Optional[FrozenSet[str]] = None
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.fields is not None
+
+    def includes(self, field: str) -> bool:
+        return self.fields is None or field in self.fields
+
+
+FULL_PLAN = LoadPlan()
@@ -1,278 +1,422 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import AsyncIterator, Dict, Optional, List, Sequence, Tuple
 
-from fastapi import HTTPException
+from sqlalchemy import BigInteger, Select, any_, bindparam, exists, func, true, update
+from sqlalchemy.dialects.postgresql import ARRAY, array
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from pydantic import parse_obj_as
 from sqlalchemy.orm import selectinload
 
 from app import dto
 from app.api import schems
-from app.infrastructure.database.dao.rdb import BaseDAO
+from app.infrastructure.cache import MemoryCache, cached
+from app.domain.search import normalize_search_text
+from app.infrastructure.database.dao.rdb import BaseDAO, LoadPlan, FULL_PLAN, DEFAULT_PAGE_SIZE, DEFAULT_SEARCH_LIMIT
 from app.infrastructure.database.models import Menu, Parameters, Dish, DishParameter, Discount, Restaurant
 
 
 class MenuDAO(BaseDAO[Menu]):
-    def __init__(self, session: AsyncSession) -> None:
-        super().__init__(Menu, session)
+    def __init__(self, session: AsyncSession, cache: Optional[MemoryCache] = None) -> None:
+        super().__init__(Menu, session, cache)
 
     async def add_menu(
             self,
             menu: schems.MenuCreateUpdate
     ) -> dto.Menu:
-        db_menu = Menu(**menu.dict())
-        self.session.add(db_menu)
-        await self.session.commit()
-        await self.session.refresh(db_menu)
-        return dto.Menu.model_validate(db_menu.__dict__, from_attributes=True)
+        row = await self._insert(menu.dict())
+        return dto.Menu.model_validate(row._mapping)
+
+    @cached("menus")
+    async def get_menu_version(
+            self,
+            menu_id: int
+    ) -> Optional[datetime]:
+        query = self._statement(("version",), lambda: select(Menu.updated_at).where(Menu.id == bindparam("id")))
+        result = await self.session.execute(query, {"id": menu_id})
+        return result.scalar_one_or_none()
 
+    @cached("menus")
     async def get_menu(
             self,
             menu_id: int
     ) -> Optional[dto.Menu]:
-        query = select(Menu).options(selectinload(Menu.dishes)).where(Menu.id == menu_id)
-        result = await self.session.execute(query)
-        menu = result.scalar_one_or_none()
+        menu = await self._get(menu_id)
         return dto.Menu.model_validate(menu.__dict__, from_attributes=True) if menu else None
 
-    async def get_menus(self) -> List[dto.Menu]:
-        query = select(Menu).options(selectinload(Menu.dishes))
-        result = await self.session.execute(query)
-        menus = result.scalars().all()
-        return parse_obj_as(List[dto.Menu], menus)
+    @cached("menus")
+    async def get_menus(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.Menu]:
+        menus, next_cursor = await self._paginate(lambda: select(Menu), after, limit)
+        return dto.Page[dto.Menu](items=dto.list_adapter(dto.Menu).validate_python(menus), next_cursor=next_cursor)
 
     async def update_menu(
             self,
             menu_id: int,
             menu_update: schems.MenuCreateUpdate
     ) -> Optional[dto.Menu]:
-        db_menu = await self.session.get(Menu, menu_id)
-        if not db_menu:
-            return None
-        for key, value in menu_update.dict(exclude_unset=True).items():
-            setattr(db_menu, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_menu)
-        return dto.Menu.model_validate(db_menu.__dict__, from_attributes=True)
+        row = await self._update(menu_id, menu_update.dict(exclude_unset=True))
+        return dto.Menu.model_validate(row._mapping) if row else None
 
     async def delete_menu(
             self,
             menu_id: int
     ) -> bool:
-        db_menu = await self.session.get(Menu, menu_id)
-        if not db_menu:
-            return False
-        await self.session.delete(db_menu)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(menu_id)
 
 
 class ParametersDAO(BaseDAO[Parameters]):
-    def __init__(self, session: AsyncSession) -> None:
-        super().__init__(Parameters, session)
+    def __init__(self, session: AsyncSession, cache: Optional[MemoryCache] = None) -> None:
+        super().__init__(Parameters, session, cache)
 
     async def add_parameter(
             self,
             parameter: schems.ParameterCreateUpdate
     ) -> dto.Parameter:
-        db_parameter = Parameters(**parameter.dict())
-        self.session.add(db_parameter)
-        await self.session.commit()
-        await self.session.refresh(db_parameter)
-        return dto.Parameter.model_validate(db_parameter.__dict__, from_attributes=True)
+        row = await self._insert(parameter.dict())
+        return dto.Parameter.model_validate(row._mapping)
 
+    @cached("parameters")
     async def get_parameter(
             self,
             parameter_id: int
     ) -> Optional[dto.Parameter]:
-        query = select(Parameters).options(selectinload(Parameters.values)).where(Parameters.id == parameter_id)
-        result = await self.session.execute(query)
-        parameter = result.scalar_one_or_none()
+        parameter = await self._get(parameter_id)
         return dto.Parameter.model_validate(parameter.__dict__, from_attributes=True) if parameter else None
 
-    async def get_parameters(self) -> List[dto.Parameter]:
-        query = select(Parameters).options(selectinload(Parameters.values))
-        result = await self.session.execute(query)
-        parameters = result.scalars().all()
-        return parse_obj_as(List[dto.Parameter], parameters)
+    @cached("parameters")
+    async def get_parameters(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.Parameter]:
+        parameters, next_cursor = await self._paginate(lambda: select(Parameters), after, limit)
+        return dto.Page[dto.Parameter](
+            items=dto.list_adapter(dto.Parameter).validate_python(parameters),
+            next_cursor=next_cursor
+        )
 
     async def update_parameter(
             self,
             parameter_id: int,
             parameter_update: schems.ParameterCreateUpdate
     ) -> Optional[dto.Parameter]:
-        db_parameter = await self.session.get(Parameters, parameter_id)
-        if not db_parameter:
-            return None
-        for key, value in parameter_update.dict(exclude_unset=True).items():
-            setattr(db_parameter, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_parameter)
-        return dto.Parameter.model_validate(db_parameter.__dict__, from_attributes=True)
+        row = await self._update(parameter_id, parameter_update.dict(exclude_unset=True))
+        return dto.Parameter.model_validate(row._mapping) if row else None
 
     async def delete_parameter(
             self,
             parameter_id: int
     ) -> bool:
-        db_parameter = await self.session.get(Parameters, parameter_id)
-        if not db_parameter:
-            return False
-        await self.session.delete(db_parameter)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(parameter_id)
 
 
 class DishDAO(BaseDAO[Dish]):
-    def __init__(self, session: AsyncSession) -> None:
-        super().__init__(Dish, session)
+    def __init__(self, session: AsyncSession, cache: Optional[MemoryCache] = None) -> None:
+        super().__init__(Dish, session, cache)
+
+    @staticmethod
+    def _relationships():
+        return {"params": selectinload(Dish.params).selectinload(DishParameter.key)}
+
+    @staticmethod
+    def _parameter_condition(condition: schems.DishParameterCondition):
+        key_ids = select(Parameters.id).where(Parameters.name == condition.name)
+        if condition.operator == "eq":
+            value_condition = DishParameter.value == condition.value
+        else:
+            number = float(condition.value.replace(",", "."))
+            if condition.operator == "le":
+                value_condition = DishParameter.numeric_value <= number
+            else:
+                value_condition = DishParameter.numeric_value >= number
+        return exists().where(
+            DishParameter.dish_id == Dish.id,
+            DishParameter.key_id.in_(key_ids),
+            value_condition,
+        )
+
+    def _apply_filter(self, query: Select, dish_filter: Optional[schems.DishFilter]) -> Select:
+        if dish_filter is None:
+            return query
+        if dish_filter.menu_id is not None:
+            query = query.where(Dish.menu_id == dish_filter.menu_id)
+        if dish_filter.price_min is not None:
+            query = query.where(Dish.price >= dish_filter.price_min)
+        if dish_filter.price_max is not None:
+            query = query.where(Dish.price <= dish_filter.price_max)
+        for condition in dish_filter.params:
+            query = query.where(self._parameter_condition(condition))
+        return query
 
     async def add_dish(
             self,
             dish: schems.DishCreateUpdate
     ) -> dto.Dish:
-        restaurant = await self.session.get(Restaurant, dish.restaurant_id)
-        if not restaurant:
-            raise HTTPException(status_code=404, detail=f"Restaurant with id {dish.restaurant_id} not found")
-        db_dish = Dish(
+        # an unknown restaurant or menu fails the foreign key, answered with 404
+        row = await self._insert(dict(
             name=dish.name,
             price=dish.price,
             restaurant_id=dish.restaurant_id,
             menu_id=dish.menu_id
+        ))
+        return dto.Dish.model_validate(row._mapping)
+
+    async def upsert_dishes(
+            self,
+            dishes: Sequence[schems.DishUpsert]
+    ) -> List[dto.BulkItem[dto.Dish]]:
+        restaurant_ids, menu_ids, dish_ids = await self._existing_ids(
+            (Restaurant, [dish.restaurant_id for dish in dishes]),
+            (Menu, [dish.menu_id for dish in dishes]),
+            (Dish, [dish.id for dish in dishes if dish.id is not None]),
         )
-        self.session.add(db_dish)
+        results: Dict[int, dto.BulkItem[dto.Dish]] = {}
+        accepted = []
+        seen = set()
+        for index, dish in enumerate(dishes):
+            if dish.id is not None and dish.id not in dish_ids:
+                error = f"Dish with id {dish.id} not found"
+            elif dish.id is not None and dish.id in seen:
+                error = f"Dish with id {dish.id} appears more than once"
+            elif dish.restaurant_id not in restaurant_ids:
+                error = f"Restaurant with id {dish.restaurant_id} not found"
+            elif dish.menu_id not in menu_ids:
+                error = f"Menu with id {dish.menu_id} not found"
+            else:
+                seen.add(dish.id)
+                accepted.append((index, dish))
+                continue
+            results[index] = dto.BulkItem[dto.Dish](index=index, status="error", error=error)
+
+        # new dishes get their ids up front so every returned row maps back to its request index
+        new_ids = iter(await self._allocate_ids(sum(1 for _, dish in accepted if dish.id is None)))
+        indexes = {}
+        rows = []
+        for index, dish in accepted:
+            id_ = dish.id if dish.id is not None else next(new_ids)
+            indexes[id_] = index
+            rows.append(dict(
+                id=id_, name=dish.name, price=dish.price, restaurant_id=dish.restaurant_id, menu_id=dish.menu_id
+            ))
+        written = await self._upsert(rows, ["id"], ["name", "price", "restaurant_id", "menu_id"])
         await self.session.commit()
-        await self.session.refresh(db_dish)
 
-        return dto.Dish.model_validate(db_dish.__dict__, from_attributes=True)
+        for row in written:
+            index = indexes[row.id]
+            results[index] = dto.BulkItem[dto.Dish](
+                index=index,
+                status="created" if row.created else "updated",
+                item=dto.Dish.model_validate(row._mapping)
+            )
+        return [results[index] for index in range(len(dishes))]
 
+    @cached("dishes", "dish_parameters", "parameters")
     async def get_dish(
             self,
-            dish_id: int
+            dish_id: int,
+            plan: LoadPlan = FULL_PLAN
     ) -> Optional[dto.Dish]:
-        query = select(Dish).options(
-            selectinload(Dish.restaurant),
-            selectinload(Dish.menu),
-            selectinload(Dish.params).selectinload(DishParameter.key),
-            selectinload(Dish.discount)
-        ).where(Dish.id == dish_id)
+        dish = await self._get(dish_id, plan, self._relationships)
+        return self._to_dto(dto.Dish, dish, plan) if dish else None
+
+    @cached("dishes", "dish_parameters", "parameters")
+    async def get_dishes_by_ids(
+            self,
+            dish_ids: Tuple[int, ...],
+            plan: LoadPlan = FULL_PLAN
+    ) -> dto.Batch[dto.Dish]:
+        dishes, missing = await self._get_many(dish_ids, plan, self._relationships)
+        return dto.Batch[dto.Dish](items=[self._to_dto(dto.Dish, dish, plan) for dish in dishes], missing=missing)
+
+    @cached("dishes", "dish_parameters", "parameters")
+    async def get_dishes_version(self) -> Tuple:
+        # count() catches deletes that leave max(updated_at) untouched
+        query = self._statement(("version",), lambda: select(
+            select(func.max(Dish.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(Dish).scalar_subquery(),
+            select(func.max(DishParameter.updated_at)).scalar_subquery(),
+            select(func.count()).select_from(DishParameter).scalar_subquery(),
+            select(func.max(Parameters.updated_at)).scalar_subquery(),
+        ))
         result = await self.session.execute(query)
-        dish = result.scalar_one_or_none()
-        return dto.Dish.model_validate(dish.__dict__, from_attributes=True) if dish else None
-
-    async def get_dishes(self) -> List[dto.Dish]:
-        query = select(Dish).options(
-            selectinload(Dish.restaurant),
-            selectinload(Dish.menu),
-            selectinload(Dish.params).selectinload(DishParameter.key),
-            selectinload(Dish.discount),
+        return tuple(result.one())
+
+    @cached("dishes", "dish_parameters", "parameters")
+    async def get_dishes(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            dish_filter: Optional[schems.DishFilter] = None,
+            plan: LoadPlan = FULL_PLAN
+    ) -> dto.Page[dto.Dish]:
+        def build():
+            return self._plan_query(plan, self._relationships)
+
+        # a filter's shape changes with the request, filtered pages are built per call
+        query = build if dish_filter is None or dish_filter.is_empty else self._apply_filter(build(), dish_filter)
+        dishes, next_cursor = await self._paginate(query, after, limit, (plan,))
+        return dto.Page[self._dto_class(dto.Dish, plan)](
+            items=[self._to_dto(dto.Dish, dish, plan) for dish in dishes],
+            next_cursor=next_cursor
+        )
+
+    @cached("dishes", "dish_parameters", "parameters")
+    async def search_dishes(
+            self,
+            search: str,
+            limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[dto.Dish]:
+        condition, score = self._search_conditions(Dish.name, normalize_search_text(search))
+        query = (
+            select(Dish)
+            .options(*self._plan_options(FULL_PLAN, self._relationships()))
+            .where(condition)
+            .order_by(score.desc(), Dish.id)
+            .limit(limit)
         )
         result = await self.session.execute(query)
         dishes = result.scalars().all()
-        return parse_obj_as(List[dto.Dish], dishes)
+        return dto.list_adapter(dto.Dish).validate_python(dishes)
+
+    @cached("dishes", "dish_parameters", "parameters")
+    async def get_dish_facets(
+            self,
+            dish_filter: Optional[schems.DishFilter] = None
+    ) -> List[dto.Facet]:
+        dish_ids = self._apply_filter(select(Dish.id), dish_filter)
+        dishes_count = func.count(DishParameter.dish_id.distinct())
+        query = (
+            select(Parameters.name, DishParameter.value, dishes_count)
+            .join(Parameters, Parameters.id == DishParameter.key_id)
+            .where(DishParameter.dish_id.in_(dish_ids))
+            .group_by(Parameters.name, DishParameter.value)
+            .order_by(Parameters.name, dishes_count.desc(), DishParameter.value)
+        )
+        result = await self.session.execute(query)
+        facets: List[dto.Facet] = []
+        for name, value, count in result.all():
+            if not facets or facets[-1].name != name:
+                facets.append(dto.Facet(name=name))
+            facets[-1].values.append(dto.FacetValue(value=value, count=count))
+        return facets
+
+    async def stream_dishes(
+            self,
+            after: Optional[int] = None,
+            dish_filter: Optional[schems.DishFilter] = None
+    ) -> AsyncIterator[dto.Dish]:
+        query = select(Dish).options(*self._plan_options(FULL_PLAN, self._relationships()))
+        query = self._apply_filter(query, dish_filter)
+        async for dish in self._stream(query, after):
+            yield dto.Dish.model_validate(dish.__dict__, from_attributes=True)
 
     async def update_dish(
             self,
             dish_id: int,
             dish_update: schems.DishCreateUpdate
     ) -> Optional[dto.Dish]:
-        restaurant = await self.session.get(Restaurant, dish_update.restaurant_id)
-        if not restaurant:
-            raise HTTPException(status_code=404, detail=f"Restaurant with id {dish_update.restaurant_id} not found")
-        db_dish = await self.session.get(Dish, dish_id)
-        if not db_dish:
-            return None
-        for key, value in dish_update.dict(exclude_unset=True).items():
-            setattr(db_dish, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_dish)
-
-        return dto.Dish.model_validate(db_dish.__dict__, from_attributes=True)
+        row = await self._update(dish_id, dish_update.dict(exclude_unset=True))
+        return dto.Dish.model_validate(row._mapping) if row else None
 
     async def delete_dish(
             self,
             dish_id: int
     ) -> bool:
-        db_dish = await self.session.get(Dish, dish_id)
-        if not db_dish:
-            return False
-        await self.session.delete(db_dish)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(dish_id)
 
 
 class DishParameterDAO(BaseDAO[DishParameter]):
     def __init__(self, session: AsyncSession) -> None:
         super().__init__(DishParameter, session)
 
+    @staticmethod
+    def _relationships():
+        return {"key": selectinload(DishParameter.key)}
+
     async def add_dish_parameter(
             self,
             dish_parameter: schems.DishParameterCreateUpdate
     ) -> dto.DishParameter:
-        dish = await self.session.get(Dish, dish_parameter.dish_id)
-        if not dish:
-            raise HTTPException(status_code=404, detail=f"Dish with id {dish_parameter.dish_id} not found")
-
-        db_param = DishParameter(
+        row = await self._insert(dict(
             dish_id=dish_parameter.dish_id,
             key_id=dish_parameter.key_id,
             value=dish_parameter.value
+        ))
+        return dto.DishParameter.model_validate(row._mapping)
+
+    async def upsert_dish_parameters(
+            self,
+            dish_parameters: Sequence[schems.DishParameterCreateUpdate]
+    ) -> List[dto.BulkItem[dto.DishParameter]]:
+        dish_ids, key_ids = await self._existing_ids(
+            (Dish, [param.dish_id for param in dish_parameters]),
+            (Parameters, [param.key_id for param in dish_parameters]),
         )
-        self.session.add(db_param)
+        results: Dict[int, dto.BulkItem[dto.DishParameter]] = {}
+        indexes = {}
+        rows = []
+        for index, param in enumerate(dish_parameters):
+            pair = (param.dish_id, param.key_id)
+            if param.dish_id not in dish_ids:
+                error = f"Dish with id {param.dish_id} not found"
+            elif param.key_id not in key_ids:
+                error = f"Parameter with id {param.key_id} not found"
+            elif pair in indexes:
+                error = f"Parameter {param.key_id} of dish {param.dish_id} appears more than once"
+            else:
+                indexes[pair] = index
+                rows.append(dict(dish_id=param.dish_id, key_id=param.key_id, value=param.value))
+                continue
+            results[index] = dto.BulkItem[dto.DishParameter](index=index, status="error", error=error)
+
+        written = await self._upsert(rows, ["dish_id", "key_id"], ["value"])
         await self.session.commit()
-        await self.session.refresh(db_param)
 
-        return dto.DishParameter.model_validate(db_param.__dict__, from_attributes=True)
+        for row in written:
+            index = indexes[(row.dish_id, row.key_id)]
+            results[index] = dto.BulkItem[dto.DishParameter](
+                index=index,
+                status="created" if row.created else "updated",
+                item=dto.DishParameter.model_validate(row._mapping)
+            )
+        return [results[index] for index in range(len(dish_parameters))]
 
     async def get_dish_parameter(
             self,
             dish_parameter_id: int
     ) -> Optional[dto.DishParameter]:
-        query = select(DishParameter).options(
-            selectinload(DishParameter.dish),
-            selectinload(DishParameter.key)
-        ).where(DishParameter.id == dish_parameter_id)
-        result = await self.session.execute(query)
-        dish_parameter = result.scalar_one_or_none()
+        dish_parameter = await self._get(dish_parameter_id, relationships=self._relationships)
         return dto.DishParameter.model_validate(
             dish_parameter.__dict__, from_attributes=True) if dish_parameter else None
 
-    async def get_dish_parameters(self) -> List[dto.DishParameter]:
-        query = select(DishParameter).options(
-            selectinload(DishParameter.dish),
-            selectinload(DishParameter.key)
+    async def get_dish_parameters(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.DishParameter]:
+        dish_parameters, next_cursor = await self._paginate(
+            lambda: self._plan_query(relationships=self._relationships), after, limit
+        )
+        return dto.Page[dto.DishParameter](
+            items=dto.list_adapter(dto.DishParameter).validate_python(dish_parameters), next_cursor=next_cursor
         )
-        result = await self.session.execute(query)
-        dish_parameters = result.scalars().all()
-        return parse_obj_as(List[dto.DishParameter], dish_parameters)
 
     async def update_dish_parameter(
             self,
             dish_parameter_id: int,
             dish_parameter_update: schems.DishParameterCreateUpdate
     ) -> Optional[dto.DishParameter]:
-        dish = await self.session.get(Dish, dish_parameter_update.dish_id)
-        if not dish:
-            raise HTTPException(status_code=404, detail=f"Dish with id {dish_parameter_update.dish_id} not found")
-
-        db_dish_parameter = await self.session.get(DishParameter, dish_parameter_id)
-        if not db_dish_parameter:
-            return None
-        for key, value in dish_parameter_update.dict(exclude_unset=True).items():
-            setattr(db_dish_parameter, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_dish_parameter)
-        return dto.DishParameter.model_validate(db_dish_parameter.__dict__, from_attributes=True)
+        row = await self._update(dish_parameter_id, dish_parameter_update.dict(exclude_unset=True))
+        return dto.DishParameter.model_validate(row._mapping) if row else None
 
     async def delete_dish_parameter(
             self,
             dish_parameter_id: int
     ) -> bool:
-        db_dish_parameter = await self.session.get(DishParameter, dish_parameter_id)
-        if not db_dish_parameter:
-            return False
-        await self.session.delete(db_dish_parameter)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(dish_parameter_id)
 
 
 class DiscountDAO(BaseDAO[Discount]):
@@ -283,48 +427,121 @@ class DiscountDAO(BaseDAO[Discount]):
             self,
             discount: schems.DiscountCreateUpdate
     ) -> dto.Discount:
-        db_discount = Discount(**discount.dict())
-        self.session.add(db_discount)
+        # no start date means now, by the database clock like the discounted price trigger
+        row = await self._insert(dict(discount.dict(), start_date=discount.start_date or func.now()))
+        return dto.Discount.model_validate(row._mapping)
+
+    async def upsert_discounts(
+            self,
+            discounts: Sequence[schems.DiscountCreateUpdate]
+    ) -> List[dto.BulkItem[dto.Discount]]:
+        dish_ids, = await self._existing_ids((Dish, [discount.dish_id for discount in discounts]))
+        results: Dict[int, dto.BulkItem[dto.Discount]] = {}
+        indexes = {}
+        rows = []
+        for index, discount in enumerate(discounts):
+            if discount.dish_id not in dish_ids:
+                error = f"Dish with id {discount.dish_id} not found"
+            elif discount.dish_id in indexes:
+                error = f"Discount for dish {discount.dish_id} appears more than once"
+            else:
+                indexes[discount.dish_id] = index
+                rows.append(dict(
+                    dish_id=discount.dish_id,
+                    # database time, the same clock the discounted price trigger compares against
+                    start_date=discount.start_date or func.now(),
+                    end_date=discount.end_date,
+                    price=discount.price,
+                    is_active=True
+                ))
+                continue
+            results[index] = dto.BulkItem[dto.Discount](index=index, status="error", error=error)
+
+        written = await self._upsert(rows, ["dish_id"], ["start_date", "end_date", "price", "is_active"])
         await self.session.commit()
-        await self.session.refresh(db_discount)
-        return dto.Discount.model_validate(db_discount.__dict__, from_attributes=True)
+
+        for row in written:
+            index = indexes[row.dish_id]
+            results[index] = dto.BulkItem[dto.Discount](
+                index=index,
+                status="created" if row.created else "updated",
+                item=dto.Discount.model_validate(row._mapping)
+            )
+        return [results[index] for index in range(len(discounts))]
+
+    @staticmethod
+    def _discounted_price(at: Optional[datetime] = None):
+        # Dish price minus the discount active at that moment, never below zero, NULL (no discounted price)
+        # when there is none. Mirrors the discounts triggers.
+        moment = func.now() if at is None else func.greatest(func.now(), at)
+        return select(func.greatest(Dish.price - Discount.price, 0)).where(
+            Discount.dish_id == Dish.id,
+            Discount.is_active,
+            Discount.start_date <= moment,
+            Discount.end_date >= moment,
+        ).scalar_subquery()
+
+    async def apply_discounted_prices(self, dish_ids: Sequence[int], at: Optional[datetime] = None) -> None:
+        # The discounts trigger only runs on writes, this catches discounts up with the clock
+        await self.session.execute(
+            update(Dish).where(
+                Dish.id == any_(bindparam("dish_ids", list(dish_ids), type_=ARRAY(BigInteger)))
+            ).values(discounted_price=self._discounted_price(at)).execution_options(synchronize_session=False)
+        )
+
+    async def get_stale_discounted_prices(self) -> List[int]:
+        query = self._statement(
+            ("stale",), lambda: select(Dish.id).where(Dish.discounted_price.is_distinct_from(self._discounted_price()))
+        )
+        result = await self.session.execute(query)
+        return list(result.scalars().all())
+
+    async def get_discount_boundaries(self) -> List[Tuple[int, datetime, float]]:
+        # (dish id, boundary, seconds from now by the database clock) for every future start and end
+        def build():
+            boundaries = func.unnest(
+                array([Discount.start_date, Discount.end_date])
+            ).table_valued("at").render_derived().lateral()
+            boundary = boundaries.c.at
+            return select(
+                Discount.dish_id, boundary, func.extract("epoch", boundary - func.now())
+            ).join(boundaries, true()).where(Discount.is_active, boundary > func.now())
+
+        result = await self.session.execute(self._statement(("boundaries",), build))
+        return [(dish_id, at, float(delay)) for dish_id, at, delay in result.all()]
 
     async def get_discount(
             self,
             discount_id: int
     ) -> Optional[dto.Discount]:
-        query = select(Discount).options(selectinload(Discount.dish)).where(Discount.id == discount_id)
-        result = await self.session.execute(query)
-        discount = result.scalar_one_or_none()
+        discount = await self._get(discount_id)
         return dto.Discount.model_validate(discount.__dict__, from_attributes=True) if discount else None
 
-    async def get_discounts(self) -> List[dto.Discount]:
-        query = select(Discount).options(selectinload(Discount.dish))
-        result = await self.session.execute(query)
-        discounts = result.scalars().all()
-        return parse_obj_as(List[dto.Discount], discounts)
+    async def get_discounts(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE
+    ) -> dto.Page[dto.Discount]:
+        discounts, next_cursor = await self._paginate(lambda: select(Discount), after, limit)
+        return dto.Page[dto.Discount](
+            items=dto.list_adapter(dto.Discount).validate_python(discounts),
+            next_cursor=next_cursor
+        )
 
     async def update_discount(
             self,
             discount_id: int,
             discount_update: schems.DiscountCreateUpdate
     ) -> Optional[dto.Discount]:
-        db_discount = await self.session.get(Discount, discount_id)
-        if not db_discount:
-            return None
-        for key, value in discount_update.dict(exclude_unset=True).items():
-            setattr(db_discount, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_discount)
-        return dto.Discount.model_validate(db_discount.__dict__, from_attributes=True)
+        values = discount_update.dict(exclude_unset=True)
+        # an explicit null start date means now, as on create; an omitted one is left as it is
+        if "start_date" in values and values["start_date"] is None:
+            values["start_date"] = func.now()
+        row = await self._update(discount_id, values)
+        return dto.Discount.model_validate(row._mapping) if row else None
 
     async def delete_discount(
             self,
             discount_id: int
     ) -> bool:
-        db_discount = await self.session.get(Discount, discount_id)
-        if not db_discount:
-            return False
-        await self.session.delete(db_discount)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(discount_id)
@@ -1,72 +1,257 @@
-from typing import Optional, List
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+import math
+from sqlalchemy import bindparam, func, text
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
 
 from app import dto
 from app.api import schems
-from .base import BaseDAO
+from .base import BaseDAO, DEFAULT_PAGE_SIZE, DEFAULT_SEARCH_LIMIT
+from .plan import LoadPlan, FULL_PLAN
+from app.domain.search import normalize_search_text
+from app.infrastructure.cache import MemoryCache, cached
+from app.infrastructure.compression import compress
 from app.infrastructure.database.models import Restaurant
 
+EARTH_RADIUS = 6371008.8
+METERS_PER_DEGREE = 111320.0
+
+
+def haversine_distance(latitude: float, longitude: float):
+    """Great-circle distance in meters between the restaurant and the given point."""
+    d_lat = func.radians(Restaurant.latitude - latitude)
+    d_lon = func.radians(Restaurant.longitude - longitude)
+    a = (
+        func.power(func.sin(d_lat / 2), 2)
+        + func.cos(math.radians(latitude)) * func.cos(func.radians(Restaurant.latitude))
+        * func.power(func.sin(d_lon / 2), 2)
+    )
+    return 2 * EARTH_RADIUS * func.asin(func.sqrt(a))
+
+
+def bounding_box(latitude: float, longitude: float, radius: float):
+    """Box around the point covering the radius, answered by the GiST index on point(longitude, latitude)."""
+    d_lat = radius / METERS_PER_DEGREE
+    d_lon = radius / (METERS_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return func.point(Restaurant.longitude, Restaurant.latitude).op("<@")(
+        func.box(
+            func.point(longitude - d_lon, latitude - d_lat),
+            func.point(longitude + d_lon, latitude + d_lat),
+        )
+    )
+
+
+# Same format as dto.base.serialize_time, applied to UTC like the DTOs do
+_TIME = "to_char({} AT TIME ZONE 'UTC', 'DD.MM.YYYY HH24:MI')"
+
+MENU_DOCUMENT_QUERY = text(f"""
+SELECT json_build_object(
+    'id', r.id,
+    'createdAt', {_TIME.format('r.created_at')},
+    'updatedAt', {_TIME.format('r.updated_at')},
+    'name', r.name,
+    'isVerified', r.is_verified,
+    'address', r.address,
+    'latitude', r.latitude,
+    'longitude', r.longitude,
+    'workingTime', r.working_time,
+    'description', r.description,
+    'phoneNumber', r.phone_number,
+    'dishes', COALESCE((
+        SELECT json_agg(json_build_object(
+            'id', d.id,
+            'createdAt', {_TIME.format('d.created_at')},
+            'updatedAt', {_TIME.format('d.updated_at')},
+            'name', d.name,
+            'restaurantId', d.restaurant_id,
+            'price', d.price,
+            'menuId', d.menu_id,
+            'discountedPrice', d.discounted_price,
+            'params', COALESCE((
+                SELECT json_agg(json_build_object(
+                    'id', p.id,
+                    'createdAt', {_TIME.format('p.created_at')},
+                    'updatedAt', {_TIME.format('p.updated_at')},
+                    'dishId', p.dish_id,
+                    'value', p.value,
+                    'key', json_build_object(
+                        'id', k.id,
+                        'createdAt', {_TIME.format('k.created_at')},
+                        'updatedAt', {_TIME.format('k.updated_at')},
+                        'name', k.name
+                    )
+                ) ORDER BY p.id)
+                FROM dish_parameters p
+                JOIN parameters k ON k.id = p.key_id
+                WHERE p.dish_id = d.id
+            ), '[]'::json),
+            'discount', (
+                SELECT json_build_object(
+                    'id', ds.id,
+                    'createdAt', {_TIME.format('ds.created_at')},
+                    'updatedAt', {_TIME.format('ds.updated_at')},
+                    'dishId', ds.dish_id,
+                    'startDate', {_TIME.format('ds.start_date')},
+                    'endDate', {_TIME.format('ds.end_date')},
+                    'price', ds.price,
+                    'isActive', ds.is_active
+                )
+                FROM discounts ds
+                WHERE ds.dish_id = d.id
+            )
+        ) ORDER BY d.id)
+        FROM dishes d
+        WHERE d.restaurant_id = r.id
+    ), '[]'::json)
+)::text
+FROM restaurants r
+WHERE r.id = :restaurant_id
+""")
+
 
 class RestaurantDAO(BaseDAO[Restaurant]):
-    def __init__(self, session: AsyncSession) -> None:
-        super().__init__(Restaurant, session)
+    def __init__(self, session: AsyncSession, cache: Optional[MemoryCache] = None) -> None:
+        super().__init__(Restaurant, session, cache)
 
     async def add_restaurant(
             self,
             restaurant: schems.RestaurantCreateUpdate
     ) -> dto.Restaurant:
-        db_restaurant = Restaurant(**restaurant.dict())
-        self.session.add(db_restaurant)
-        await self.session.commit()
-        await self.session.refresh(db_restaurant)
-        return dto.Restaurant.model_validate(db_restaurant.__dict__, from_attributes=True)
-
-    async def get_restaurant_by_name(self, name: str) -> List[dto.Restaurant]:
-        search = f"%{name}%"
-        query = select(Restaurant).options(selectinload(Restaurant.dishes)).filter(Restaurant.name.like(search))
+        row = await self._insert(restaurant.dict())
+        return dto.Restaurant.model_validate(row._mapping)
+
+    @cached("restaurants")
+    async def get_restaurant_by_name(
+            self,
+            name: str,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            plan: LoadPlan = FULL_PLAN
+    ) -> dto.Page[dto.Restaurant]:
+        condition, _ = self._search_conditions(Restaurant.name, normalize_search_text(name))
+        query = select(Restaurant).options(*self._plan_options(plan)).filter(condition)
+        restaurants, next_cursor = await self._paginate(query, after, limit)
+        return dto.Page[self._dto_class(dto.Restaurant, plan)](
+            items=[self._to_dto(dto.Restaurant, restaurant, plan) for restaurant in restaurants],
+            next_cursor=next_cursor
+        )
+
+    @cached("restaurants")
+    async def search_restaurants(
+            self,
+            search: str,
+            limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[dto.Restaurant]:
+        condition, score = self._search_conditions(Restaurant.name, normalize_search_text(search))
+        query = select(Restaurant).where(condition).order_by(score.desc(), Restaurant.id).limit(limit)
         result = await self.session.execute(query)
         restaurants = result.scalars().all()
-        print(restaurants)
         return [dto.Restaurant.model_validate(restaurant.__dict__, from_attributes=True) for restaurant in restaurants]
 
-    async def get_restaurant(
+    @cached("restaurants")
+    async def get_nearby_restaurants(
+            self,
+            latitude: float,
+            longitude: float,
+            radius: float,
+            limit: int = DEFAULT_SEARCH_LIMIT
+    ) -> List[dto.NearbyRestaurant]:
+        distance = haversine_distance(latitude, longitude).label("distance")
+        query = (
+            select(Restaurant, distance)
+            .where(bounding_box(latitude, longitude, radius))
+            .where(haversine_distance(latitude, longitude) <= radius)
+            .order_by(distance, Restaurant.id)
+            .limit(limit)
+        )
+        result = await self.session.execute(query)
+        return [
+            dto.NearbyRestaurant.model_validate({**restaurant.__dict__, "distance": distance}, from_attributes=True)
+            for restaurant, distance in result.all()
+        ]
+
+    @cached("restaurants")
+    async def get_restaurant_version(
             self,
             restaurant_id: int
+    ) -> Optional[datetime]:
+        query = self._statement(
+            ("version",), lambda: select(Restaurant.updated_at).where(Restaurant.id == bindparam("id"))
+        )
+        result = await self.session.execute(query, {"id": restaurant_id})
+        return result.scalar_one_or_none()
+
+    @cached("restaurants")
+    async def get_restaurant(
+            self,
+            restaurant_id: int,
+            plan: LoadPlan = FULL_PLAN
     ) -> Optional[dto.Restaurant]:
-        query = select(Restaurant).options(selectinload(Restaurant.dishes)).where(Restaurant.id == restaurant_id)
-        result = await self.session.execute(query)
-        restaurant = result.scalar_one_or_none()
-        return dto.Restaurant.model_validate(restaurant.__dict__, from_attributes=True) if restaurant else None
+        restaurant = await self._get(restaurant_id, plan)
+        return self._to_dto(dto.Restaurant, restaurant, plan) if restaurant else None
 
-    async def get_restaurants(self) -> List[dto.Restaurant]:
-        query = select(Restaurant).options(selectinload(Restaurant.dishes))
-        result = await self.session.execute(query)
-        restaurants = result.scalars().all()
-        return [dto.Restaurant.model_validate(restaurant.__dict__, from_attributes=True) for restaurant in restaurants]
+    @cached("restaurants")
+    async def get_restaurants_by_ids(
+            self,
+            restaurant_ids: Tuple[int, ...],
+            plan: LoadPlan = FULL_PLAN
+    ) -> dto.Batch[dto.Restaurant]:
+        restaurants, missing = await self._get_many(restaurant_ids, plan)
+        return dto.Batch[dto.Restaurant](
+            items=[self._to_dto(dto.Restaurant, restaurant, plan) for restaurant in restaurants],
+            missing=missing
+        )
+
+    @cached("restaurants", "dishes", "dish_parameters", "parameters", "discounts")
+    async def get_restaurant_menu_document(
+            self,
+            restaurant_id: int
+    ) -> Optional[bytes]:
+        result = await self.session.execute(MENU_DOCUMENT_QUERY, {"restaurant_id": restaurant_id})
+        document = result.scalar_one_or_none()
+        return document.encode() if document is not None else None
+
+    @cached("restaurants", "dishes", "dish_parameters", "parameters", "discounts")
+    async def get_compressed_restaurant_menu_document(
+            self,
+            restaurant_id: int,
+            encoding: str
+    ) -> Optional[bytes]:
+        # Cached next to the plain document and dropped with it, hot menus are compressed once per change
+        document = await self.get_restaurant_menu_document(restaurant_id)
+        return compress(document, encoding) if document is not None else None
+
+    @cached("restaurants")
+    async def get_restaurants(
+            self,
+            after: Optional[int] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            plan: LoadPlan = FULL_PLAN
+    ) -> dto.Page[dto.Restaurant]:
+        restaurants, next_cursor = await self._paginate(lambda: self._plan_query(plan), after, limit, (plan,))
+        return dto.Page[self._dto_class(dto.Restaurant, plan)](
+            items=[self._to_dto(dto.Restaurant, restaurant, plan) for restaurant in restaurants],
+            next_cursor=next_cursor
+        )
+
+    async def stream_restaurants(
+            self,
+            after: Optional[int] = None
+    ) -> AsyncIterator[dto.Restaurant]:
+        async for restaurant in self._stream(select(Restaurant), after):
+            yield dto.Restaurant.model_validate(restaurant.__dict__, from_attributes=True)
 
     async def update_restaurant(
             self,
             restaurant_id: int,
             restaurant_update: schems.RestaurantCreateUpdate
     ) -> Optional[dto.Restaurant]:
-        db_restaurant = await self.session.get(Restaurant, restaurant_id)
-        if not db_restaurant:
-            return None
-        for key, value in restaurant_update.dict(exclude_unset=True).items():
-            setattr(db_restaurant, key, value)
-        await self.session.commit()
-        await self.session.refresh(db_restaurant)
-        return dto.Restaurant.model_validate(db_restaurant.__dict__, from_attributes=True)
+        row = await self._update(restaurant_id, restaurant_update.dict(exclude_unset=True))
+        return dto.Restaurant.model_validate(row._mapping) if row else None
 
     async def delete_restaurant(
             self,
             restaurant_id: int
     ) -> bool:
-        db_restaurant = await self.session.get(Restaurant, restaurant_id)
-        if not db_restaurant:
-            return False
-        await self.session.delete(db_restaurant)
-        await self.session.commit()
-        return True
+        return await self._delete_by_id(restaurant_id)
@@ -1,21 +1,51 @@
 import logging
+from typing import Any, Dict, Optional
+
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
 
-from app.config import Settings
+from app.config import Pool, Settings
+from .statements import track_compilations
 
 logger = logging.getLogger(__name__)
 
 
-def make_connection_string(settings: Settings) -> str:
+def make_connection_string(settings: Settings, async_fallback: bool = False, replica: Optional[str] = None) -> str:
+    # a replica is host[:port], sharing the primary's port by default
+    host, _, port = (replica or settings.db.host).partition(":")
     url = f"postgresql+asyncpg://{settings.db.user}:{settings.db.password}" \
-          f"@{settings.db.host}/{settings.db.name}" \
-          f"?async_fallback=True"
+          f"@{host}:{port or settings.db.port}/{settings.db.name}"
+    # Only alembic runs the async driver from synchronous code
+    if async_fallback:
+        url += "?async_fallback=True"
     return url
 
 
-def create_pool(url: str) -> sessionmaker:
-    engine = create_async_engine(url, echo=False)
+def make_dsn(settings: Settings) -> str:
+    return f"postgresql://{settings.db.user}:{settings.db.password}" \
+           f"@{settings.db.host}:{settings.db.port}/{settings.db.name}"
+
+
+def create_pool(url: str, settings: Optional[Pool] = None) -> sessionmaker:
+    options: Dict[str, Any] = {}
+    if settings is not None:
+        options = dict(
+            pool_size=settings.size,
+            max_overflow=settings.max_overflow,
+            pool_timeout=settings.timeout,
+            pool_recycle=settings.recycle,
+            pool_pre_ping=settings.pre_ping,
+            # compiled forms of statements, by statement shape, shared by every connection
+            query_cache_size=settings.query_cache_size,
+            connect_args=dict(
+                # the dialect prepares statements itself, this is its per connection cache
+                prepared_statement_cache_size=settings.statement_cache_size,
+                server_settings=dict(statement_timeout=str(settings.statement_timeout)),
+            ),
+        )
+    engine = create_async_engine(url, echo=False, **options)
+    track_compilations(engine.sync_engine)
     return sessionmaker(
         bind=engine,
         expire_on_commit=False,
@@ -23,3 +53,17 @@ def create_pool(url: str) -> sessionmaker:
         future=True,
         autoflush=False,
     )
+
+
+def pool_stats(pool: sessionmaker) -> Optional[Dict[str, Any]]:
+    connections = pool.kw["bind"].pool
+    if not isinstance(connections, QueuePool):
+        return None
+    return {
+        "size": connections.size(),
+        "checkedIn": connections.checkedin(),
+        "checkedOut": connections.checkedout(),
+        # negative while fewer than size connections have been opened
+        "overflow": max(connections.overflow(), 0),
+        "timeout": connections.timeout(),
+    }
@@ -34,6 +34,3 @@ class Cart(BaseModel):
     __table_args__ = (
         UniqueConstraint('guid', name='uq_cart_guid'),
     )
-
-    def calculate_total_cost(self) -> float:
-        return sum(item.total_cost if item.total_cost is not None else 0.0 for item in self.items)
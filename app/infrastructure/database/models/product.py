@@ -1,5 +1,3 @@
-import pytz
-from datetime import datetime
 from sqlalchemy.orm import relationship
 from sqlalchemy import (
     Column,
@@ -9,9 +7,10 @@ from sqlalchemy import (
     ForeignKey,
     DateTime,
     Boolean,
-    func,
-    event,
-    update
+    Computed,
+    Index,
+    UniqueConstraint,
+    func
 )
 
 from .base import BaseModel
@@ -46,6 +45,10 @@ class Dish(BaseModel):
     params = relationship('DishParameter', back_populates='dish')
     discount = relationship('Discount', back_populates='dish', uselist=False)
 
+    __table_args__ = (
+        Index('ix_dishes_menu_id_price', 'menu_id', 'price'),
+    )
+
 
 class DishParameter(BaseModel):
     __tablename__ = 'dish_parameters'
@@ -53,10 +56,24 @@ class DishParameter(BaseModel):
     dish_id = Column(Integer, ForeignKey('dishes.id'), nullable=False)
     key_id = Column(Integer, ForeignKey('parameters.id'), nullable=False)
     value = Column(String(255), nullable=False)
+    # Leading number of the value ("500gr" -> 500) so ranges can be filtered in the database
+    numeric_value = Column(
+        Float,
+        Computed(
+            r"replace(substring(value from '-?[0-9]+(?:[.,][0-9]+)?'), ',', '.')::double precision",
+            persisted=True
+        )
+    )
 
     dish = relationship('Dish', back_populates='params')
     key = relationship('Parameters', back_populates='values')
 
+    __table_args__ = (
+        Index('ix_dish_parameters_key_value_dish', 'key_id', 'value', 'dish_id'),
+        Index('ix_dish_parameters_key_numeric_dish', 'key_id', 'numeric_value', 'dish_id'),
+        UniqueConstraint('dish_id', 'key_id', name='uq_dish_parameters_dish_key'),
+    )
+
 
 class Discount(BaseModel):
     __tablename__ = 'discounts'
@@ -69,47 +86,3 @@ class Discount(BaseModel):
 
     dish = relationship('Dish', back_populates='discount')
 
-
-# Event for automatically calculating discounted_price
-def update_discounted_price(mapper, connection, target):
-    try:
-        tashkent_tz = pytz.timezone('Asia/Tashkent')
-        now = datetime.now(tashkent_tz)
-        start_date = target.start_date.astimezone(
-            tashkent_tz) if target.start_date.tzinfo else target.start_date.replace(tzinfo=tashkent_tz)
-        end_date = target.end_date.astimezone(tashkent_tz) if target.end_date.tzinfo else target.end_date.replace(
-            tzinfo=tashkent_tz)
-
-        if target.is_active and start_date <= now <= end_date:
-            stmt = (
-                update(Dish)
-                .where(Dish.id == target.dish_id)
-                .values(discounted_price=(Dish.price - target.price))
-            )
-            connection.execute(stmt)
-        else:
-            stmt = (
-                update(Dish)
-                .where(Dish.id == target.dish_id)
-                .values(discounted_price=None)
-            )
-            connection.execute(stmt)
-    except Exception as e:
-        print(f"Error in update_discounted_price: {e}")
-
-
-def remove_discounted_price(mapper, connection, target):
-    try:
-        stmt = (
-            update(Dish)
-            .where(Dish.id == target.dish_id)
-            .values(discounted_price=None)
-        )
-        connection.execute(stmt)
-    except Exception as e:
-        print(f"Error in remove_discounted_price: {e}")
-
-
-event.listen(Discount, 'after_insert', update_discounted_price)
-event.listen(Discount, 'after_update', update_discounted_price)
-event.listen(Discount, 'after_delete', remove_discounted_price)
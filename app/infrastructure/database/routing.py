@@ -0,0 +1,57 @@
+import itertools
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+
+from .factory import pool_stats
+
+# DAO methods that only read, by name
+READ_METHOD_PREFIXES = ("get_", "count", "search_", "stream_")
+
+
+def checked_out(pool: sessionmaker) -> int:
+    connections = pool.kw["bind"].pool
+    return connections.checkedout() if isinstance(connections, QueuePool) else 0
+
+
+class ReplicaSet:
+    """Read replicas, each request takes the one with the fewest connections in use (round robin among equals)."""
+
+    def __init__(self, pools: Sequence[sessionmaker]):
+        self.pools = list(pools)
+        self._offsets = itertools.cycle(range(len(self.pools) or 1))
+
+    def __bool__(self) -> bool:
+        return bool(self.pools)
+
+    def choose(self) -> sessionmaker:
+        offset = next(self._offsets)
+        # min() keeps the first of equals, rotating the start spreads ties
+        return min(self.pools[offset:] + self.pools[:offset], key=checked_out)
+
+    def stats(self) -> Optional[List[Optional[Dict[str, Any]]]]:
+        return [pool_stats(pool) for pool in self.pools] if self.pools else None
+
+
+class ReadRouter:
+    """
+    One DAO on two sessions: uncached read methods run on the replica, everything else on the primary.
+    Cached reads stay on the primary, a replica lagging behind an invalidation would cache stale rows.
+    """
+
+    def __init__(self, writer: Any, reader: Callable[[], Any]):
+        self._writer = writer
+        # built on the first read, a request that only writes never opens a replica session
+        self._make_reader = reader
+        self._reader = None
+
+    def __getattr__(self, name: str) -> Any:
+        method = getattr(self._writer, name)
+        if not name.startswith(READ_METHOD_PREFIXES):
+            return method
+        if hasattr(method, "__cached_tables__") and getattr(self._writer, "cache", None) is not None:
+            return method
+        if self._reader is None:
+            self._reader = self._make_reader()
+        return getattr(self._reader, name)
@@ -0,0 +1,69 @@
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, Hashable
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import Engine, Executable, event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
+
+MAX_STATEMENTS = 500
+
+
+class StatementRegistry:
+    """Statements built once per shape and run with bound parameters, least recently used dropped first.
+
+    A reused statement keeps its memoized cache key, so executing it skips both building the construct and
+    generating the key the engine looks its compiled form up by.
+    """
+
+    def __init__(self, max_statements: int = MAX_STATEMENTS):
+        self.max_statements = max_statements
+        self._statements: "OrderedDict[Hashable, Executable]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], Executable]) -> Executable:
+        statement = self._statements.get(key)
+        if statement is not None:
+            self._statements.move_to_end(key)
+            self.hits += 1
+            return statement
+        self.misses += 1
+        statement = self._statements[key] = build()
+        if len(self._statements) > self.max_statements:
+            self._statements.popitem(last=False)
+        return statement
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "statements": len(self._statements),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+STATEMENTS = StatementRegistry()
+
+# How each engine's compiled cache answered, by engine
+_compilations: "WeakKeyDictionary[Engine, Counter]" = WeakKeyDictionary()
+
+
+def track_compilations(engine: Engine) -> None:
+    counts = _compilations[engine] = Counter()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(conn, cursor, statement, parameters, context, executemany):
+        cache_hit = getattr(context, "cache_hit", None)
+        counts["hits" if cache_hit is CACHE_HIT else "misses" if cache_hit is CACHE_MISS else "uncached"] += 1
+
+
+def compilation_stats(engine: Engine) -> Dict[str, Any]:
+    counts = _compilations.get(engine, Counter())
+    compiled = counts["hits"] + counts["misses"]
+    # driver level SQL and statements without a cache key are "uncached"
+    return {
+        "hits": counts["hits"],
+        "misses": counts["misses"],
+        "uncached": counts["uncached"],
+        "hitRate": round(counts["hits"] / compiled, 4) if compiled else None,
+        "cached": len(engine._compiled_cache) if engine._compiled_cache is not None else 0,
+    }
@@ -0,0 +1 @@
+from .discounts import DiscountScheduler
@@ -0,0 +1,107 @@
+import asyncio
+import heapq
+import logging
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+from sqlalchemy.orm import sessionmaker
+
+from app.infrastructure.cache import MemoryCache
+from app.infrastructure.database.dao import HolderDao
+
+logger = logging.getLogger(__name__)
+
+# Boundaries closer together than this are applied in one UPDATE
+BATCH_WINDOW = 0.05
+# Reload even without notifications, covers ones missed while the listener was reconnecting
+RELOAD_INTERVAL = 300
+RETRY_DELAY = 5
+
+
+class DiscountScheduler:
+    """
+    Turns discounts on and off at their start and end dates: ``dishes.discounted_price`` is otherwise
+    only recomputed when a discount row is written.
+    """
+
+    def __init__(self, pool: sessionmaker, cache: Optional[MemoryCache] = None):
+        self.pool = pool
+        self.cache = cache
+        # (loop time, boundary, dish id)
+        self._queue: List[Tuple[float, datetime, int]] = []
+        self._reload = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def reload(self, *_) -> None:
+        # discounts changed, a burst of changes collapses into a single reload
+        self._reload.set()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                self._reload.clear()
+                await self._load()
+                reload_at = loop.time() + RELOAD_INTERVAL
+                while not self._reload.is_set() and loop.time() < reload_at:
+                    next_at = self._queue[0][0] if self._queue else reload_at
+                    try:
+                        await asyncio.wait_for(self._reload.wait(), max(0.0, min(next_at, reload_at) - loop.time()))
+                    except asyncio.TimeoutError:
+                        pass
+                    await self._apply_due(loop.time())
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("Discount scheduler failed: %s", e)
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _load(self) -> None:
+        loop = asyncio.get_running_loop()
+        async with self.pool() as session:
+            dao = HolderDao(session)
+            # whatever was missed while no scheduler was running, e.g. across a restart
+            stale = await dao.discount.get_stale_discounted_prices()
+            if stale:
+                await dao.discount.apply_discounted_prices(stale)
+                await session.commit()
+                self._invalidate()
+                logger.info("Discount scheduler reconciled %d dishes", len(stale))
+            boundaries = await dao.discount.get_discount_boundaries()
+        # delays come from the database clock, so the application clock may be off
+        now = loop.time()
+        self._queue = [(now + delay, at, dish_id) for dish_id, at, delay in boundaries]
+        heapq.heapify(self._queue)
+
+    async def _apply_due(self, now: float) -> None:
+        due = []
+        while self._queue and self._queue[0][0] <= now + BATCH_WINDOW:
+            due.append(heapq.heappop(self._queue))
+        if not due:
+            return
+        dish_ids = list({dish_id for _, _, dish_id in due})
+        # evaluated just past the latest boundary: an end date is the last moment a discount is active
+        at = max(at for _, at, _ in due) + timedelta(microseconds=1)
+        async with self.pool() as session:
+            dao = HolderDao(session)
+            await dao.discount.apply_discounted_prices(dish_ids, at)
+            await session.commit()
+        self._invalidate()
+        logger.info("Discount scheduler updated %d dishes", len(dish_ids))
+
+    def _invalidate(self) -> None:
+        # the dishes trigger notifies every worker, this one needn't wait for the round trip
+        if self.cache is not None:
+            self.cache.invalidate("dishes")
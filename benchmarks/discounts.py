@@ -0,0 +1,71 @@
+"""
+Discount write throughput: the dish update issued from Python after every write (the old mapper
+listener / Django signal) vs the discounts trigger doing it inside the same statement.
+
+    python -m benchmarks.discounts [writes]
+
+Runs against the configured database in transactions that are rolled back. Needs the
+discounted price migration and at least one dish; ALTER TABLE locks discounts while it runs.
+"""
+import asyncio
+import sys
+import time
+
+import asyncpg
+
+from app.config import load_config
+from app.infrastructure.database.factory import make_dsn
+
+UPSERT_DISCOUNT = """
+    INSERT INTO discounts (dish_id, start_date, end_date, price, is_active, created_at, updated_at)
+    VALUES ($1, now() - interval '1 day', now() + interval '1 day', $2, true, now(), now())
+    ON CONFLICT (dish_id) DO UPDATE SET price = excluded.price, updated_at = now()
+    RETURNING id
+"""
+# what update_discounted_price did after the flush
+UPDATE_DISH = "UPDATE dishes SET discounted_price = price - $2 WHERE id = $1"
+
+
+async def run(connection: asyncpg.Connection, writes: int, round_trip: bool) -> float:
+    dish_ids = [row["id"] for row in await connection.fetch("SELECT id FROM dishes ORDER BY id LIMIT 100")]
+    started = time.perf_counter()
+    for i in range(writes):
+        dish_id = dish_ids[i % len(dish_ids)]
+        price = float(i % 100)
+        await connection.fetchrow(UPSERT_DISCOUNT, dish_id, price)
+        if round_trip:
+            await connection.execute(UPDATE_DISH, dish_id, price)
+    return writes / (time.perf_counter() - started)
+
+
+async def measure(connection: asyncpg.Connection, writes: int, round_trip: bool) -> float:
+    # every phase in its own rolled back transaction, so neither inherits the other's dead rows
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        if round_trip:
+            await connection.execute("ALTER TABLE discounts DISABLE TRIGGER discounts_sync_discounted_price")
+        return await run(connection, writes, round_trip)
+    finally:
+        await transaction.rollback()
+
+
+async def main() -> None:
+    writes = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    connection = await asyncpg.connect(make_dsn(settings=load_config()))
+    try:
+        dishes = await connection.fetchval("SELECT count(*) FROM (SELECT 1 FROM dishes LIMIT 100) d")
+        assert dishes, "no dishes to discount"
+        await measure(connection, writes // 10, round_trip=False)  # warm up
+        before = await measure(connection, writes, round_trip=True)
+        after = await measure(connection, writes, round_trip=False)
+    finally:
+        await connection.close()
+
+    print(f"{writes} discount writes over {dishes} dishes")
+    print(f"listener (extra UPDATE): {before:9.0f} writes/s")
+    print(f"trigger:                 {after:9.0f} writes/s ({after / before:.2f}x)")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
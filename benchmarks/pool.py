@@ -0,0 +1,72 @@
+"""
+Requests/s as the connection pool grows: the API in process, the configured database and
+a fixed number of concurrent clients, without the response cache.
+
+    python -m benchmarks.pool [seconds per size] [clients] [path]
+
+The pool only caps throughput while requests wait on the database. Against a local PostgreSQL
+on one shared CPU (GET /dishes/, 50 clients, 5s) the curve is flat, the query takes ~0.05 ms of a
+~8 ms request and the API process is the bottleneck:
+
+    pool 1: 103, 2: 103, 5: 115, 10: 116, 20: 121, 40: 116 requests/s
+
+Run it against a database with real network latency, and an API with free cores, to find the
+pool size where the curve stops rising.
+"""
+import asyncio
+import sys
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.api import controllers, dependencies
+from app.api.responses import DTOResponse
+from app.config import load_config
+from app.infrastructure.database.factory import create_pool, make_connection_string, pool_stats
+
+POOL_SIZES = (1, 2, 5, 10, 20, 40)
+
+
+async def client(http: httpx.AsyncClient, path: str, deadline: float) -> int:
+    served = 0
+    while time.perf_counter() < deadline:
+        response = await http.get(path)
+        response.raise_for_status()
+        served += 1
+    return served
+
+
+async def measure(size: int, seconds: float, clients: int, path: str) -> None:
+    settings = load_config()
+    settings.pool.size = size
+    # no overflow, the pool size alone caps the connections
+    settings.pool.max_overflow = 0
+    pool = create_pool(url=make_connection_string(settings=settings), settings=settings.pool)
+    app = FastAPI(default_response_class=DTOResponse)
+    dependencies.setup(app, pool, settings)
+    controllers.setup(app)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as http:
+        await http.get(path)  # warm up
+        deadline = time.perf_counter() + seconds
+        started = time.perf_counter()
+        served = await asyncio.gather(*(client(http, path, deadline) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    stats = pool_stats(pool)
+    await pool.kw["bind"].dispose()
+    print(f"pool {size:3d}: {sum(served) / elapsed:8.0f} requests/s, {stats['checkedIn']} connections opened")
+
+
+async def main() -> None:
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    path = sys.argv[3] if len(sys.argv) > 3 else "/dishes/"
+    print(f"GET {path}, {clients} clients, {seconds:g}s per pool size")
+    for size in POOL_SIZES:
+        await measure(size, seconds, clients, path)
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
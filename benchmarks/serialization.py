@@ -0,0 +1,70 @@
+"""
+CPU per GET /dishes/ response body: FastAPI's response_model pipeline vs DTOResponse.
+
+    python -m benchmarks.serialization [page size] [requests]
+"""
+import asyncio
+import sys
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app import dto
+from app.api.responses import DTOResponse
+
+
+def make_page(size: int) -> dto.Page[dto.Dish]:
+    now = datetime.utcnow()
+    params = [
+        dict(
+            id=i, created_at=now, updated_at=now, dish_id=1, key_id=i, value=f"{i * 100} g",
+            key=dict(id=i, created_at=now, updated_at=now, name=f"param {i}")
+        )
+        for i in range(4)
+    ]
+    dishes = [
+        dict(
+            id=i, created_at=now, updated_at=now, name=f"Dish {i}", restaurant_id=1, price=25000.0,
+            menu_id=1, discounted_price=None, params=params
+        )
+        for i in range(size)
+    ]
+    return dto.Page[dto.Dish](items=dto.list_adapter(dto.Dish).validate_python(dishes), next_cursor="MTIz")
+
+
+async def response_model_pipeline(field, page: dto.Page[dto.Dish]) -> bytes:
+    # what FastAPI does when a controller returns the DTO itself
+    content = await serialize_response(field=field, response_content=page, by_alias=True)
+    return JSONResponse(content).body
+
+
+def measure(run, requests: int) -> float:
+    started = time.process_time()
+    for _ in range(requests):
+        run()
+    return (time.process_time() - started) / requests * 1e6
+
+
+def main() -> None:
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    page = make_page(size)
+    field = create_response_field(name="response", type_=dto.Page[dto.Dish])
+    loop = asyncio.new_event_loop()
+
+    before = loop.run_until_complete(response_model_pipeline(field, page))
+    after = DTOResponse(page).body
+    assert before == after, "pipelines render different bodies"
+
+    legacy = measure(lambda: loop.run_until_complete(response_model_pipeline(field, page)), requests)
+    fast = measure(lambda: DTOResponse(page).body, requests)
+    print(f"{size} dishes, {len(after)} bytes, {requests} requests")
+    print(f"response_model + JSONResponse: {legacy:9.1f} us/request")
+    print(f"DTOResponse:                   {fast:9.1f} us/request ({legacy / fast:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Per request DAO setup, eager (a session and every DAO up front, as DbProvider did) vs lazy, with
+concurrent clients against the configured database: mostly cache hits, some uncached reads.
+
+    python -m benchmarks.sessions [requests per client] [clients] [pool size] [cache hit %]
+"""
+import asyncio
+import random
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
+
+from app.config import load_config
+from app.infrastructure.cache import MemoryCache
+from app.infrastructure.database import HolderDao
+from app.infrastructure.database.factory import create_pool, make_connection_string
+from app.api.dependencies import DbProvider
+
+DAOS = ("restaurant", "menu", "parameters", "dish", "dish_parameter", "dish_import", "discount", "cart", "cart_item")
+
+
+def instrument(pool) -> List[float]:
+    # time spent waiting for a connection, per checkout
+    waits: List[float] = []
+    connections = pool.kw["bind"].pool
+    do_get = connections._do_get
+
+    def timed_get():
+        started = time.perf_counter()
+        try:
+            return do_get()
+        finally:
+            waits.append(time.perf_counter() - started)
+
+    connections._do_get = timed_get
+    return waits
+
+
+@asynccontextmanager
+async def eager_dao(pool, cache: MemoryCache) -> AsyncIterator[HolderDao]:
+    async with pool() as session:
+        dao = HolderDao(session=session, cache=cache)
+        for name in DAOS:
+            getattr(dao, name)
+        yield dao
+
+
+async def client(open_dao, requests: int, hit_ratio: float, dish_id: int, overhead: List[float]) -> None:
+    for _ in range(requests):
+        hit = random.random() < hit_ratio
+        started = time.perf_counter()
+        async with open_dao() as dao:
+            if hit:
+                await dao.dish.get_dish(dish_id)
+            else:
+                await dao.dish_parameter.get_dish_parameters()
+        if hit:
+            overhead.append(time.perf_counter() - started)
+
+
+async def measure(name: str, open_dao, waits: List[float], requests: int, clients: int, hit_ratio: float, dish_id: int):
+    random.seed(1)
+    waits.clear()
+    overhead: List[float] = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(open_dao, requests, hit_ratio, dish_id, overhead) for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name}: {requests * clients / elapsed:7.0f} requests/s, "
+        f"cache hit {sum(overhead) / len(overhead) * 1e6:6.1f} us, "
+        f"{len(waits)} checkouts, pool wait {sum(waits) / max(len(waits), 1) * 1e3:6.2f} ms mean "
+        f"{max(waits, default=0) * 1e3:6.2f} ms max"
+    )
+
+
+async def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    pool_size = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+    hit_ratio = (float(sys.argv[4]) if len(sys.argv) > 4 else 90) / 100
+
+    settings = load_config()
+    settings.pool.size = pool_size
+    settings.pool.max_overflow = 0
+    pool = create_pool(url=make_connection_string(settings=settings), settings=settings.pool)
+    waits = instrument(pool)
+    cache = MemoryCache(max_bytes=settings.cache.max_bytes, ttl=settings.cache.ttl)
+    provider = DbProvider(pool=pool, cache=cache)
+
+    async with provider.open_dao() as dao:
+        dishes = await dao.dish.get_dishes(limit=1)
+        assert dishes.items, "no dishes to read"
+        dish_id = dishes.items[0].id
+        await dao.dish.get_dish(dish_id)  # warm the cache
+
+    print(f"{clients} clients x {requests} requests, pool of {pool_size}, {hit_ratio:.0%} cache hits")
+    await measure("eager", lambda: eager_dao(pool, cache), waits, requests, clients, hit_ratio, dish_id)
+    await measure("lazy ", provider.open_dao, waits, requests, clients, hit_ratio, dish_id)
+    await pool.kw["bind"].dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""
+Hot reads with the statement built per call (as the DAOs did) vs taken from the statement registry, against the
+configured database without the cache: Python time to get an executable statement and its cache key, then
+sequential get_dish/get_menus calls, with the engine's compiled cache outcomes for each.
+
+    python -m benchmarks.statements [calls]
+"""
+import asyncio
+import sys
+import time
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.config import load_config
+from app.infrastructure.database import HolderDao
+from app.infrastructure.database.factory import create_pool, make_connection_string
+from app.infrastructure.database.models import Dish, DishParameter, Menu
+from app.infrastructure.database.statements import STATEMENTS, compilation_stats
+
+
+def built_dish(dish_id: int):
+    return select(Dish).options(selectinload(Dish.params).selectinload(DishParameter.key)).where(Dish.id == dish_id)
+
+
+def built_menus(after: int, limit: int):
+    return select(Menu).where(Menu.id > after).order_by(Menu.id).limit(limit + 1)
+
+
+async def built(session, dish_id: int) -> None:
+    await session.execute(built_dish(dish_id))
+    await session.execute(built_menus(0, 50))
+
+
+async def prebuilt(session, dish_id: int) -> None:
+    dao = HolderDao(session=session)
+    await dao.dish.get_dish(dish_id)
+    await dao.menu.get_menus(after=0)
+
+
+def construction(calls: int, dish_id: int) -> None:
+    started = time.perf_counter()
+    for _ in range(calls):
+        built_dish(dish_id)._generate_cache_key()
+    per_built = (time.perf_counter() - started) / calls
+    started = time.perf_counter()
+    for _ in range(calls):
+        STATEMENTS.get(("benchmark", "dish"), lambda: built_dish(dish_id))._generate_cache_key()
+    per_prebuilt = (time.perf_counter() - started) / calls
+    print(f"statement and cache key: built {per_built * 1e6:6.1f} us, prebuilt {per_prebuilt * 1e6:6.1f} us")
+
+
+async def measure(name: str, read, pool, engine, calls: int, dish_id: int) -> None:
+    before = compilation_stats(engine)
+    async with pool() as session:
+        await read(session, dish_id)  # warm up
+        started = time.perf_counter()
+        for _ in range(calls):
+            await read(session, dish_id)
+        elapsed = time.perf_counter() - started
+    after = compilation_stats(engine)
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    print(
+        f"{name}: {calls / elapsed:7.0f} reads/s ({elapsed / calls * 1e3:5.2f} ms per get_dish + get_menus), "
+        f"compiled cache {hits} hits {misses} misses"
+    )
+
+
+async def main() -> None:
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    settings = load_config()
+    pool = create_pool(url=make_connection_string(settings=settings), settings=settings.pool)
+    engine = pool.kw["bind"].sync_engine
+    async with pool() as session:
+        dish_id = (await session.execute(select(Dish.id).limit(1))).scalar()
+        assert dish_id, "no dishes to read"
+
+    construction(calls * 10, dish_id)
+    await measure("built   ", built, pool, engine, calls, dish_id)
+    await measure("prebuilt", prebuilt, pool, engine, calls, dish_id)
+    print(f"registry: {STATEMENTS.stats()}, engine: {compilation_stats(engine)}")
+    await pool.kw["bind"].dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,126 @@
+"""
+Single row writes, checked up front and reloaded through the ORM (get, add, commit, refresh, as the DAOs did)
+vs one INSERT/UPDATE/DELETE ... RETURNING left to the constraints, with concurrent clients against the
+configured database. Every client creates, updates and deletes its own dishes and dish parameters.
+
+    python -m benchmarks.writes [cycles per client] [clients] [pool size]
+"""
+import asyncio
+import sys
+import time
+from typing import List
+
+from sqlalchemy import event, select
+
+from app.api import schems
+from app.config import load_config
+from app.infrastructure.database import HolderDao
+from app.infrastructure.database.factory import create_pool, make_connection_string
+from app.infrastructure.database.models import Dish, DishParameter, Parameters, Restaurant
+
+
+class Checked:
+    """The write path before RETURNING, kept here to compare against."""
+
+    def __init__(self, session):
+        self.session = session
+
+    async def add(self, parent, parent_id: int, obj):
+        if not await self.session.get(parent, parent_id):
+            raise LookupError(parent_id)
+        self.session.add(obj)
+        await self.session.commit()
+        await self.session.refresh(obj)
+        return obj
+
+    async def update(self, model, obj_id: int, values: dict):
+        obj = await self.session.get(model, obj_id)
+        for key, value in values.items():
+            setattr(obj, key, value)
+        await self.session.commit()
+        await self.session.refresh(obj)
+        return obj
+
+    async def delete(self, model, obj_id: int) -> None:
+        obj = await self.session.get(model, obj_id)
+        await self.session.delete(obj)
+        await self.session.commit()
+
+
+async def checked_cycle(pool, restaurant_id: int, menu_id: int, key_id: int) -> None:
+    async with pool() as session:
+        writes = Checked(session)
+        dish = await writes.add(
+            Restaurant, restaurant_id, Dish(name="bench", price=100, restaurant_id=restaurant_id, menu_id=menu_id)
+        )
+        param = await writes.add(Dish, dish.id, DishParameter(dish_id=dish.id, key_id=key_id, value="1"))
+        await writes.update(DishParameter, param.id, {"value": "2"})
+        await writes.update(Dish, dish.id, {"price": 120})
+        await writes.delete(DishParameter, param.id)
+        await writes.delete(Dish, dish.id)
+
+
+async def returning_cycle(pool, restaurant_id: int, menu_id: int, key_id: int) -> None:
+    async with pool() as session:
+        dao = HolderDao(session=session)
+        dish = await dao.dish.add_dish(
+            schems.DishCreateUpdate(name="bench", price=100, restaurantId=restaurant_id, menuId=menu_id)
+        )
+        param = await dao.dish_parameter.add_dish_parameter(
+            schems.DishParameterCreateUpdate(dishId=dish.id, keyId=key_id, value="1")
+        )
+        await dao.dish_parameter.update_dish_parameter(
+            param.id, schems.DishParameterCreateUpdate(dishId=dish.id, keyId=key_id, value="2")
+        )
+        await dao.dish.update_dish(
+            dish.id, schems.DishCreateUpdate(name="bench", price=120, restaurantId=restaurant_id, menuId=menu_id)
+        )
+        await dao.dish_parameter.delete_dish_parameter(param.id)
+        await dao.dish.delete_dish(dish.id)
+
+
+async def measure(name: str, cycle, pool, statements: List[int], cycles: int, clients: int, *ids: int) -> None:
+    async def client():
+        for _ in range(cycles):
+            await cycle(pool, *ids)
+
+    await cycle(pool, *ids)  # warm up
+    statements.clear()
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    elapsed = time.perf_counter() - started
+    writes = cycles * clients * 6
+    print(
+        f"{name}: {writes / elapsed:7.0f} writes/s, "
+        f"{len(statements) / writes:4.1f} statements per write (commits included)"
+    )
+
+
+async def main() -> None:
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    pool_size = int(sys.argv[3]) if len(sys.argv) > 3 else 10
+
+    settings = load_config()
+    settings.pool.size = pool_size
+    settings.pool.max_overflow = 0
+    pool = create_pool(url=make_connection_string(settings=settings), settings=settings.pool)
+    engine = pool.kw["bind"].sync_engine
+    statements: List[int] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(1))
+    event.listen(engine, "commit", lambda *args: statements.append(1))
+
+    async with pool() as session:
+        dish = (await session.execute(select(Dish).limit(1))).scalar()
+        key_id = (await session.execute(select(Parameters.id).limit(1))).scalar()
+        assert dish and key_id, "no dish and parameter to copy the restaurant, menu and key from"
+    ids = (dish.restaurant_id, dish.menu_id, key_id)
+
+    print(f"{clients} clients x {cycles} cycles of 6 writes, pool of {pool_size}")
+    await measure("checked  ", checked_cycle, pool, statements, cycles, clients, *ids)
+    await measure("returning", returning_cycle, pool, statements, cycles, clients, *ids)
+    await pool.kw["bind"].dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,45 @@
+class Result:
+    """What AsyncSession.execute returns, over a list of rows."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return self.rows
+
+    def one(self):
+        return self.rows[0]
+
+    def scalar_one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+
+class Session:
+    """Stands in for AsyncSession: records what the DAO executes, rows come from respond()."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.executed = []
+        self.commits = 0
+
+    def respond(self, statement, params):
+        return self.rows
+
+    async def execute(self, statement, params=None):
+        self.executed.append((statement, params))
+        return Result(self.respond(statement, params))
+
+    async def commit(self) -> None:
+        self.commits += 1
+
+    async def close(self) -> None:
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,97 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from app.api import schems
+from app.infrastructure.database.dao.rdb import DishDAO, base
+from tests.conftest import Session
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+class Database(Session):
+    """Answers the bulk upsert's statements from sets of existing ids, like PostgreSQL would."""
+
+    def __init__(self, restaurants=(1,), menus=(1,), dishes=()):
+        super().__init__()
+        self.restaurants, self.menus, self.dishes = set(restaurants), set(menus), set(dishes)
+        self.next_id = 100
+        self.chunks = []
+
+    def respond(self, statement, params):
+        compiled = statement.compile(dialect=postgresql.dialect())
+        sql = str(compiled)
+        if statement.is_insert:
+            return self._upsert(sql, compiled.params)
+        if "nextval" in sql:
+            series = re.search(r"generate_series\(%\(\w+\)s, %\((\w+)\)s\)", sql)
+            count = compiled.params[series.group(1)]
+            self.next_id += count
+            return list(range(self.next_id - count, self.next_id))
+        # one array of found ids per target: restaurants, menus, dishes
+        requested = list(compiled.params.values())
+        tables = (self.restaurants, self.menus, self.dishes)
+        return [[sorted(set(ids) & table) or None for ids, table in zip(requested, tables)]]
+
+    def _upsert(self, sql, values):
+        assert "ON CONFLICT (id) DO UPDATE" in sql and "updated_at = now()" in sql
+        assert "RETURNING" in sql and "xmax = 0 AS created" in sql
+        rows = []
+        for index in range(len([name for name in values if re.fullmatch(r"id_m\d+", name)])):
+            row = {name: values[f"{name}_m{index}"] for name in ("id", "name", "price", "restaurant_id", "menu_id")}
+            row.update(created_at=NOW, updated_at=NOW, discounted_price=None)
+            created = row["id"] not in self.dishes
+            self.dishes.add(row["id"])
+            rows.append(SimpleNamespace(**row, created=created, _mapping=row))
+        self.chunks.append(len(rows))
+        return rows
+
+
+def dish(name: str, id_: int = None, restaurant_id: int = 1, menu_id: int = 1) -> schems.DishUpsert:
+    return schems.DishUpsert(id=id_, name=name, price=1000, restaurantId=restaurant_id, menuId=menu_id)
+
+
+def upsert(database: Database, dishes):
+    return asyncio.run(DishDAO(database).upsert_dishes(dishes))
+
+
+def test_new_and_existing_dishes_are_created_and_updated():
+    database = Database(dishes=[7])
+    results = upsert(database, [dish("Plov"), dish("Shashlik", id_=7), dish("Tea")])
+    assert [(result.status, result.item.id) for result in results] == [
+        ("created", 100), ("updated", 7), ("created", 101)
+    ]
+    assert [result.index for result in results] == [0, 1, 2]
+    assert results[1].item.name == "Shashlik" and results[1].item.params == []
+    assert database.commits == 1
+
+
+def test_unknown_references_are_reported_per_item():
+    database = Database(restaurants=[1], menus=[1], dishes=[7])
+    results = upsert(database, [
+        dish("Plov", restaurant_id=2),
+        dish("Tea", menu_id=3),
+        dish("Soup", id_=8),
+        dish("Shashlik", id_=7),
+        dish("Shashlik again", id_=7),
+    ])
+    assert [(result.status, result.error) for result in results] == [
+        ("error", "Restaurant with id 2 not found"),
+        ("error", "Menu with id 3 not found"),
+        ("error", "Dish with id 8 not found"),
+        ("updated", None),
+        ("error", "Dish with id 7 appears more than once"),
+    ]
+    assert database.chunks == [1]
+
+
+def test_rows_are_written_in_chunks(monkeypatch):
+    monkeypatch.setattr(base, "BULK_CHUNK_SIZE", 2)
+    database = Database()
+    results = upsert(database, [dish(f"Dish {index}") for index in range(5)])
+    assert database.chunks == [2, 2, 1]
+    assert [result.item.name for result in results] == [f"Dish {index}" for index in range(5)]
+    assert {result.status for result in results} == {"created"}
@@ -0,0 +1,126 @@
+import asyncio
+
+from app.infrastructure.cache import MemoryCache, MISSING, SingleFlight, cached
+
+
+class Reader:
+    def __init__(self, cache: MemoryCache):
+        self.cache = cache
+        self.value = 1
+        self.loads = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+        self.release.set()
+
+    @cached("dishes")
+    async def get_value(self, id_: int) -> int:
+        self.loads += 1
+        value = self.value
+        self.started.set()
+        await self.release.wait()
+        return value
+
+
+def make_cache() -> MemoryCache:
+    return MemoryCache(max_bytes=1024 * 1024, ttl=300)
+
+
+def test_cached_reads_are_served_from_cache():
+    async def run():
+        reader = Reader(make_cache())
+        assert await reader.get_value(1) == 1
+        reader.value = 2
+        assert await reader.get_value(id_=1) == 1
+        assert reader.loads == 1
+
+    asyncio.run(run())
+
+
+def test_invalidation_drops_cached_reads():
+    async def run():
+        reader = Reader(make_cache())
+        await reader.get_value(1)
+        reader.value = 2
+        reader.cache.invalidate("dishes")
+        assert await reader.get_value(1) == 2
+        assert reader.loads == 2
+
+    asyncio.run(run())
+
+
+def test_invalidation_during_load_keeps_stale_result_out_of_cache():
+    async def run():
+        reader = Reader(make_cache())
+        reader.release.clear()
+        load = asyncio.create_task(reader.get_value(1))
+        await reader.started.wait()
+        # the row changes and its notification arrives while the query is still running
+        reader.value = 2
+        reader.cache.invalidate("dishes")
+        reader.release.set()
+        assert await load == 1
+        assert await reader.get_value(1) == 2
+        assert reader.loads == 2
+
+    asyncio.run(run())
+
+
+def test_clear_during_load_keeps_stale_result_out_of_cache():
+    async def run():
+        reader = Reader(make_cache())
+        reader.release.clear()
+        load = asyncio.create_task(reader.get_value(1))
+        await reader.started.wait()
+        reader.cache.clear()
+        reader.release.set()
+        await load
+        assert reader.cache.stats()["entries"] == 0
+
+    asyncio.run(run())
+
+
+def test_set_with_current_generation_is_stored():
+    cache = make_cache()
+    generation = cache.generation(("menus",))
+    cache.invalidate("dishes")
+    cache.set("key", "value", ("menus",), generation)
+    assert cache.get("key") == "value"
+    cache.invalidate("menus")
+    assert cache.get("key") is MISSING
+
+
+def test_concurrent_misses_share_one_load():
+    async def run():
+        reader = Reader(make_cache())
+        reader.release.clear()
+        loads = [asyncio.create_task(reader.get_value(1)) for _ in range(5)]
+        await reader.started.wait()
+        reader.release.set()
+        assert await asyncio.gather(*loads) == [1] * 5
+        assert reader.loads == 1
+        assert reader.cache.flights.stats()["collapsed"] == 4
+
+    asyncio.run(run())
+
+
+def test_single_flight_forget_starts_a_new_call():
+    async def run():
+        flights = SingleFlight()
+        release = asyncio.Event()
+        calls = []
+
+        async def call():
+            calls.append(len(calls))
+            await release.wait()
+            return len(calls)
+
+        first = asyncio.create_task(flights.do("key", call, ("dishes",)))
+        await asyncio.sleep(0)
+        flights.forget("dishes")
+        second = asyncio.create_task(flights.do("key", call, ("dishes",)))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(first, second)
+        assert len(calls) == 2
+
+    asyncio.run(run())
@@ -0,0 +1,21 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import schems
+from app.infrastructure.database.dao.rdb import CartDAO
+from tests.conftest import Session
+
+
+@pytest.mark.parametrize("cart", [
+    schems.CartCreateUpdate(),
+    # none of the existing items was found
+    schems.CartCreateUpdate(items=[5, 6]),
+])
+def test_cart_without_items_is_unprocessable(cart):
+    session = Session()
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(CartDAO(session).add_cart(cart))
+    assert (error.value.status_code, error.value.detail) == (422, "No valid items found for the cart")
+    assert session.commits == 0
@@ -0,0 +1,36 @@
+import gzip
+
+from app.infrastructure import compression
+from app.infrastructure.compression import BROTLI, GZIP, Compressor, choose_encoding
+
+
+def test_equal_weights_prefer_brotli():
+    assert choose_encoding("gzip, deflate, br") == BROTLI
+    assert choose_encoding("*") == BROTLI
+
+
+def test_highest_weight_wins():
+    assert choose_encoding("br;q=0.5, gzip") == GZIP
+    assert choose_encoding("gzip;q=0.2, br;q=0.8") == BROTLI
+    assert choose_encoding("*;q=0.5, gzip") == GZIP
+
+
+def test_refused_or_unsupported_encodings_fall_back_to_identity():
+    assert choose_encoding("") is None
+    assert choose_encoding("deflate") is None
+    assert choose_encoding("br;q=0, gzip;q=0") is None
+    assert choose_encoding("*;q=0") is None
+    assert choose_encoding("gzip;q=0.5, identity") is None
+    assert choose_encoding("gzip, identity;q=0.5") == GZIP
+
+
+def test_without_brotli_gzip_is_chosen(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, gzip;q=0.1") == GZIP
+    assert choose_encoding("br") is None
+
+
+def test_streamed_gzip_chunks_decompress_to_the_input():
+    compressor = Compressor(GZIP, gzip_level=6, brotli_quality=4)
+    chunks = [compressor.compress(b'{"id": 1}\n'), compressor.compress(b'{"id": 2}\n'), compressor.finish()]
+    assert gzip.decompress(b"".join(chunks)) == b'{"id": 1}\n{"id": 2}\n'
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.compression import CompressionMiddleware
+from app.api.dependencies import ConditionalGet
+from app.api.dependencies.conditional import match_etag
+from app.api.dependencies.settings import get_settings
+from app.api.responses import DTOResponse
+
+ETAG = '"abc"'
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.state.version = 1
+    app.add_middleware(CompressionMiddleware, minimum_size=16)
+    app.dependency_overrides[get_settings] = lambda: SimpleNamespace(http_cache=SimpleNamespace(max_age=60))
+
+    @app.get("/items/")
+    async def items(conditional: ConditionalGet = Depends()):
+        etag = conditional.etag(app.state.version)
+        not_modified = conditional.not_modified(etag)
+        if not_modified:
+            return not_modified
+        return conditional.apply(DTOResponse({"items": list(range(50))}), etag)
+
+    return TestClient(app)
+
+
+def test_match_etag():
+    assert match_etag(None, ETAG) is None
+    assert match_etag('"other"', ETAG) is None
+    assert match_etag('"other", "abc"', ETAG) == ETAG
+    assert match_etag("*", ETAG) == ETAG
+    assert match_etag('W/"abc"', ETAG) == 'W/"abc"'
+
+
+def test_compressed_tags_match_the_plain_representation():
+    assert match_etag('"abc-gzip"', ETAG) == '"abc-gzip"'
+    assert match_etag('W/"abc-br"', ETAG) == 'W/"abc-br"'
+    assert match_etag('"abc-deflate"', ETAG) is None
+
+
+def test_unchanged_representation_is_not_modified():
+    client = make_client()
+    response = client.get("/items/", headers={"Accept-Encoding": "identity"})
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "public, max-age=60"
+    again = client.get("/items/", headers={"Accept-Encoding": "identity", "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag and again.content == b""
+
+
+def test_tag_depends_on_query_and_version():
+    client = make_client()
+    headers = {"Accept-Encoding": "identity"}
+    etag = client.get("/items/", headers=headers).headers["ETag"]
+    assert client.get("/items/?fields=id", headers=headers).headers["ETag"] != etag
+    assert client.get("/items/?limit=1&after=2", headers=headers).headers["ETag"] == \
+        client.get("/items/?after=2&limit=1", headers=headers).headers["ETag"]
+    client.app.state.version = 2
+    assert client.get("/items/", headers={**headers, "If-None-Match": etag}).status_code == 200
+
+
+def test_gzip_representation_has_its_own_tag_and_revalidates():
+    client = make_client()
+    plain = client.get("/items/", headers={"Accept-Encoding": "identity"}).headers["ETag"]
+    response = client.get("/items/", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["ETag"] == plain[:-1] + '-gzip"'
+    again = client.get("/items/", headers={"Accept-Encoding": "gzip", "If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == response.headers["ETag"]
@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from starlette.requests import Request
+
+from app.api.consistency import PRIMARY_COOKIE
+from app.api.dependencies import DbProvider
+from app.infrastructure.database.routing import ReplicaSet
+from tests.conftest import Session
+
+
+class Pool:
+    """Hands out sessions that never connect, keeps them to tell which pool served a read."""
+
+    def __init__(self):
+        self.kw = {"bind": SimpleNamespace(pool=None)}
+        self.sessions = []
+
+    def __call__(self) -> Session:
+        self.sessions.append(Session())
+        return self.sessions[-1]
+
+
+def request(method: str = "GET", cookies: str = "") -> Request:
+    headers = [(b"cookie", cookies.encode())] if cookies else []
+    return Request({"type": "http", "method": method, "path": "/", "headers": headers, "query_string": b""})
+
+
+def streamed_read_pool(http_request: Request) -> str:
+    primary, replica = Pool(), Pool()
+    provider = DbProvider(pool=primary, replicas=ReplicaSet([replica]))
+
+    async def run():
+        async with provider.dao_factory(http_request)() as dao:
+            return dao.read_session or dao.session
+
+    session = asyncio.run(run())
+    return "replica" if session in replica.sessions else "primary"
+
+
+def test_streams_read_from_a_replica():
+    assert streamed_read_pool(request()) == "replica"
+
+
+def test_streams_after_a_write_read_from_the_primary():
+    assert streamed_read_pool(request(cookies=f"{PRIMARY_COOKIE}=1")) == "primary"
+
+
+def test_unsafe_methods_read_from_the_primary():
+    assert streamed_read_pool(request(method="POST")) == "primary"
@@ -0,0 +1,123 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.infrastructure.cache import MISSING, MemoryCache
+from app.infrastructure.scheduler import discounts
+from app.infrastructure.scheduler.discounts import BATCH_WINDOW, DiscountScheduler
+from tests.conftest import Session
+
+NOW = datetime(2026, 10, 18, 12, 0, tzinfo=timezone.utc)
+
+
+class Discounts:
+    """DiscountDAO double: the stale dishes and boundaries it is given, the updates it is asked for."""
+
+    def __init__(self, stale=(), boundaries=()):
+        self.stale = list(stale)
+        self.boundaries = list(boundaries)
+        self.applied = []
+
+    async def get_stale_discounted_prices(self):
+        return self.stale
+
+    async def apply_discounted_prices(self, dish_ids, at=None):
+        self.applied.append((sorted(dish_ids), at))
+
+    async def get_discount_boundaries(self):
+        return self.boundaries
+
+
+def make_scheduler(monkeypatch, dao: Discounts):
+    sessions = []
+
+    def pool():
+        sessions.append(Session())
+        return sessions[-1]
+
+    cache = MemoryCache(max_bytes=1024 * 1024, ttl=300)
+    monkeypatch.setattr(discounts, "HolderDao", lambda session: SimpleNamespace(discount=dao))
+    return DiscountScheduler(pool, cache), sessions
+
+
+def cached(cache: MemoryCache) -> bool:
+    return cache.get("dish") is not MISSING
+
+
+def boundary(dish_id: int, seconds: float):
+    return dish_id, NOW + timedelta(seconds=seconds), seconds
+
+
+def test_restart_reconciles_stale_dishes(monkeypatch):
+    dao = Discounts(stale=[3, 4])
+    scheduler, sessions = make_scheduler(monkeypatch, dao)
+    scheduler.cache.set("dish", "cached", ("dishes",))
+    asyncio.run(scheduler._load())
+    assert dao.applied == [([3, 4], None)]
+    assert sessions[0].commits == 1
+    assert not cached(scheduler.cache)
+
+
+def test_nothing_stale_leaves_the_cache_alone(monkeypatch):
+    scheduler, sessions = make_scheduler(monkeypatch, Discounts())
+    scheduler.cache.set("dish", "cached", ("dishes",))
+    asyncio.run(scheduler._load())
+    assert sessions[0].commits == 0
+    assert cached(scheduler.cache)
+
+
+def test_due_boundaries_are_applied_once_per_batch(monkeypatch):
+    dao = Discounts(boundaries=[
+        boundary(1, 10), boundary(2, 10 + BATCH_WINDOW / 2), boundary(1, 10 + BATCH_WINDOW / 2), boundary(3, 60)
+    ])
+    scheduler, _ = make_scheduler(monkeypatch, dao)
+
+    async def run():
+        await scheduler._load()
+        # the fake clock starts at the moment the boundaries were loaded
+        start = min(scheduler._queue)[0] - 10
+        scheduler.cache.set("dish", "cached", ("dishes",))
+        await scheduler._apply_due(start + 9)
+        assert dao.applied == [] and cached(scheduler.cache)
+
+        await scheduler._apply_due(start + 10)
+        latest = NOW + timedelta(seconds=10 + BATCH_WINDOW / 2)
+        assert dao.applied == [([1, 2], latest + timedelta(microseconds=1))]
+        assert not cached(scheduler.cache)
+
+        await scheduler._apply_due(start + 11)
+        assert len(dao.applied) == 1
+
+        await scheduler._apply_due(start + 60)
+        assert dao.applied[1] == ([3], NOW + timedelta(seconds=60, microseconds=1))
+        assert scheduler._queue == []
+
+    asyncio.run(run())
+
+
+def test_reload_replaces_the_queue(monkeypatch):
+    dao = Discounts(boundaries=[boundary(1, 10)])
+    scheduler, _ = make_scheduler(monkeypatch, dao)
+
+    async def run():
+        await scheduler._load()
+        dao.boundaries = [boundary(2, 20)]
+        await scheduler._load()
+        return [dish_id for _, _, dish_id in scheduler._queue]
+
+    assert asyncio.run(run()) == [2]
+
+
+@pytest.mark.parametrize("seconds", [0, -5])
+def test_boundaries_already_due_apply_at_once(monkeypatch, seconds):
+    dao = Discounts(boundaries=[boundary(5, seconds)])
+    scheduler, _ = make_scheduler(monkeypatch, dao)
+
+    async def run():
+        await scheduler._load()
+        await scheduler._apply_due(asyncio.get_running_loop().time())
+
+    asyncio.run(run())
+    assert [dish_ids for dish_ids, _ in dao.applied] == [[5]]
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import dto
+from app.api.dependencies import SparseFields
+from app.infrastructure.database.dao.rdb import DishDAO, LoadPlan, FULL_PLAN
+from app.infrastructure.database.models import Dish
+from tests.conftest import Session
+
+
+def test_fields_accept_names_and_aliases():
+    plan = SparseFields(dto.Dish)(fields="id, name,menuId,,discountedPrice")
+    assert plan == LoadPlan(frozenset({"id", "name", "menu_id", "discounted_price"}))
+    assert plan.includes("name") and not plan.includes("params")
+
+
+def test_omitted_fields_load_everything():
+    assert SparseFields(dto.Dish)(fields=None) is FULL_PLAN
+    assert SparseFields(dto.Dish)(fields="") is FULL_PLAN
+    assert FULL_PLAN.includes("params") and not FULL_PLAN.is_sparse
+
+
+def test_unknown_field_is_a_bad_request():
+    with pytest.raises(HTTPException) as error:
+        SparseFields(dto.Dish)(fields="name,password")
+    assert error.value.status_code == 400
+    assert error.value.detail == "Unknown field: password"
+
+
+def test_partial_dump_has_only_the_selected_fields():
+    partial = dto.partial(dto.Dish)
+    assert partial is dto.partial(dto.Dish)
+    dish = partial.model_validate({"id": 1, "menu_id": 2})
+    assert dish.model_dump(by_alias=True, exclude_unset=True) == {"id": 1, "menuId": 2}
+
+
+def test_sparse_dish_queries_and_returns_only_selected_columns():
+    session = Session([Dish(id=7, name="Plov", price=30000, menu_id=1, restaurant_id=1)])
+    dish = asyncio.run(DishDAO(session).get_dish(7, SparseFields(dto.Dish)(fields="name")))
+    assert dish.model_dump(by_alias=True, exclude_unset=True) == {"name": "Plov"}
+    statement, _ = session.executed[-1]
+    sql = str(statement.compile()).split("FROM")[0]
+    assert "dishes.id" in sql and "dishes.name" in sql
+    assert "dishes.price" not in sql and "dishes.menu_id" not in sql
@@ -0,0 +1,46 @@
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.api import schems
+from app.api.dependencies import dish_filter
+
+
+def parse(query_string: str) -> schems.DishFilter:
+    request = Request({
+        "type": "http", "method": "GET", "path": "/", "headers": [], "query_string": query_string.encode()
+    })
+    return dish_filter(request, menu_id=None, price_min=None, price_max=None)
+
+
+def test_parameter_conditions():
+    dish_filter_ = parse("param[calories]<=500&param[weight]>=300&param[spicy]=yes&limit=10")
+    assert dish_filter_.params == (
+        schems.DishParameterCondition(name="calories", operator="le", value="500"),
+        schems.DishParameterCondition(name="weight", operator="ge", value="300"),
+        schems.DishParameterCondition(name="spicy", operator="eq", value="yes"),
+    )
+
+
+def test_no_parameters_is_no_filter():
+    assert parse("limit=10&after=abc").is_empty
+
+
+@pytest.mark.parametrize("query_string", [
+    "param[weight]<500",
+    "param[weight]>300",
+    "param[weight]!=300",
+    "param[]=1",
+    "params[weight]=300",
+    "param=300",
+])
+def test_unparsed_parameter_keys_are_rejected(query_string):
+    with pytest.raises(HTTPException) as error:
+        parse(query_string)
+    assert error.value.status_code == 422
+
+
+def test_comparison_needs_a_number():
+    with pytest.raises(HTTPException) as error:
+        parse("param[calories]<=many")
+    assert error.value.status_code == 400
@@ -0,0 +1,57 @@
+import asyncio
+from typing import List
+
+from app.domain.importer import ImportRecord, read_csv, read_jsonl
+
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def read(reader, data: bytes, size: int = 7) -> List[ImportRecord]:
+    async def collect():
+        return [record async for record in reader(chunked(data, size))]
+
+    return asyncio.run(collect())
+
+
+def test_csv_rows_split_dish_columns_from_parameters():
+    records = read(read_csv, b"name,price,restaurantId,menuId,calories\r\nPlov,30000,1,1,500\r\n")
+    assert records == [
+        ImportRecord(2, {"params": {"calories": "500"}, "name": "Plov", "price": "30000", "restaurantId": "1",
+                         "menuId": "1"})
+    ]
+
+
+def test_csv_quoted_fields_may_span_lines():
+    data = 'name,price,description\n"Plov, special",100,"Rice\nand ""meat"""\nTea,5,hot\n'.encode()
+    for size in (1, 3, 1024):
+        records = read(read_csv, data, size)
+        assert [record.line for record in records] == [2, 4]
+        assert records[0].data["name"] == "Plov, special"
+        assert records[0].data["params"] == {"description": 'Rice\nand "meat"'}
+        assert records[1].data["name"] == "Tea"
+
+
+def test_csv_literal_quote_in_unquoted_field_does_not_swallow_the_file():
+    records = read(read_csv, b'name,price\n5" pizza,10\nTea,5\n')
+    assert [record.data["name"] for record in records] == ['5" pizza', "Tea"]
+
+
+def test_csv_wrong_column_count_is_reported_with_its_line():
+    records = read(read_csv, b"name,price\n\nPlov\nTea,5")
+    assert records[0] == ImportRecord(3, None, "Expected 2 columns, got 1")
+    assert records[1].line == 4 and records[1].data["name"] == "Tea"
+
+
+def test_csv_byte_order_mark_and_multibyte_characters_split_across_chunks():
+    records = read(read_csv, "﻿name,price\nОш,1\n".encode(), size=1)
+    assert records[0].data == {"params": {}, "name": "Ош", "price": "1"}
+
+
+def test_jsonl_reports_invalid_lines():
+    records = read(read_jsonl, b'{"name": "Plov"}\nnot json\n[1]\n')
+    assert records[0] == ImportRecord(1, {"name": "Plov"})
+    assert records[1].line == 2 and records[1].error.startswith("Invalid JSON")
+    assert records[2] == ImportRecord(3, None, "Expected a JSON object")
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import asyncpg
+import pytest
+from asyncpg import exceptions
+from sqlalchemy.dialects.postgresql.asyncpg import AsyncAdapt_asyncpg_connection, AsyncAdapt_asyncpg_dbapi
+from sqlalchemy.exc import DBAPIError, IntegrityError
+
+from app.infrastructure.database.dao.rdb.base import integrity_error
+
+DBAPI = AsyncAdapt_asyncpg_dbapi(asyncpg)
+
+
+def violation(error_class, sqlstate: str, message: str, detail: str, table: str) -> IntegrityError:
+    """The error a failed write raises: PostgreSQL's fields, wrapped the way the asyncpg dialect does it."""
+    cause = error_class.new({"C": sqlstate, "M": message, "D": detail, "t": table})
+    connection = SimpleNamespace(_connection=SimpleNamespace(is_closed=lambda: False), dbapi=DBAPI)
+    try:
+        AsyncAdapt_asyncpg_connection._handle_exception(connection, cause)
+    except DBAPI.Error as translated:
+        error = DBAPIError.instance("INSERT ...", (), translated, DBAPI.Error)
+    assert isinstance(error, IntegrityError)
+    return error
+
+
+def test_missing_referenced_row_is_not_found():
+    error = integrity_error(violation(
+        exceptions.ForeignKeyViolationError, "23503",
+        'insert or update on table "dishes" violates foreign key constraint "dishes_menu_id_fkey"',
+        'Key (menu_id)=(9) is not present in table "menus".', "dishes",
+    ))
+    assert (error.status_code, error.detail) == (404, "Menu with id 9 not found")
+
+
+def test_unlabelled_table_is_named_as_is():
+    error = integrity_error(violation(
+        exceptions.ForeignKeyViolationError, "23503",
+        'insert or update on table "discounts" violates foreign key constraint "discounts_dish_id_fkey"',
+        'Key (dish_id)=(5) is not present in table "dish_parameters".', "discounts",
+    ))
+    assert (error.status_code, error.detail) == (404, "dish_parameters with id 5 not found")
+
+
+def test_row_still_referenced_is_a_conflict():
+    error = integrity_error(violation(
+        exceptions.ForeignKeyViolationError, "23503",
+        'update or delete on table "menus" violates foreign key constraint "dishes_menu_id_fkey" on table "dishes"',
+        'Key (id)=(1) is still referenced from table "dishes".', "dishes",
+    ))
+    assert (error.status_code, error.detail) == (409, "Id 1 is still used by dishes")
+
+
+def test_duplicate_key_is_a_conflict():
+    error = integrity_error(violation(
+        exceptions.UniqueViolationError, "23505",
+        'duplicate key value violates unique constraint "uq_dish_parameters_dish_key"',
+        "Key (dish_id, key_id)=(1, 1) already exists.", "dish_parameters",
+    ))
+    assert (error.status_code, error.detail) == (409, "Key (dish_id, key_id)=(1, 1) already exists.")
+
+
+@pytest.mark.parametrize("error_class, sqlstate, message", [
+    (
+        exceptions.NotNullViolationError, "23502",
+        'null value in column "price" of relation "dishes" violates not-null constraint',
+    ),
+    (
+        exceptions.CheckViolationError, "23514",
+        'new row for relation "dishes" violates check constraint "ck_dishes_price"',
+    ),
+])
+def test_invalid_row_is_unprocessable(error_class, sqlstate, message):
+    error = integrity_error(violation(error_class, sqlstate, message, "Failing row contains (x, 1, null).", "dishes"))
+    assert (error.status_code, error.detail) == (422, message)
@@ -0,0 +1,64 @@
+import asyncio
+import re
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+
+from app.api.dependencies.pagination import Pagination
+from app.infrastructure.database.dao.rdb import MenuDAO, decode_cursor, encode_cursor
+from app.infrastructure.database.models import Menu
+from tests.conftest import Session
+
+
+class Menus(Session):
+    """Serves menus by id like the keyset query would."""
+
+    def __init__(self, ids):
+        now = datetime.now(timezone.utc)
+        super().__init__(Menu(id=id_, name=f"Menu {id_}", created_at=now, updated_at=now) for id_ in ids)
+
+    def respond(self, statement, params):
+        compiled = statement.compile()
+        values = {**compiled.params, **(params or {})}
+        after = re.search(r"menus\.id > :(\w+)", str(compiled))
+        limit = re.search(r"LIMIT :(\w+)", str(compiled))
+        after = values[after.group(1)] if after else 0
+        return [menu for menu in self.rows if menu.id > after][:values[limit.group(1)]]
+
+
+def test_cursor_round_trip():
+    for id_ in (0, 1, 42, 2 ** 63 - 1):
+        cursor = encode_cursor(id_)
+        assert "=" not in cursor
+        assert decode_cursor(cursor) == id_
+
+
+@pytest.mark.parametrize("cursor", ["!!", "bm90IGFuIGlk", "/w"])
+def test_invalid_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+    with pytest.raises(HTTPException) as error:
+        Pagination(after=cursor, limit=10)
+    assert error.value.status_code == 400
+
+
+def test_pages_follow_the_cursor_to_the_end():
+    dao = MenuDAO(Menus([1, 2, 5, 8, 9]))
+
+    async def walk():
+        pages, after = [], None
+        while True:
+            page = await dao.get_menus(after=after, limit=2)
+            pages.append([menu.id for menu in page.items])
+            if page.next_cursor is None:
+                return pages
+            after = decode_cursor(page.next_cursor)
+
+    assert asyncio.run(walk()) == [[1, 2], [5, 8], [9]]
+
+
+def test_exactly_full_last_page_has_no_cursor():
+    page = asyncio.run(MenuDAO(Menus([1, 2])).get_menus(limit=2))
+    assert [menu.id for menu in page.items] == [1, 2]
+    assert page.next_cursor is None
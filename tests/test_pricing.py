@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app.api import schems
+from app.domain.pricing import CartPrice, DishPrice, PricedLine, price_cart, price_line
+from app.infrastructure.database.dao.rdb import CartDAO
+from app.infrastructure.database.dao.rdb.order import get_dish_prices
+from tests.conftest import Session
+
+
+def test_line_without_discount_is_priced_at_list_price():
+    assert price_line(1, 2, 3, DishPrice(20000, None)) == PricedLine(
+        cart_item_id=1, dish_id=2, quantity=3, unit_price=20000, discount=0, total_cost=60000
+    )
+
+
+def test_line_with_discount_is_priced_at_discounted_price():
+    line = price_line(None, 2, 3, DishPrice(20000, 17000))
+    assert line.unit_price == 17000
+    assert line.discount == 9000
+    assert line.total_cost == 51000
+
+
+def test_free_dish_is_a_full_discount():
+    line = price_line(None, 2, 2, DishPrice(2, 0))
+    assert line.unit_price == 0
+    assert line.discount == 4
+    assert line.total_cost == 0
+
+
+def test_amounts_are_rounded_to_cents():
+    line = price_line(None, 1, 3, DishPrice(0.1, 0.07))
+    assert line.total_cost == 0.21
+    assert line.discount == 0.09
+    cart = price_cart([(None, 1, 1), (None, 2, 1)], {1: DishPrice(0.1, None), 2: DishPrice(0.2, None)})
+    assert cart.total_cost == 0.3
+    assert cart.subtotal == 0.3
+
+
+def test_cart_adds_up_its_lines():
+    prices = {1: DishPrice(30000, None), 2: DishPrice(20000, 17000)}
+    cart = price_cart([(10, 1, 2), (11, 2, 1)], prices)
+    assert [line.cart_item_id for line in cart.lines] == [10, 11]
+    assert cart == CartPrice(lines=cart.lines, subtotal=80000, discount=3000, total_cost=77000)
+
+
+def test_empty_cart_costs_nothing():
+    assert price_cart([], {}) == CartPrice(lines=[], subtotal=0, discount=0, total_cost=0)
+
+
+def test_unknown_dish_cannot_be_priced():
+    with pytest.raises(KeyError):
+        price_cart([(None, 3, 1)], {1: DishPrice(30000, None)})
+    session = Session([(1, 30000.0, None)])
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(get_dish_prices(session, [1, 5, 4]))
+    assert error.value.status_code == 404
+    assert error.value.detail == "Dish with id 4 not found"
+
+
+def test_known_dishes_are_looked_up_once():
+    session = Session([(1, 30000.0, None), (2, 20000.0, 17000.0)])
+    prices = asyncio.run(get_dish_prices(session, [1, 2, 1]))
+    assert prices == {1: DishPrice(30000.0, None), 2: DishPrice(20000.0, 17000.0)}
+    _, params = session.executed[-1]
+    assert sorted(params["dish_ids"]) == [1, 2]
+
+
+def test_lines_of_the_same_dish_are_merged():
+    cart = schems.CartCreateUpdate(lines=[
+        schems.CartItemCreateUpdate(dishId=1, quantity=2),
+        schems.CartItemCreateUpdate(dishId=2, quantity=1),
+        schems.CartItemCreateUpdate(dishId=1, quantity=3),
+    ])
+    items = asyncio.run(CartDAO(Session())._collect_items(cart))
+    assert [(item.dish_id, item.quantity) for item in items] == [(1, 5), (2, 1)]
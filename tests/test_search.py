@@ -0,0 +1,62 @@
+import asyncio
+import re
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+from app.domain import search
+from app.domain.search import normalize_search_text
+from app.infrastructure.database.dao.rdb import DishDAO, RestaurantDAO
+from tests.conftest import Session
+
+MIGRATION = Path(search.__file__).parents[1] / (
+    "infrastructure/database/alembic/versions/b71e04c9d2a3_trigram_search_indexes.py"
+)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Plov", "plov"),
+    ("Плов", "plov"),
+    ("Шашлык", "shashlik"),
+    ("Чучвара", "chuchvara"),
+    ("Ўзбек ошқозони", "ozbek oshqozoni"),
+    ("Ғижда", "gijda"),
+    ("Ҳалим", "halim"),
+    ("Объект", "obekt"),
+    ("Съёмка", "syomka"),
+    ("O'zbek", "ozbek"),
+    ("Gʻijda", "gijda"),
+    ("Oʼsh", "osh"),
+    ("  Lagʻmon \t  shoʻrva \n", "lagmon shorva"),
+    ("", ""),
+])
+def test_cyrillic_and_latin_spellings_meet(value, expected):
+    assert normalize_search_text(value) == expected
+
+
+def test_normalizing_twice_changes_nothing():
+    value = normalize_search_text("Ёш Ўғлон  ЧАЙХАНА")
+    assert normalize_search_text(value) == value
+
+
+def test_sql_function_uses_the_same_mapping():
+    # the trigram indexes are built on search_normalize(), queries on normalize_search_text()
+    sql = MIGRATION.read_text(encoding="utf-8")
+    replaces = re.findall(r"'(\w)', '(\w+)'\)", sql)
+    assert tuple(replaces) == search._MULTI_CHAR
+    source, target = re.search(r"'(\w+(?:[^']|'')*)',\s*'(\w+)'\s*\)\)", sql).groups()
+    assert source.replace("''", "'") == search._SINGLE_FROM + search._DROPPED
+    assert target == search._SINGLE_TO
+
+
+@pytest.mark.parametrize("text", ["   ", "'", " ʻ ’ ", "ъ"])
+def test_text_blank_once_normalized_is_rejected(text):
+    session = Session()
+    for search_ in (DishDAO(session).search_dishes, RestaurantDAO(session).search_restaurants):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(search_(text))
+        assert error.value.status_code == 422
+    with pytest.raises(HTTPException):
+        asyncio.run(RestaurantDAO(session).get_restaurant_by_name(text))
+    assert session.executed == []
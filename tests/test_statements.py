@@ -0,0 +1,56 @@
+import asyncio
+
+from app.api import schems
+from app.infrastructure.database.dao.rdb import DishDAO, LoadPlan
+from app.infrastructure.database.statements import StatementRegistry, STATEMENTS
+from tests.conftest import Session
+
+
+def test_registry_builds_each_key_once():
+    registry = StatementRegistry()
+    builds = []
+    first = registry.get("key", lambda: builds.append(1) or object())
+    assert registry.get("key", lambda: builds.append(1) or object()) is first
+    assert builds == [1]
+    assert registry.stats() == {"statements": 1, "hits": 1, "misses": 1}
+
+
+def test_registry_drops_least_recently_used():
+    registry = StatementRegistry(max_statements=2)
+    a = registry.get("a", object)
+    registry.get("b", object)
+    registry.get("a", object)
+    registry.get("c", object)
+    assert registry.get("a", object) is a
+    assert registry.stats()["statements"] == 2
+    # "b" was the least recently used one
+    assert registry.stats()["misses"] == 3
+    registry.get("b", object)
+    assert registry.stats()["misses"] == 4
+
+
+def get_dishes(session, dish_filter, after=None, plan=LoadPlan(frozenset({"name"}))):
+    asyncio.run(DishDAO(session).get_dishes(after=after, limit=10, dish_filter=dish_filter, plan=plan))
+    return session.executed[-1]
+
+
+def test_unfiltered_dish_pages_reuse_one_statement():
+    session = Session()
+    # the API always passes a filter, without conditions it is no filter
+    first, params = get_dishes(session, schems.DishFilter())
+    second, _ = get_dishes(session, None)
+    assert first is second
+    assert params == {"limit": 11}
+    after, params = get_dishes(session, schems.DishFilter(), after=5)
+    assert after is not first and get_dishes(session, schems.DishFilter(), after=7)[0] is after
+    assert params == {"after": 5, "limit": 11}
+
+
+def test_filtered_dish_pages_are_built_per_call():
+    session = Session()
+    dish_filter = schems.DishFilter(menuId=1)
+    misses = STATEMENTS.misses
+    first, _ = get_dishes(session, dish_filter)
+    second, _ = get_dishes(session, dish_filter)
+    assert first is not second
+    assert STATEMENTS.misses == misses